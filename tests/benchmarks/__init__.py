@@ -0,0 +1 @@
+"""Framework-overhead benchmarks against a local stand-in for testathon.live."""
@@ -0,0 +1,403 @@
+"""Framework-overhead benchmarks against a local stand-in for testathon.live
+
+Runs the flows from tests/sample-test.py against a static replica of the
+storefront served from localhost, with a locally launched Chromium and no
+network access, and reports per-action latency percentiles. Every run is
+appended to a history file keyed by git commit, and compared with the
+latest run of another commit. With --through, the matching sample tests
+also run through pytest (or browserstack-sdk pytest) against the same
+stand-in, and their durations are compared with the raw flows:
+
+    python tests/benchmarks/run.py --iterations 20
+    python tests/benchmarks/run.py --flows search checkout --compare 1a2b3c4
+    python tests/benchmarks/run.py --iterations 5 --through pytest
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Running as a script puts this directory, not tests/, on sys.path
+TESTS_DIR = Path(__file__).resolve().parents[1]
+if str(TESTS_DIR) not in sys.path:
+    sys.path.insert(0, str(TESTS_DIR))
+
+from benchmarks.server import serve  # noqa: E402
+from support.stats import summarize  # noqa: E402
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
+
+HISTORY_PATH = Path(__file__).resolve().parent / "history.jsonl"
+QUANTILES = (50, 95, 99)
+SAMPLE_TEST = TESTS_DIR / "sample-test.py"
+# The sample test that walks the same path as each flow. The add to cart and
+# checkout tests start from authenticated_page, and the stand-in has no
+# sign-up or sign-in pages, so those flows are only run raw.
+SAMPLE_TESTS = {
+    "landing": "test_basic_page_loading",
+    "search": "test_product_search_functionality",
+    "filtering": "test_product_filtering",
+}
+# Resolve every host but the stand-in to nothing, so no request leaves the box
+HOST_RESOLVER_RULES = "--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE 127.0.0.1"
+RUNNERS = {
+    "pytest": [sys.executable, "-m", "pytest"],
+    "sdk": ["browserstack-sdk", "pytest"],
+}
+
+
+class ActionTimer:
+    """Wall-clock samples per action name, in milliseconds"""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def measure(self, action: str) -> Iterator[None]:
+        started = time.perf_counter()
+        yield
+        self.add(action, (time.perf_counter() - started) * 1000)
+
+    def add(self, action: str, ms: float) -> None:
+        self.samples.setdefault(action, []).append(ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            action: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                **summarize(values, QUANTILES),
+                "max": max(values),
+            }
+            for action, values in sorted(self.samples.items())
+        }
+
+
+def flow_landing(page: "Page", base_url: str, timer: ActionTimer) -> None:
+    with timer.measure("goto"):
+        page.goto(base_url)
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='product']")
+    with timer.measure("evaluate"):
+        elements = page.evaluate("() => document.querySelectorAll('*').length")
+    with timer.measure("count"):
+        buttons = page.locator("button").count()
+    assert page.title() == "StackDemo" and elements > 0 and buttons > 0
+
+
+def flow_add_to_cart(page: "Page", base_url: str, timer: ActionTimer) -> None:
+    with timer.measure("goto"):
+        page.goto(base_url)
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='product']")
+    product = page.locator("[data-test='product']").first
+    with timer.measure("text"):
+        name = product.locator("[data-test='product-name']").inner_text()
+    with timer.measure("click"):
+        product.locator("[data-test='add-to-cart']").click()
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='cart-count']")
+    with timer.measure("click"):
+        page.locator("[data-test='cart-link']").click()
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='cart-page']")
+    with timer.measure("text"):
+        cart_name = page.locator("[data-test='cart-item-name']").first.inner_text()
+    assert cart_name == name
+
+
+def flow_search(page: "Page", base_url: str, timer: ActionTimer) -> None:
+    with timer.measure("goto"):
+        page.goto(base_url)
+    search = page.locator("[data-test='search-input']")
+    with timer.measure("fill"):
+        search.fill("phone")
+    with timer.measure("press"):
+        search.press("Enter")
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='search-results']")
+    with timer.measure("count"):
+        results = page.locator("[data-test='product']").count()
+    assert results > 0
+
+
+def flow_filtering(page: "Page", base_url: str, timer: ActionTimer) -> None:
+    with timer.measure("goto"):
+        page.goto(base_url)
+    with timer.measure("select"):
+        page.locator("[data-test='filter-category']").select_option("electronics")
+    with timer.measure("click"):
+        page.locator("[data-test='apply-filters']").click()
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='filtered-products']")
+    with timer.measure("text"):
+        category = page.locator("[data-test='product-category']").first.inner_text()
+    assert category == "electronics"
+
+
+def flow_checkout(page: "Page", base_url: str, timer: ActionTimer) -> None:
+    with timer.measure("goto"):
+        page.goto(base_url)
+    with timer.measure("wait"):
+        page.wait_for_selector("[data-test='product']")
+    with timer.measure("click"):
+        page.locator("[data-test='product']").first.locator("[data-test='add-to-cart']").click()
+    with timer.measure("click"):
+        page.locator("[data-test='checkout-button']").click()
+    fields = {
+        "shipping-address-input": "123 Test Street",
+        "city-input": "Test City",
+        "zipcode-input": "12345",
+    }
+    for field, value in fields.items():
+        with timer.measure("fill"):
+            page.locator(f"[data-test='{field}']").fill(value)
+    with timer.measure("select"):
+        page.locator("[data-test='country-select']").select_option("US")
+    with timer.measure("click"):
+        page.locator("[data-test='continue-to-payment']").click()
+    fields = {
+        "card-number-input": "4111111111111111",
+        "expiry-date-input": "12/25",
+        "cvv-input": "123",
+        "card-name-input": "Test User",
+    }
+    for field, value in fields.items():
+        with timer.measure("fill"):
+            page.locator(f"[data-test='{field}']").fill(value)
+    with timer.measure("click"):
+        page.locator("[data-test='place-order']").click()
+    with timer.measure("text"):
+        order_number = page.locator("[data-test='order-number']").inner_text()
+    assert order_number
+
+
+FLOWS: Dict[str, Callable[["Page", str, ActionTimer], None]] = {
+    "landing": flow_landing,
+    "add_to_cart": flow_add_to_cart,
+    "search": flow_search,
+    "filtering": flow_filtering,
+    "checkout": flow_checkout,
+}
+
+
+def run_flows(
+    browser: "Browser", base_url: str, flows: List[str], iterations: int, warmup: int
+) -> ActionTimer:
+    """Run each flow in a fresh context, as pytest-playwright would per test"""
+    timer = ActionTimer()
+    for iteration in range(warmup + iterations):
+        recording = iteration >= warmup
+        active = timer if recording else ActionTimer()
+        for name in flows:
+            with active.measure(f"flow:{name}"):
+                with active.measure("new_context"):
+                    context = browser.new_context()
+                with active.measure("new_page"):
+                    page = context.new_page()
+                FLOWS[name](page, base_url, active)
+                with active.measure("close_context"):
+                    context.close()
+    return timer
+
+
+def read_test_durations(results_dir: Path, runner: str, timer: ActionTimer) -> List[str]:
+    """Add each sample test's --results-log duration to timer as "<runner>:<flow>"
+
+    Returns the tests that did not pass, whose durations are left out.
+    """
+    flows = {test: flow for flow, test in SAMPLE_TESTS.items()}
+    failures = []
+    for path in sorted(Path(results_dir).glob("*.jsonl")):
+        for record in load_history(path):
+            flow = flows.get(record["test"].split("::")[-1].split("[")[0])
+            if flow is None:
+                continue
+            if record["outcome"] != "passed":
+                failures.append(f"{record['test']} on {record['platform']} {record['outcome']}: {record.get('reason')}")
+                continue
+            # Setup, call and teardown, so fixture overhead is included
+            timer.add(f"{runner}:{flow}", record["duration"] * 1000)
+    return failures
+
+
+def run_through(
+    runner: str, base_url: str, flows: List[str], iterations: int, warmup: int, headed: bool
+) -> Tuple[ActionTimer, List[str]]:
+    """Run the sample tests of flows through runner, timing each test and the whole process
+
+    Flows without a sample test in SAMPLE_TESTS are skipped.
+    """
+    timer = ActionTimer()
+    failures: List[str] = []
+    tests = [SAMPLE_TESTS[name] for name in flows if name in SAMPLE_TESTS]
+    if not tests:
+        return timer, failures
+    for iteration in range(warmup + iterations):
+        recording = iteration >= warmup
+        active = timer if recording else ActionTimer()
+        with tempfile.TemporaryDirectory(prefix="benchmark-results-") as output_dir:
+            output = Path(output_dir)
+            command = [
+                *RUNNERS[runner],
+                str(SAMPLE_TEST.relative_to(TESTS_DIR.parent)),
+                "-q",
+                "-k", " or ".join(tests),
+                "--base-url", base_url,
+                f"--browser-arg={HOST_RESOLVER_RULES}",
+                "--results-log",
+                "--results-dir", str(output / "results"),
+                # Without the cache the stand-in's timings do not train the learned
+                # timeouts or test order, and no stored pass is reused
+                "-p", "no:cacheprovider",
+                # Keep the stand-in's screenshots and statuses away from the real ones
+                "--visual-baseline-dir", str(output / "visual-baselines"),
+                "--screenshot-dir", str(output / "screenshots"),
+                "--status-log", str(output / "session-status.jsonl"),
+            ]
+            if headed:
+                command.append("--headed")
+            with active.measure(f"{runner}:process"):
+                subprocess.run(command, cwd=TESTS_DIR.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            failed = read_test_durations(output / "results", runner, active)
+        if recording:
+            failures.extend(failed)
+    return timer, failures
+
+
+def format_overhead(
+    raw: Dict[str, Dict[str, float]], through: Dict[str, Dict[str, float]], runner: str, flows: List[str]
+) -> str:
+    """p50 of each flow run raw and as a sample test through runner, and what the process adds"""
+    lines = [f"{'flow':<20}{'raw p50 ms':>12}{runner + ' p50 ms':>16}{'overhead ms':>14}"]
+    tests_ms = 0.0
+    for name in flows:
+        flow, test = raw.get(f"flow:{name}"), through.get(f"{runner}:{name}")
+        if flow is None or test is None:
+            continue
+        tests_ms += test["p50"]
+        lines.append(f"{name:<20}{flow['p50']:>12.1f}{test['p50']:>16.1f}{test['p50'] - flow['p50']:>+14.1f}")
+    process = through.get(f"{runner}:process")
+    if process is not None:
+        lines.append(
+            f"{runner} process p50 {process['p50']:.0f} ms, of which the tests' p50s add up to {tests_ms:.0f} ms "
+            "per platform; the rest is startup, collection, browser launch and teardown"
+        )
+    return "\n".join(lines)
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", *args], cwd=TESTS_DIR, capture_output=True, text=True)
+
+    try:
+        head = git("rev-parse", "HEAD")
+        dirty = git("status", "--porcelain", "--untracked-files=no").stdout.strip() != ""
+    except OSError:
+        return {"commit": None, "dirty": None}
+    return {"commit": head.stdout.strip() or None, "dirty": dirty}
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def find_baseline(
+    history: List[Dict[str, Any]], commit: Optional[str], compare: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """Latest run of the requested commit, or of any commit other than this one"""
+    for record in reversed(history):
+        recorded = record.get("commit") or ""
+        if compare is not None and recorded.startswith(compare):
+            return record
+        if compare is None and recorded != commit:
+            return record
+    return None
+
+
+def format_report(summary: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Any]]) -> str:
+    previous = (baseline or {}).get("actions", {})
+    lines = [f"{'action':<20}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'p50 vs base':>14}"]
+    for action, stats in summary.items():
+        delta = ""
+        if action in previous:
+            before = previous[action]["p50"]
+            delta = f"{(stats['p50'] - before) / before * 100:+.1f}%" if before else ""
+        lines.append(
+            f"{action:<20}{stats['count']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+            f"{stats['p99']:>10.1f}{stats['max']:>10.1f}{delta:>14}"
+        )
+    if baseline:
+        lines.append(f"baseline: {(baseline.get('commit') or 'unknown')[:12]} at {baseline.get('timestamp')}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10, help="recorded runs of every flow")
+    parser.add_argument("--warmup", type=int, default=1, help="unrecorded runs before measuring")
+    parser.add_argument("--flows", nargs="+", choices=sorted(FLOWS), default=list(FLOWS))
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH, help="JSON lines file of earlier runs")
+    parser.add_argument("--compare", help="commit (or prefix) to compare with instead of the latest other one")
+    parser.add_argument("--no-record", action="store_true", help="do not append this run to the history")
+    parser.add_argument(
+        "--through",
+        nargs="+",
+        choices=sorted(RUNNERS),
+        default=[],
+        help="also run the matching sample tests through pytest or browserstack-sdk pytest and compare",
+    )
+    args = parser.parse_args(argv)
+
+    from playwright.sync_api import sync_playwright
+
+    with serve() as base_url, sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=not args.headed, args=[HOST_RESOLVER_RULES])
+        try:
+            timer = run_flows(browser, base_url, args.flows, args.iterations, args.warmup)
+            browser_version = browser.version
+        finally:
+            browser.close()
+        through = {
+            runner: run_through(runner, base_url, args.flows, args.iterations, args.warmup, args.headed)
+            for runner in args.through
+        }
+
+    summary = timer.summary()
+    record = {
+        **git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "iterations": args.iterations,
+        "flows": args.flows,
+        "python": platform.python_version(),
+        "chromium": browser_version,
+        "actions": summary,
+    }
+    history = load_history(args.history)
+    print(format_report(summary, find_baseline(history, record["commit"], args.compare)))
+    for runner, (runner_timer, failures) in through.items():
+        record.setdefault("through", {})[runner] = runner_timer.summary()
+        print()
+        print(format_overhead(summary, record["through"][runner], runner, args.flows))
+        for failure in failures:
+            print(f"not timed: {failure}")
+    if not args.no_record:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
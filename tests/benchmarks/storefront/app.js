@@ -0,0 +1,85 @@
+// Minimal client-side storefront with the data-test hooks the sample tests use
+const PRODUCTS = [
+  { id: 1, name: "iPhone 12", price: "$799.00", category: "electronics" },
+  { id: 2, name: "Galaxy S20 Phone", price: "$699.00", category: "electronics" },
+  { id: 3, name: "Pixel 5 Phone", price: "$599.00", category: "electronics" },
+  { id: 4, name: "One Plus 8 Phone", price: "$499.00", category: "electronics" },
+  { id: 5, name: "Leather Phone Case", price: "$29.00", category: "accessories" },
+  { id: 6, name: "USB-C Charger", price: "$19.00", category: "accessories" },
+];
+const cart = [];
+
+function show(id) {
+  for (const section of ["catalog", "cart", "checkout", "payment", "confirmation"]) {
+    document.getElementById(section).hidden = section !== id;
+  }
+}
+
+function renderProducts(products, listTest) {
+  const list = document.getElementById("products");
+  if (listTest) list.setAttribute("data-test", listTest);
+  else list.removeAttribute("data-test");
+  list.replaceChildren(...products.map((product) => {
+    const card = document.createElement("div");
+    card.className = "product-card";
+    card.setAttribute("data-test", "product");
+    card.innerHTML = `
+      <h3 data-test="product-name">${product.name}</h3>
+      <span data-test="product-price">${product.price}</span>
+      <span data-test="product-category">${product.category}</span>
+      <button class="btn" data-test="add-to-cart">Add to cart</button>`;
+    card.querySelector("[data-test='add-to-cart']").addEventListener("click", () => addToCart(product));
+    return card;
+  }));
+  show("catalog");
+}
+
+function addToCart(product) {
+  cart.push(product);
+  let badge = document.querySelector("[data-test='cart-count']");
+  if (!badge) {
+    badge = document.createElement("span");
+    badge.className = "cart-count";
+    badge.setAttribute("data-test", "cart-count");
+    document.querySelector("[data-test='cart-link']").appendChild(badge);
+  }
+  badge.textContent = String(cart.length);
+}
+
+function renderCart() {
+  document.getElementById("cart-items").replaceChildren(...cart.map((product) => {
+    const item = document.createElement("li");
+    item.innerHTML = `
+      <span data-test="cart-item-name">${product.name}</span>
+      <span data-test="cart-item-price">${product.price}</span>`;
+    return item;
+  }));
+  show("cart");
+}
+
+function on(test, event, handler) {
+  document.querySelector(`[data-test='${test}']`).addEventListener(event, handler);
+}
+
+on("search-input", "keydown", (event) => {
+  if (event.key !== "Enter") return;
+  const term = event.target.value.trim().toLowerCase();
+  renderProducts(PRODUCTS.filter((product) => product.name.toLowerCase().includes(term)), "search-results");
+});
+on("apply-filters", "click", () => {
+  const category = document.querySelector("[data-test='filter-category']").value;
+  renderProducts(PRODUCTS.filter((product) => !category || product.category === category), "filtered-products");
+});
+on("cart-link", "click", (event) => {
+  event.preventDefault();
+  renderCart();
+});
+on("checkout-button", "click", () => show("checkout"));
+on("continue-to-payment", "click", () => show("payment"));
+on("place-order", "click", () => {
+  document.querySelector("[data-test='order-number']").textContent = String(100000 + cart.length * 7919);
+  show("confirmation");
+});
+
+// Render after a tick, like the real storefront fetching its catalogue
+setTimeout(() => renderProducts(PRODUCTS), 0);
@@ -0,0 +1,63 @@
+from typing import Any, Dict
+
+import pytest
+
+from support.config import DEFAULT_BASE_URL, current_platform
+
+pytest_plugins = [
+    # Before auth, which imports it
+    "support.locators",
+    "support.auth",
+    "support.har",
+    "support.waits",
+    "support.dom",
+    "support.screenshots",
+    "support.visual",
+    "support.scheduling",
+    "support.outcomes",
+    "support.pool",
+    "support.affinity",
+    # Before concurrent, which imports them
+    "support.result_cache",
+    "support.status",
+    "support.concurrent",
+    "support.perf",
+    "support.timeouts",
+    "support.tracing",
+    "support.checkpoints",
+    "support.resources",
+    "support.warm",
+    "support.results",
+]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--browser-arg",
+        action="append",
+        default=[],
+        help="Command-line switch to add when launching a local browser, as --browser-arg=--switch (repeatable)",
+    )
+
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(
+    browser_type_launch_args: Dict[str, Any], pytestconfig: pytest.Config
+) -> Dict[str, Any]:
+    """pytest-playwright's launch arguments plus every --browser-arg"""
+    extra = pytestconfig.getoption("browser_arg")
+    if not extra:
+        return browser_type_launch_args
+    return {**browser_type_launch_args, "args": [*browser_type_launch_args.get("args", []), *extra]}
+
+
+@pytest.fixture(scope="session")
+def base_url(pytestconfig: pytest.Config) -> str:
+    """--base-url when given, otherwise the testathon.live storefront"""
+    return pytestconfig.getoption("base_url", None) or DEFAULT_BASE_URL
+
+
+@pytest.fixture(scope="session")
+def platform() -> Dict[str, Any]:
+    """browserstack.yml platform entry this process is running against"""
+    return current_platform()
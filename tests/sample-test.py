@@ -1,16 +1,19 @@
 import pytest   
 from playwright.sync_api import expect, Page 
-import random
-import time
+import re
 
-def test_add_product_to_cart(page: Page) -> None:
+from support.auth import TestUser, sign_up, user_profile_locator
+from support.dom import dom_snapshot_async, query_elements_async
+from support.status import clean_error
+from support.waits import wait_for_app_ready_async
+
+def test_add_product_to_cart(authenticated_page: Page, session_status, step_timeouts) -> None:
     """Test adding a product to cart on the e-commerce platform"""
+    page = authenticated_page
     try:
-        # Navigate to the e-commerce platform
-        page.goto("https://testathon.live/", timeout=30000)
-        
         # Wait for page to load and products to be visible
-        page.wait_for_selector("[data-test='product']", timeout=10000)
+        with step_timeouts.step("products", 10000) as timeout:
+            page.wait_for_selector("[data-test='product']", timeout=timeout)
         
         # Get the first product name and price
         first_product = page.locator("[data-test='product']").first
@@ -23,7 +26,8 @@ def test_add_product_to_cart(page: Page) -> None:
         first_product.locator("[data-test='add-to-cart']").click()
         
         # Wait for cart to update - look for cart badge or counter
-        page.wait_for_selector("[data-test='cart-count']", timeout=5000)
+        with step_timeouts.step("cart-count", 5000) as timeout:
+            page.wait_for_selector("[data-test='cart-count']", timeout=timeout)
         
         # Verify cart count updated
         cart_count = page.locator("[data-test='cart-count']")
@@ -32,7 +36,8 @@ def test_add_product_to_cart(page: Page) -> None:
         
         # Navigate to cart page
         page.locator("[data-test='cart-link']").click()
-        page.wait_for_selector("[data-test='cart-page']", timeout=5000)
+        with step_timeouts.step("cart-page", 5000) as timeout:
+            page.wait_for_selector("[data-test='cart-page']", timeout=timeout)
         
         # Verify product is in cart
         cart_product_name = page.locator("[data-test='cart-item-name']").first.inner_text()
@@ -43,21 +48,21 @@ def test_add_product_to_cart(page: Page) -> None:
         
         print(f"Cart product: {cart_product_name}, Price: {cart_product_price}")
         
-        mark_test_status("passed", f"Successfully added {product_name} to cart", page)
+        session_status.passed(f"Successfully added {product_name} to cart")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>").replace("'", "")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_product_search_functionality(page: Page) -> None:
+def test_product_search_functionality(pooled_page: Page, session_status, step_timeouts) -> None:
     """Test search functionality on the e-commerce platform"""
+    page = pooled_page
     try:
-        page.goto("https://testathon.live/", timeout=30000)
-        
         # Wait for search input to be visible
-        page.wait_for_selector("[data-test='search-input']", timeout=5000)
+        with step_timeouts.step("search-input", 5000) as timeout:
+            page.wait_for_selector("[data-test='search-input']", timeout=timeout)
         
         # Search for a product
         search_input = page.locator("[data-test='search-input']")
@@ -65,11 +70,12 @@ def test_product_search_functionality(page: Page) -> None:
         search_input.press("Enter")
         
         # Wait for search results
-        page.wait_for_selector("[data-test='search-results']", timeout=10000)
+        with step_timeouts.step("search-results", 10000) as timeout:
+            page.wait_for_selector("[data-test='search-results']", timeout=timeout)
         
         # Verify search results are displayed
         results = page.locator("[data-test='product']")
-        expect(results).to_have_count(at_least=1)
+        expect(results.first).to_be_visible()
         
         result_count = results.count()
         print(f"Found {result_count} search results")
@@ -78,124 +84,26 @@ def test_product_search_functionality(page: Page) -> None:
         first_result_name = results.first.locator("[data-test='product-name']").inner_text()
         assert "phone" in first_result_name.lower(), f"Search term not found in result: {first_result_name}"
         
-        mark_test_status("passed", f"Search returned {result_count} results containing 'phone'", page)
+        session_status.passed(f"Search returned {result_count} results containing 'phone'")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>").replace("'", "")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-
-
-def test_user_registration_flow(page: Page) -> None:
+def test_user_registration_flow(
+    page: Page, base_url: str, screenshots, session_status, selector_resolver
+) -> None:
     """Test complete user registration and sign-in process"""
     
     try:
-        # Configuration
-        base_url = "https://testathon.live/"
-        timeout = 30000
-        
-        # Navigate to application
-        page.goto(base_url, timeout=timeout)
-        expect(page).to_have_url(base_url)
-        
-        # Wait for page to load completely
-        page.wait_for_selector("#_next", timeout=10000)
-        
-        # Navigate to registration page - using multiple possible selectors
-        register_link = page.locator("[data-test='register-link']").or_(
-            page.locator("text=Sign Up").or_(
-                page.locator("text=Register")
-            )
-        )
-        expect(register_link).to_be_visible(timeout=5000)
-        register_link.click()
-        
-        # Wait for registration modal/form to appear
-        registration_form = page.locator("[data-test='registration-form']").or_(
-            page.locator(".Modal_modal_310HK").or_(
-                page.locator(".login_wrapper")
-            )
-        )
-        expect(registration_form).to_be_visible(timeout=10000)
-        
-        # Generate unique test data
-        timestamp = random.randint(1000, 9999)
-        test_user = {
-            "email": f"testuser{timestamp}@example.com",
-            "password": "SecurePassword123!",
-            "first_name": "Test",
-            "last_name": f"User{timestamp}"
-        }
-        
-        # Fill registration form using more robust selectors
-        email_input = page.locator("[data-test='email-input']").or_(
-            page.locator("input[type='email']").or_(
-                page.locator("input[name='email']")
-            )
-        )
-        email_input.fill(test_user["email"])
-        
-        password_input = page.locator("[data-test='password-input']").or_(
-            page.locator("input[type='password']").first()
-        )
-        password_input.fill(test_user["password"])
-        
-        confirm_password_input = page.locator("[data-test='confirm-password-input']").or_(
-            page.locator("input[type='password']").nth(1)
-        )
-        confirm_password_input.fill(test_user["password"])
-        
-        first_name_input = page.locator("[data-test='first-name-input']").or_(
-            page.locator("input[name='firstName']").or_(
-                page.locator("input[name='firstname']")
-            )
-        )
-        first_name_input.fill(test_user["first_name"])
-        
-        last_name_input = page.locator("[data-test='last-name-input']").or_(
-            page.locator("input[name='lastName']").or_(
-                page.locator("input[name='lastname']")
-            )
-        )
-        last_name_input.fill(test_user["last_name"])
-        
-        # Verify all fields are filled correctly
-        expect(email_input).to_have_value(test_user["email"])
-        expect(first_name_input).to_have_value(test_user["first_name"])
-        
-        # Submit registration
-        submit_button = page.locator("[data-test='register-submit']").or_(
-            page.locator("button[type='submit']").or_(
-                page.locator("text=Register").or_(
-                    page.locator("text=Sign Up")
-                ).filter(has=page.locator(":scope:not(a)"))
-            )
-        )
-        expect(submit_button).to_be_enabled()
-        submit_button.click()
-        
-        # Wait for successful registration and check for welcome message
-        welcome_message = page.locator("[data-test='welcome-message']").or_(
-            page.locator("text=Welcome").or_(
-                page.locator("text=Success").or_(
-                    page.locator("text=Account created")
-                )
-            )
-        )
-        expect(welcome_message).to_be_visible(timeout=15000)
+        # Register a brand-new user through the sign-up modal
+        test_user = TestUser.generate()
+        sign_up(page, test_user, base_url, resolver=selector_resolver)
         
         # Verify user is logged in by checking multiple indicators
-        user_profile = page.locator("[data-test='user-profile']").or_(
-            page.locator(".user-profile").or_(
-                page.locator("text=My Account").or_(
-                    page.locator(f"text={test_user['first_name']}").or_(
-                        page.locator(f"text={test_user['email']}")
-                    )
-                )
-            )
-        )
+        user_profile = user_profile_locator(page, test_user, selector_resolver)
         expect(user_profile).to_be_visible(timeout=10000)
         
         # Additional verification - check if we're redirected away from login/register
@@ -205,96 +113,109 @@ def test_user_registration_flow(page: Page) -> None:
         page.reload()
         expect(user_profile).to_be_visible(timeout=5000)  # Should still be logged in after reload
         
-        mark_test_status("passed", f"User registration and auto-signin successful for {test_user['email']}", page)
+        session_status.passed(f"User registration and auto-signin successful for {test_user.email}")
         
     except Exception as err:
         # Take screenshot on failure for debugging
-        screenshot_path = f"registration_failure_{random.randint(1000,9999)}.png"
-        page.screenshot(path=screenshot_path, full_page=True)
-        print(f"Screenshot saved: {screenshot_path}")
+        screenshots.take(page, "registration_failure", full_page=True)
+        print(f"Screenshot saved: {screenshots.path('registration_failure')}")
         
         # Clean error message
-        error_message = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>").replace("'", "")
+        error_message = clean_error(err)
         
-        mark_test_status("failed", error_message, page)
+        session_status.failed(error_message)
         pytest.fail(f"Registration test failed: {error_message}")
 
-def mark_test_status(status: str, message: str, page: Page) -> None:
-    """Mark test status with detailed message"""
-    print(f"{status.upper()}: {message}")
-    # Add your actual test reporting implementation here
-    # This could integrate with your test management system
-
 
-def test_checkout_process(page: Page) -> None:
+def test_checkout_process(authenticated_page: Page, session_status, step_timeouts, checkpoints) -> None:
     """Test the checkout process"""
-    try:
-        page.goto("https://testathon.live/", timeout=30000)
-        
+    # A flaky wait resumes from the filled cart, which the storefront keeps in
+    # storage. Filled-in forms only live in the page, so those steps are not
+    # checkpointed, and the order is never submitted twice.
+    flow = checkpoints(authenticated_page)
+    order = {}
+
+    @flow.step("cart")
+    def add_to_cart(page: Page) -> None:
         # Add product to cart
-        page.wait_for_selector("[data-test='product']", timeout=10000)
+        with step_timeouts.step("products", 10000) as timeout:
+            page.wait_for_selector("[data-test='product']", timeout=timeout)
         page.locator("[data-test='product']").first.locator("[data-test='add-to-cart']").click()
         
         # Wait for cart to update
-        page.wait_for_selector("[data-test='cart-count']", timeout=5000)
-        
+        with step_timeouts.step("cart-count", 5000) as timeout:
+            page.wait_for_selector("[data-test='cart-count']", timeout=timeout)
+
+    @flow.step("checkout-form", checkpoint=False)
+    def fill_checkout_form(page: Page) -> None:
         # Proceed to checkout
         page.locator("[data-test='checkout-button']").click()
-        page.wait_for_selector("[data-test='checkout-form']", timeout=5000)
+        with step_timeouts.step("checkout-form", 5000) as timeout:
+            page.wait_for_selector("[data-test='checkout-form']", timeout=timeout)
         
         # Fill checkout information
         page.locator("[data-test='shipping-address-input']").fill("123 Test Street")
         page.locator("[data-test='city-input']").fill("Test City")
         page.locator("[data-test='zipcode-input']").fill("12345")
         page.locator("[data-test='country-select']").select_option("US")
-        
+
+    @flow.step("payment", checkpoint=False)
+    def fill_payment(page: Page) -> None:
         # Continue to payment
         page.locator("[data-test='continue-to-payment']").click()
-        page.wait_for_selector("[data-test='payment-form']", timeout=5000)
+        with step_timeouts.step("payment-form", 5000) as timeout:
+            page.wait_for_selector("[data-test='payment-form']", timeout=timeout)
         
         # Fill payment information
         page.locator("[data-test='card-number-input']").fill("4111111111111111")
         page.locator("[data-test='expiry-date-input']").fill("12/25")
         page.locator("[data-test='cvv-input']").fill("123")
         page.locator("[data-test='card-name-input']").fill("Test User")
-        
+
+    @flow.step("order", retry=False)
+    def place_order(page: Page) -> None:
         # Place order
         page.locator("[data-test='place-order']").click()
         
         # Verify order confirmation
-        page.wait_for_selector("[data-test='order-confirmation']", timeout=15000)
+        with step_timeouts.step("order-confirmation", 15000) as timeout:
+            page.wait_for_selector("[data-test='order-confirmation']", timeout=timeout)
         expect(page.locator("[data-test='order-confirmation']")).to_be_visible()
         
         # Verify order details
-        order_number = page.locator("[data-test='order-number']").inner_text()
-        print(f"Order placed successfully. Order number: {order_number}")
+        order["number"] = page.locator("[data-test='order-number']").inner_text()
+
+    try:
+        flow.run()
+        print(f"Order placed successfully. Order number: {order['number']}")
         
-        mark_test_status("passed", f"Checkout process completed. Order #{order_number}", page)
+        session_status.passed(f"Checkout process completed. Order #{order['number']}")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>").replace("'", "")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_product_filtering(page: Page) -> None:
+def test_product_filtering(pooled_page: Page, session_status, step_timeouts) -> None:
     """Test product filtering functionality"""
+    page = pooled_page
     try:
-        page.goto("https://testathon.live/", timeout=30000)
-        
         # Wait for filters to load
-        page.wait_for_selector("[data-test='filter-category']", timeout=5000)
+        with step_timeouts.step("filter-category", 5000) as timeout:
+            page.wait_for_selector("[data-test='filter-category']", timeout=timeout)
         
         # Apply a filter
         page.locator("[data-test='filter-category']").select_option("electronics")
         page.locator("[data-test='apply-filters']").click()
         
         # Wait for filtered results
-        page.wait_for_selector("[data-test='filtered-products']", timeout=10000)
+        with step_timeouts.step("filtered-products", 10000) as timeout:
+            page.wait_for_selector("[data-test='filtered-products']", timeout=timeout)
         
         # Verify products are filtered
         products = page.locator("[data-test='product']")
-        expect(products).to_have_count(at_least=1)
+        expect(products.first).to_be_visible()
         
         # Check if products belong to the filtered category
         first_product_category = page.locator("[data-test='product-category']").first.inner_text()
@@ -302,32 +223,25 @@ def test_product_filtering(page: Page) -> None:
         
         print(f"Filter applied successfully. First product category: {first_product_category}")
         
-        mark_test_status("passed", "Product filtering works correctly", page)
+        session_status.passed("Product filtering works correctly")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>").replace("'", "")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def mark_test_status(status: str, reason: str, page: Page) -> None:
-    """Mark test status in BrowserStack"""
-    page.evaluate(
-        "_ => {}", 
-        f"browserstack_executor: {{\"action\": \"setSessionStatus\", \"arguments\": {{\"status\":\"{status}\", \"reason\": \"{reason}\"}}}}"
-    )
-
-
-
-
-def test_basic_page_loading(page: Page) -> None:
+def test_basic_page_loading(
+    page: Page, base_url: str, app_ready, screenshots, visual, session_status, step_timeouts
+) -> None:
     """Test that the page loads basic content"""
     try:
         # Navigate to the e-commerce platform
-        page.goto("https://testathon.live/", timeout=30000)
+        with step_timeouts.step("goto", 30000) as timeout:
+            page.goto(base_url, timeout=timeout)
         
-        # Wait for page to load completely (wait for network idle)
-        page.wait_for_load_state('networkidle')
+        # Wait for the DOM to settle (analytics pings are ignored)
+        app_ready(page)
         
         # Check page title
         expect(page).to_have_title("StackDemo")
@@ -339,31 +253,26 @@ def test_basic_page_loading(page: Page) -> None:
         print("✓ Page has content")
         
         # Take screenshot for debugging
-        page.screenshot(path="screenshots/page_loaded.png")
+        visual.assert_matches("page_loaded", screenshots.take(page, "page_loaded"))
         
-        mark_test_status("passed", "Page loaded successfully", page)
+        session_status.passed("Page loaded successfully")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_find_interactive_elements(page: Page) -> None:
+@pytest.mark.concurrent_readonly
+async def test_find_interactive_elements(async_page, base_url: str, session_status) -> None:
     """Test finding interactive elements on the page"""
+    page = async_page
     try:
-        page.goto("https://testathon.live/", timeout=30000)
-        page.wait_for_load_state('networkidle')
+        await page.goto(base_url, timeout=30000)
+        await wait_for_app_ready_async(page)
         
         print("🔍 Looking for interactive elements...")
         
-        # Look for common interactive elements
-        buttons = page.locator("button")
-        links = page.locator("a")
-        inputs = page.locator("input, select, textarea")
-        
-        print(f"Found {buttons.count()} buttons, {links.count()} links, {inputs.count()} inputs")
-        
         # Try to find elements by common patterns
         common_selectors = [
             "[class*='product']", "[class*='card']", "[class*='item']",
@@ -372,149 +281,136 @@ def test_find_interactive_elements(page: Page) -> None:
             "[class*='nav']", "[class*='header']", "[class*='footer']"
         ]
         
+        # Count everything and sample the first texts in one round trip
+        matches = await query_elements_async(
+            page, ["button", "a", "input, select, textarea"] + common_selectors, samples=2
+        )
+        buttons = matches["button"]
+        
+        # Look for common interactive elements
+        print(f"Found {buttons.count} buttons, {matches['a'].count} links, "
+              f"{matches['input, select, textarea'].count} inputs")
+        
         for selector in common_selectors:
-            elements = page.locator(selector)
-            if elements.count() > 0:
-                print(f"Found {elements.count()} elements with selector: {selector}")
-                for i in range(min(elements.count(), 2)):
-                    element = elements.nth(i)
-                    text = element.inner_text().strip()[:50]
+            match = matches[selector]
+            if match.count > 0:
+                print(f"Found {match.count} elements with selector: {selector}")
+                for text in match.samples:
                     if text:
                         print(f"  - '{text}...'")
         
         # Try to click first button if available
-        if buttons.count() > 0:
-            first_button = buttons.first
-            button_text = first_button.inner_text().strip()
+        if buttons.count > 0:
+            button_text = buttons.samples[0]
             print(f"Clicking button: '{button_text}'")
-            first_button.click()
-            time.sleep(2)  # Wait to see what happens
+            await page.locator("button").first.click()
+            await wait_for_app_ready_async(page)  # Wait to see what happens
             print("Button clicked successfully")
         
-        mark_test_status("passed", "Interactive elements test completed", page)
+        session_status.passed("Interactive elements test completed")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_page_structure_analysis(page: Page) -> None:
+@pytest.mark.concurrent_readonly
+async def test_page_structure_analysis(async_page, base_url: str, session_status) -> None:
     """Analyze the page structure to understand what's available"""
+    page = async_page
     try:
-        page.goto("https://testathon.live/", timeout=30000)
-        page.wait_for_load_state('networkidle')
+        await page.goto(base_url, timeout=30000)
+        await wait_for_app_ready_async(page)
         
         print("📊 Analyzing page structure...")
         
-        # Get all elements with classes
-        all_elements = page.locator("*")
-        class_elements = []
+        # Snapshot every element in a single round trip
+        snapshot = await dom_snapshot_async(page, "*", fields=["tag", "classes", "data"])
         
         # Sample some elements to understand structure
-        for i in range(min(all_elements.count(), 100)):
-            element = all_elements.nth(i)
-            class_name = element.get_attribute("class") or ""
-            tag_name = element.evaluate("el => el.tagName.toLowerCase()")
-            
-            if class_name:
-                class_elements.append((tag_name, class_name))
+        class_elements = snapshot.head(100).where(classes=bool)
         
         # Print unique classes
-        unique_classes = set(class_elements)
+        unique_classes = class_elements.unique("tag", "classes")
         print("Unique element classes found:")
         for tag, cls in sorted(unique_classes)[:20]:  # Show first 20
             print(f"  {tag}.{cls}")
         
         # Look for data attributes
-        data_attrs = page.locator("[data-]")
-        print(f"Found {data_attrs.count()} elements with data attributes")
-        
-        for i in range(min(data_attrs.count(), 10)):
-            element = data_attrs.nth(i)
-            attributes = element.evaluate("""
-                el => {
-                    const attrs = {};
-                    for (let attr of el.attributes) {
-                        if (attr.name.startsWith('data-')) {
-                            attrs[attr.name] = attr.value;
-                        }
-                    }
-                    return attrs;
-                }
-            """)
-            if attributes:
-                print(f"  Data attributes: {attributes}")
-        
-        mark_test_status("passed", "Page structure analysis completed", page)
+        data_elements = snapshot.where(data=bool)
+        print(f"Found {len(data_elements)} elements with data attributes")
+        
+        for attributes in data_elements["data"][:10]:
+            print(f"  Data attributes: {attributes}")
+        
+        session_status.passed("Page structure analysis completed")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_javascript_content_loading(page: Page) -> None:
+def test_javascript_content_loading(
+    page: Page, base_url: str, app_ready, screenshots, visual, session_status
+) -> None:
     """Test if content is loaded via JavaScript after page load"""
     try:
-        page.goto("https://testathon.live/", timeout=30000)
+        page.goto(base_url, timeout=30000)
         
         # Wait for different states to see when content appears
         page.wait_for_load_state('domcontentloaded')
         print("DOM content loaded")
         
-        # Wait a bit for JavaScript to execute
-        time.sleep(3)
-        
-        # Check if content appears after some time
+        # Check what content is there before JavaScript has finished
         body_text = page.locator("body").inner_text()
-        print(f"Body content after 3 seconds: {body_text[:200]}...")
+        print(f"Body content at DOM content loaded: {body_text[:200]}...")
         
-        # Wait for network idle
-        page.wait_for_load_state('networkidle')
-        print("Network idle state reached")
+        # Wait for JavaScript rendering and requests to settle
+        waited_ms = app_ready(page, replaces_ms=3000)
+        print(f"App ready after {waited_ms:.0f} ms")
         
         # Check content again
         body_text_after = page.locator("body").inner_text()
-        print(f"Body content after network idle: {body_text_after[:200]}...")
+        print(f"Body content once app is ready: {body_text_after[:200]}...")
         
         # Take screenshots at different stages
-        page.screenshot(path="screenshots/dom_loaded.png")
-        time.sleep(2)
-        page.screenshot(path="screenshots/after_wait.png")
+        screenshots.take(page, "dom_loaded")
+        app_ready(page, replaces_ms=2000)
+        visual.assert_matches("after_wait", screenshots.take(page, "after_wait"))
         
-        mark_test_status("passed", "JavaScript content loading test completed", page)
+        session_status.passed("JavaScript content loading test completed")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def test_element_visibility_check(page: Page) -> None:
+def test_element_visibility_check(page: Page, base_url: str, app_ready, element_query, session_status) -> None:
     """Check what elements become visible over time"""
     try:
-        page.goto("https://testathon.live/", timeout=30000)
-        
-        # Check visibility at different intervals
-        for seconds in [1, 2, 3, 5, 10]:
-            time.sleep(1)
-            print(f"\nAfter {seconds} seconds:")
-            
-            # Count visible elements
-            visible_elements = page.locator(":visible")
-            print(f"  Visible elements: {visible_elements.count()}")
-            
-            # Check for specific element types
-            for element_type in ["button", "a", "input", "div"]:
-                elements = page.locator(element_type)
-                visible_count = elements.count()
-                if visible_count > 0:
-                    print(f"  {element_type}: {visible_count}")
-        
-        # Final check after waiting
-        page.wait_for_timeout(5000)  # Wait 5 more seconds
-        final_visible = page.locator(":visible").count()
+        page.goto(base_url, timeout=30000)
+        
+        # Check visibility before and after the app settles
+        element_types = ["button", "a", "input", "div"]
+        page.wait_for_load_state('domcontentloaded')
+        matches = element_query(page, ["*"], count_visible=True)
+        print("\nAt DOM content loaded:")
+        print(f"  Visible elements: {matches['*'].visible}")
+        
+        waited_ms = app_ready(page, replaces_ms=10000)
+        print(f"\nAfter app ready ({waited_ms:.0f} ms):")
+        
+        # Check for specific element types
+        matches = element_query(page, ["*"] + element_types, count_visible=True)
+        for element_type in element_types:
+            visible_count = matches[element_type].visible
+            if visible_count > 0:
+                print(f"  {element_type}: {visible_count}")
+        
+        final_visible = matches["*"].visible
         print(f"\nFinal visible elements: {final_visible}")
         
         if final_visible > 10:  # If we have reasonable content
@@ -522,26 +418,14 @@ def test_element_visibility_check(page: Page) -> None:
         else:
             print("⚠ Limited content visible - may be a loading issue")
         
-        mark_test_status("passed", "Element visibility check completed", page)
+        session_status.passed("Element visibility check completed")
         
     except Exception as err:
-        error = str(err).split("Call log:")[0].replace("\n", " ").replace(":", "=>")
-        mark_test_status("failed", error, page)
+        error = clean_error(err)
+        session_status.failed(error)
         raise pytest.fail(error)
 
 
-def mark_test_status(status: str, reason: str, page: Page) -> None:
-    """Mark test status in BrowserStack"""
-    try:
-        page.evaluate(
-            "_ => {}", 
-            f"browserstack_executor: {{\"action\": \"setSessionStatus\", \"arguments\": {{\"status\":\"{status}\", \"reason\": \"{reason}\"}}}}"
-        )
-    except:
-        # If BrowserStack integration fails, just print for local testing
-        print(f"Test status: {status} - {reason}")
-
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
 if __name__ == "__main__":
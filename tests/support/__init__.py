@@ -0,0 +1 @@
+"""Shared fixtures and helpers for the Playwright BrowserStack sample tests."""
@@ -0,0 +1,271 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadScopeScheduling
+from xdist.workermanage import WorkerController
+
+MARKER = "affinity"
+# Handed from the first worker to the controller, which does not collect
+SCOPES_KEY = "affinity/scopes"
+# Fixtures whose per-worker state is worth reusing, and the affinity they imply
+FIXTURE_AFFINITY = {
+    "authenticated_page": "signed-in",
+    "pooled_page": "page-pool",
+}
+# xdist workers hold back their last queued test until they know the next one,
+# so a worker with fewer pending tests than this is about to go idle
+MIN_PENDING = 2
+# Undocumented parts of xdist the scheduler builds on, checked before it is used
+XDIST_INTERNALS = (
+    (LoadScopeScheduling, ("_assign_work_unit", "_pending_of", "_check_nodes_have_same_collection")),
+    (WorkerController, ("send_steal", "shutting_down")),
+)
+
+
+def xdist_supports_affinity() -> bool:
+    """Whether the installed xdist has everything AffinityScheduling relies on"""
+    return all(hasattr(cls, name) for cls, names in XDIST_INTERNALS for name in names)
+
+
+def affinity_of(item: pytest.Item) -> Optional[str]:
+    """The affinity marker's name, else the affinity of the first stateful fixture the test uses"""
+    marker = item.get_closest_marker(MARKER)
+    if marker is not None:
+        return str(marker.args[0] if marker.args else marker.kwargs["name"])
+    fixturenames = getattr(item, "fixturenames", ())
+    return next((name for fixture, name in FIXTURE_AFFINITY.items() if fixture in fixturenames), None)
+
+
+def scope_of(item: pytest.Item) -> str:
+    """Work unit for item: an xdist_group (never split), an affinity (split only to balance) or itself"""
+    groups = sorted(
+        str(mark.args[0] if mark.args else mark.kwargs.get("name", "default"))
+        for mark in item.iter_markers("xdist_group")
+    )
+    if groups:
+        return "group:" + "_".join(groups)
+    affinity = affinity_of(item)
+    return f"affinity:{affinity}" if affinity else item.nodeid
+
+
+def uses_affinity(config: pytest.Config) -> bool:
+    """Whether an xdist run is scheduled by AffinityScheduling, on the controller or a worker"""
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        # Workers see --dist as "no"; the controller passes its decision on
+        return bool(workerinput.get("affinity"))
+    return (
+        config.getoption("dist", None) == "load"
+        and config.getoption("affinity", False)
+        and xdist_supports_affinity()
+    )
+
+
+@dataclass
+class AffinityStats:
+    units: int = 0
+    groups: Dict[str, int] = field(default_factory=dict)
+    steals: int = 0
+    stolen: int = 0
+
+
+AFFINITY_STATS = pytest.StashKey[AffinityStats]()
+
+
+class AffinityScheduling(LoadScopeScheduling):
+    """Sends tests with the same setup affinity to one worker, stealing to rebalance
+
+    Work units are built from the scopes the first worker collected (see
+    scope_of). Once the queue of units is empty, a worker that is about to go
+    idle steals half of the affinity-group tests another worker still has
+    queued. Tests pinned with xdist_group are never split.
+    """
+
+    def __init__(self, config: pytest.Config, log: Optional[Producer] = None) -> None:
+        super().__init__(config, log)
+        self.log = Producer("affinitysched") if log is None else log.affinitysched
+        self.scopes: Dict[str, str] = {}
+        # Tests moved by a steal run as a unit of their own
+        self.unit_of: Dict[str, str] = {}
+        self.steal_requested_from: Optional[WorkerController] = None
+        self.stats = config.stash.setdefault(AFFINITY_STATS, AffinityStats())
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self._reschedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = list(next(iter(self.registered_collections.values())))
+        if not self.collection:
+            return
+        self._load_scopes()
+        units: Dict[str, Dict[str, bool]] = {}
+        for nodeid in self.collection:
+            units.setdefault(self._split_scope(nodeid), {})[nodeid] = False
+        # Largest units first, as --dist loadscope does by default
+        for scope, work in sorted(units.items(), key=lambda unit: -len(unit[1])):
+            self.workqueue[scope] = work
+        self.stats.units = len(units)
+        for scope, work in units.items():
+            if scope.startswith(("affinity:", "group:")):
+                self.stats.groups[scope] = len(work)
+        # Unlike loadscope, workers are not shut down once every unit is handed
+        # out (nor when there are more workers than units): they stay up to steal
+        for node in self.nodes:
+            if self.workqueue:
+                self._assign_work_unit(node)
+        for node in self.nodes:
+            self._reschedule(node)
+
+    def _load_scopes(self) -> None:
+        cache = getattr(self.config, "cache", None)
+        saved = cache.get(SCOPES_KEY, {}) if cache else {}
+        node = next(iter(self.registered_collections))
+        if saved.get("run") != node.workerinput["testrunuid"]:
+            self.log("no scopes from this run's workers; scheduling every test on its own")
+            return
+        self.scopes = saved["scopes"]
+
+    def _split_scope(self, nodeid: str) -> str:
+        return self.scopes.get(nodeid, nodeid)
+
+    def _unit(self, nodeid: str) -> str:
+        return self.unit_of.get(nodeid) or self._split_scope(nodeid)
+
+    def mark_test_complete(
+        self, node: WorkerController, item_index: int, duration: float = 0
+    ) -> None:
+        nodeid = self.registered_collections[node][item_index]
+        self.assigned_work[node][self._unit(nodeid)][nodeid] = True
+        self._reschedule(node)
+
+    def _reschedule(self, node: WorkerController) -> None:
+        if node.shutting_down:
+            return
+        pending = self._pending_of(self.assigned_work[node])
+        if self.workqueue:
+            if pending <= MIN_PENDING:
+                self._assign_work_unit(node)
+            return
+        if pending < MIN_PENDING:
+            self._steal_for(node)
+
+    def _stealable(self, node: WorkerController) -> List[str]:
+        return [
+            nodeid
+            for unit, work in self.assigned_work[node].items()
+            if not unit.startswith("group:")
+            for nodeid, completed in work.items()
+            if not completed
+        ]
+
+    def _steal_for(self, node: WorkerController) -> None:
+        if self.steal_requested_from is not None:
+            # Every idle worker is rescheduled once the answer arrives
+            return
+        candidates = [
+            (other, self._stealable(other), self._pending_of(self.assigned_work[other]))
+            for other in self.nodes
+            if other is not node and not other.shutting_down
+        ]
+        victim, stealable, pending = max(
+            candidates, key=lambda candidate: len(candidate[1]), default=(None, [], 0)
+        )
+        count = min(len(stealable) // 2, pending - MIN_PENDING)
+        if victim is None or count <= 0:
+            # Nothing left to balance, so let the worker run its last test and finish
+            node.shutdown()
+            return
+        collection = self.registered_collections[victim]
+        victim.send_steal([collection.index(nodeid) for nodeid in stealable[-count:]])
+        self.steal_requested_from = victim
+
+    def remove_pending_tests_from_node(self, node: WorkerController, indices: Sequence[int]) -> None:
+        """Requeue the tests a worker gave back after a steal request"""
+        self.steal_requested_from = None
+        moved: Dict[str, List[str]] = {}
+        for index in indices:
+            nodeid = self.registered_collections[node][index]
+            unit = self._unit(nodeid)
+            del self.assigned_work[node][unit][nodeid]
+            if not self.assigned_work[node][unit]:
+                del self.assigned_work[node][unit]
+            moved.setdefault(unit, []).append(nodeid)
+        for unit, nodeids in moved.items():
+            self.stats.steals += 1
+            self.stats.stolen += len(nodeids)
+            key = f"{unit}~{self.stats.steals}"
+            self.workqueue[key] = dict.fromkeys(nodeids, False)
+            self.workqueue.move_to_end(key, last=False)
+            self.unit_of.update(dict.fromkeys(nodeids, key))
+        # Idle workers first, so the stolen tests do not go back where they came from
+        for other in sorted(self.nodes, key=lambda other: self._pending_of(self.assigned_work[other])):
+            self._reschedule(other)
+
+    def remove_node(self, node: WorkerController) -> Optional[str]:
+        if node is self.steal_requested_from:
+            self.steal_requested_from = None
+        return super().remove_node(node)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("affinity", "affinity-aware xdist scheduling")
+    group.addoption(
+        "--affinity",
+        action="store_true",
+        help="With -n, send tests that share per-worker setup to the same worker instead of "
+        "xdist's plain load scheduling",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        f"{MARKER}(name): run on the same xdist worker as other tests with this affinity, "
+        "so per-worker state such as signed-in contexts is reused",
+    )
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None and config.getoption("affinity") and not xdist_supports_affinity():
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                "--affinity needs a pytest-xdist release from requirements.txt; using xdist's own scheduling"
+            ),
+            stacklevel=2,
+        )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    # trylast, so xdist_group markers added by other plugins are already there
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None or workerinput["workerid"] != "gw0" or not uses_affinity(config):
+        return
+    if getattr(config, "cache", None) is not None:
+        scopes = {item.nodeid: scope_of(item) for item in items}
+        config.cache.set(SCOPES_KEY, {"run": workerinput["testrunuid"], "scopes": scopes})
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: WorkerController) -> None:
+    node.workerinput["affinity"] = uses_affinity(node.config)
+
+
+@pytest.hookimpl(optionalhook=True, tryfirst=True)
+def pytest_xdist_make_scheduler(config: pytest.Config, log: Producer) -> Optional[AffinityScheduling]:
+    return AffinityScheduling(config, log) if uses_affinity(config) else None
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(AFFINITY_STATS, None)
+    if stats is None or not stats.units:
+        return
+    terminalreporter.write_sep("-", "affinity scheduling")
+    groups = ", ".join(f"{scope} ({count})" for scope, count in sorted(stats.groups.items()))
+    terminalreporter.write_line(f"{stats.units} work units; groups: {groups or 'none'}")
+    terminalreporter.write_line(f"{stats.steals} steal(s) moved {stats.stolen} test(s) between workers")
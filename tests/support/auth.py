@@ -0,0 +1,314 @@
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import expect
+
+from support.config import platform_key, slugify, worker_id
+from support.locators import SelectorResolver
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Locator, Page
+
+DEFAULT_MAX_AGE = 3600
+
+
+@dataclass
+class TestUser:
+    """Credentials used to sign up or sign in on the storefront"""
+
+    __test__ = False
+
+    email: str
+    password: str
+    first_name: str = "Test"
+    last_name: str = "User"
+
+    @classmethod
+    def generate(cls, prefix: str = "testuser") -> "TestUser":
+        timestamp = random.randint(1000, 9999)
+        return cls(
+            email=f"{prefix}{timestamp}@example.com",
+            password="SecurePassword123!",
+            last_name=f"User{timestamp}",
+        )
+
+
+def user_profile_selectors(user: Optional[TestUser] = None) -> List[str]:
+    """Alternatives for the signed-in indicator, most specific first"""
+    selectors = ["[data-test='user-profile']", ".user-profile", "text=My Account"]
+    if user is not None:
+        selectors += [f"text={user.first_name}", f"text={user.email}"]
+    return selectors
+
+
+def user_profile_locator(
+    page: "Page",
+    user: Optional[TestUser] = None,
+    resolver: Optional[SelectorResolver] = None,
+    timeout: float = 10000,
+) -> "Locator":
+    """Whichever signed-in indicator is visible, waiting up to timeout for one"""
+    resolver = resolver or SelectorResolver()
+    return resolver.locate(page, "user-profile", user_profile_selectors(user), timeout=timeout)
+
+
+def is_signed_in(page: "Page", timeout: float = 5000, resolver: Optional[SelectorResolver] = None) -> bool:
+    """Whether the current page shows a signed-in user"""
+    try:
+        user_profile_locator(page, resolver=resolver, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def sign_up(
+    page: "Page",
+    user: TestUser,
+    base_url: str,
+    timeout: float = 30000,
+    resolver: Optional[SelectorResolver] = None,
+) -> None:
+    """Register user through the sign-up modal and wait for the welcome message"""
+    resolver = resolver or SelectorResolver()
+    page.goto(base_url, timeout=timeout)
+    page.wait_for_selector("#_next", timeout=10000)
+
+    resolver.locate(
+        page, "register-link", ["[data-test='register-link']", "text=Sign Up", "text=Register"], timeout=5000
+    ).click()
+    resolver.locate(
+        page,
+        "registration-form",
+        ["[data-test='registration-form']", ".Modal_modal_310HK", ".login_wrapper"],
+        timeout=10000,
+    )
+
+    email_input = resolver.locate(
+        page, "email-input", ["[data-test='email-input']", "input[type='email']", "input[name='email']"]
+    )
+    email_input.fill(user.email)
+    resolver.locate(
+        page, "password-input", ["[data-test='password-input']", "input[type='password'] >> nth=0"]
+    ).fill(user.password)
+    resolver.locate(
+        page,
+        "confirm-password-input",
+        ["[data-test='confirm-password-input']", "input[type='password'] >> nth=1"],
+    ).fill(user.password)
+    first_name_input = resolver.locate(
+        page,
+        "first-name-input",
+        ["[data-test='first-name-input']", "input[name='firstName']", "input[name='firstname']"],
+    )
+    first_name_input.fill(user.first_name)
+    resolver.locate(
+        page,
+        "last-name-input",
+        ["[data-test='last-name-input']", "input[name='lastName']", "input[name='lastname']"],
+    ).fill(user.last_name)
+
+    expect(email_input).to_have_value(user.email)
+    expect(first_name_input).to_have_value(user.first_name)
+
+    submit_button = resolver.locate(
+        page,
+        "register-submit",
+        [
+            "[data-test='register-submit']",
+            "button[type='submit']",
+            "button:has-text('Register')",
+            "button:has-text('Sign Up')",
+        ],
+    )
+    expect(submit_button).to_be_enabled()
+    submit_button.click()
+
+    resolver.locate(
+        page,
+        "welcome-message",
+        ["[data-test='welcome-message']", "text=Welcome", "text=Success", "text=Account created"],
+        timeout=15000,
+    )
+
+
+def sign_in(
+    page: "Page",
+    user: TestUser,
+    base_url: str,
+    timeout: float = 30000,
+    resolver: Optional[SelectorResolver] = None,
+) -> None:
+    """Sign an existing user in through the login modal"""
+    resolver = resolver or SelectorResolver()
+    page.goto(base_url, timeout=timeout)
+    page.wait_for_selector("#_next", timeout=10000)
+
+    resolver.locate(page, "login-link", ["[data-test='login-link']", "text=Sign In", "text=Log In"]).click()
+    resolver.locate(
+        page, "email-input", ["[data-test='email-input']", "input[type='email']", "input[name='email']"]
+    ).fill(user.email)
+    resolver.locate(
+        page, "password-input", ["[data-test='password-input']", "input[type='password'] >> nth=0"]
+    ).fill(user.password)
+    resolver.locate(page, "login-submit", ["[data-test='login-submit']", "button[type='submit']"]).click()
+    user_profile_locator(page, user, resolver)
+
+
+class AuthStateCache:
+    """Playwright storage_state files on disk, keyed by platform and user"""
+
+    def __init__(self, root: Path, platform: str, max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.root = Path(root)
+        self.platform = platform
+        self.max_age = max_age
+
+    def path_for(self, email: str) -> Path:
+        return self.root / f"{self.platform}--{slugify(email)}.json"
+
+    def load(self, email: str) -> Optional[Path]:
+        """Path of a fresh cached state for email, dropping it if it has expired"""
+        path = self.path_for(email)
+        if not path.exists():
+            return None
+        if not self.is_fresh(path):
+            self.invalidate(email)
+            return None
+        return path
+
+    def save(self, context: "BrowserContext", email: str) -> Path:
+        """Write the context's storage state atomically and return its path"""
+        path = self.path_for(email)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        context.storage_state(path=str(tmp_path))
+        os.replace(tmp_path, path)
+        return path
+
+    def invalidate(self, email: str) -> None:
+        try:
+            self.path_for(email).unlink()
+        except FileNotFoundError:
+            pass
+
+    def is_fresh(self, path: Path, now: Optional[float] = None) -> bool:
+        """False once max_age has passed or any persistent cookie has expired"""
+        now = time.time() if now is None else now
+        if now - path.stat().st_mtime > self.max_age:
+            return False
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        expiries = [c["expires"] for c in state.get("cookies", []) if c.get("expires", -1) > 0]
+        return not expiries or min(expiries) > now
+
+
+class AuthSession:
+    """Signs a worker's user in once and hands out the cached storage state"""
+
+    def __init__(
+        self,
+        browser: "Browser",
+        cache: AuthStateCache,
+        user: TestUser,
+        base_url: str,
+        context_args: Optional[Dict[str, Any]] = None,
+        registered: bool = False,
+        resolver: Optional[SelectorResolver] = None,
+    ) -> None:
+        self.browser = browser
+        self.cache = cache
+        self.user = user
+        self.base_url = base_url
+        self.context_args = dict(context_args or {})
+        self.registered = registered
+        self.resolver = resolver
+
+    def storage_state(self) -> str:
+        """Cached storage state path, signing in first if there is none"""
+        path = self.cache.load(self.user.email)
+        return str(path) if path else self.refresh()
+
+    def refresh(self) -> str:
+        """Sign in (falling back to sign up) and store the resulting state"""
+        context = self.browser.new_context(**self.context_args)
+        try:
+            page = context.new_page()
+            first, second = (sign_in, sign_up) if self.registered else (sign_up, sign_in)
+            try:
+                first(page, self.user, self.base_url, resolver=self.resolver)
+            except (AssertionError, PlaywrightError):
+                second(page, self.user, self.base_url, resolver=self.resolver)
+            self.registered = True
+            return str(self.cache.save(context, self.user.email))
+        finally:
+            context.close()
+
+    def invalidate(self) -> None:
+        self.cache.invalidate(self.user.email)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("auth", "cached authentication state")
+    group.addoption(
+        "--auth-state-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE,
+        help="Seconds a cached storage_state stays valid (default: %(default)s)",
+    )
+
+
+@pytest.fixture(scope="session")
+def auth_user() -> TestUser:
+    """User shared by every authenticated test on this worker"""
+    email = os.environ.get("TESTATHON_USER_EMAIL")
+    password = os.environ.get("TESTATHON_USER_PASSWORD")
+    if email and password:
+        return TestUser(email=email, password=password)
+    # Stable per platform and worker so the cached state can be reused across runs
+    name = f"testuser-{platform_key()}-{worker_id()}"
+    return TestUser(email=f"{name}@example.com", password="SecurePassword123!", last_name=name)
+
+
+@pytest.fixture(scope="session")
+def auth_session(
+    pytestconfig: pytest.Config,
+    browser: "Browser",
+    browser_context_args: Dict[str, Any],
+    auth_user: TestUser,
+    base_url: str,
+    selector_resolver: SelectorResolver,
+) -> AuthSession:
+    cache = AuthStateCache(
+        pytestconfig.cache.mkdir("auth-state"),
+        platform_key(),
+        max_age=pytestconfig.getoption("auth_state_max_age"),
+    )
+    registered = "TESTATHON_USER_EMAIL" in os.environ or cache.path_for(auth_user.email).exists()
+    return AuthSession(
+        browser, cache, auth_user, base_url, browser_context_args, registered, selector_resolver
+    )
+
+
+@pytest.fixture
+def authenticated_page(
+    new_context: Any, auth_session: AuthSession, base_url: str, selector_resolver: SelectorResolver
+) -> Generator["Page", None, None]:
+    """Page in a context restored from the cached storage state, already on base_url"""
+    page = new_context(storage_state=auth_session.storage_state()).new_page()
+    page.goto(base_url, timeout=30000)
+    if not is_signed_in(page, resolver=selector_resolver):
+        # The cached cookies were rejected, so sign in again and retry once
+        auth_session.invalidate()
+        page.context.close()
+        page = new_context(storage_state=auth_session.refresh()).new_page()
+        page.goto(base_url, timeout=30000)
+    yield page
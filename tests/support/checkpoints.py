@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Optional, Tuple
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Page
+
+Step = Callable[["Page"], Any]
+
+
+def is_retryable(err: BaseException) -> bool:
+    """Failed waits and expect() timeouts; anything else is a real failure"""
+    if isinstance(err, PlaywrightTimeoutError):
+        return True
+    if not isinstance(err, AssertionError):
+        return False
+    # expect() raises a plain AssertionError, so tell it apart by where it was raised
+    traceback = err.__traceback__
+    while traceback is not None and traceback.tb_next is not None:
+        traceback = traceback.tb_next
+    return traceback is not None and traceback.tb_frame.f_globals.get("__name__", "").startswith("playwright.")
+
+
+@dataclass
+class Checkpoint:
+    """State after a step: enough to open a new context that carries on from it"""
+
+    step: str
+    url: str
+    storage_state: Dict[str, Any]
+    # Index of the step to run after resuming from here
+    next_step: int
+
+
+@dataclass
+class CheckpointStats:
+    flows: int = 0
+    retried_steps: int = 0
+    # Steps a rerun from scratch would have repeated but a resume did not
+    skipped_steps: int = 0
+
+
+CHECKPOINT_STATS = pytest.StashKey[CheckpointStats]()
+
+
+class CheckpointedFlow:
+    """Named steps run in order, resuming from the last good checkpoint when one fails
+
+    After every step the context's storage_state and the page URL are saved,
+    unless the step was added with checkpoint=False. When a step times out
+    or an expect() assertion fails, a new context is opened from the last
+    checkpoint, navigated back to its URL, and the flow carries on with the
+    step after that checkpoint. State only held in page memory, such as a
+    filled-in form, does not survive a resume, so only checkpoint after steps
+    that leave what later steps need in cookies, storage or the URL. Steps
+    added with retry=False, such as submitting an order, fail the flow
+    instead of running again.
+    """
+
+    def __init__(
+        self,
+        new_context: Callable[..., "BrowserContext"],
+        page: "Page",
+        retries: int = 1,
+        stats: Optional[CheckpointStats] = None,
+    ) -> None:
+        self.new_context = new_context
+        self.page = page
+        self.retries = retries
+        self.stats = stats or CheckpointStats()
+        self.steps: List[Tuple[str, Step, bool, bool]] = []
+        self.checkpoints: List[Checkpoint] = []
+        self.retried_steps = 0
+
+    def step(self, name: str, checkpoint: bool = True, retry: bool = True) -> Callable[[Step], Step]:
+        """Decorator adding a step that takes the current page"""
+
+        def register(function: Step) -> Step:
+            self.steps.append((name, function, checkpoint, retry))
+            return function
+
+        return register
+
+    def checkpoint(self, step: str, next_step: int) -> Checkpoint:
+        checkpoint = Checkpoint(step, self.page.url, self.page.context.storage_state(), next_step)
+        self.checkpoints.append(checkpoint)
+        return checkpoint
+
+    def resume(self, checkpoint: Checkpoint) -> "Page":
+        """Open a page in a new context restored to checkpoint"""
+        # The failed context stays open for tracing and session status
+        self.page = self.new_context(storage_state=checkpoint.storage_state).new_page()
+        if checkpoint.url != "about:blank":
+            self.page.goto(checkpoint.url)
+        return self.page
+
+    def run(self) -> "Page":
+        """Run every step and return the page the flow finished on"""
+        self.stats.flows += 1
+        self.checkpoint("start", 0)
+        retries = self.retries
+        index = 0
+        while index < len(self.steps):
+            name, function, checkpoint, retry = self.steps[index]
+            try:
+                function(self.page)
+            except Exception as err:
+                if not retry or retries <= 0 or not is_retryable(err):
+                    raise
+                retries -= 1
+                last = self.checkpoints[-1]
+                print(f"Step '{name}' failed ({type(err).__name__}); resuming from checkpoint '{last.step}'")
+                self.stats.skipped_steps += last.next_step
+                self.retried_steps += 1
+                self.stats.retried_steps += 1
+                self.resume(last)
+                index = last.next_step
+                continue
+            index += 1
+            if checkpoint:
+                self.checkpoint(name, index)
+        return self.page
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("checkpoints", "step checkpointing")
+    group.addoption(
+        "--checkpoint-retries",
+        type=int,
+        default=1,
+        help="Times a checkpointed flow resumes from its last good step before failing (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[CHECKPOINT_STATS] = CheckpointStats()
+
+
+@pytest.fixture
+def checkpoints(
+    new_context: Callable[..., "BrowserContext"], pytestconfig: pytest.Config, request: pytest.FixtureRequest
+) -> Generator[Callable[["Page"], CheckpointedFlow], None, None]:
+    """Factory for a CheckpointedFlow starting on a page of this test"""
+    flows: List[CheckpointedFlow] = []
+
+    def _flow(page: "Page") -> CheckpointedFlow:
+        retries = pytestconfig.getoption("checkpoint_retries")
+        flow = CheckpointedFlow(new_context, page, retries, pytestconfig.stash[CHECKPOINT_STATS])
+        flows.append(flow)
+        return flow
+
+    yield _flow
+    retried = sum(flow.retried_steps for flow in flows)
+    if retried:
+        request.node.user_properties.append(("retried_steps", retried))
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(CHECKPOINT_STATS, None)
+    if not stats or not stats.retried_steps:
+        return
+    terminalreporter.write_sep("-", "checkpointed flows")
+    terminalreporter.write_line(
+        f"{stats.retried_steps} step(s) retried from checkpoints across {stats.flows} flow(s); "
+        f"rerunning from scratch would have repeated {stats.skipped_steps} more"
+    )
@@ -0,0 +1,337 @@
+import asyncio
+import inspect
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, List, Optional, Set, TextIO
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page, async_playwright
+
+from support.affinity import uses_affinity
+from support.result_cache import CACHED_PASS
+from support.status import (
+    STATUS_REPORTER,
+    STATUS_STATS,
+    BrowserStackBackend,
+    StatusBackend,
+    StatusEvent,
+    StatusReporter,
+    StatusStats,
+    clean_error,
+    executor_command,
+)
+
+MARKER = "concurrent_readonly"
+# The batch runs tests before pytest sets up their own fixtures, so these
+# are the only arguments a concurrent test can take.
+BATCH_ARGUMENTS = {"async_page", "base_url", "session_status"}
+
+
+@dataclass
+class BatchSettings:
+    """What the batch runner needs to start its own async browser"""
+
+    browser_name: str
+    launch_args: Dict[str, Any]
+    context_args: Dict[str, Any]
+    connect_options: Optional[Dict[str, Any]]
+    base_url: str
+    status_backend: StatusBackend
+    status_stats: Optional[StatusStats] = None
+
+    @property
+    def executor(self) -> bool:
+        """Whether tests report to the batch's own BrowserStack session"""
+        return isinstance(self.status_backend, BrowserStackBackend)
+
+
+@dataclass
+class BatchOutcome:
+    """One test's result from a batch, replayed when pytest reaches that test"""
+
+    error: Optional[BaseException]
+    output: str
+    duration: float
+
+
+@dataclass
+class ConcurrentStats:
+    batches: int = 0
+    tests: int = 0
+    wall_seconds: float = 0.0
+    test_seconds: float = 0.0
+
+
+@dataclass
+class BatchState:
+    outcomes: Dict[str, BatchOutcome] = field(default_factory=dict)
+    reported: Set[str] = field(default_factory=set)
+    stats: ConcurrentStats = field(default_factory=ConcurrentStats)
+
+
+BATCH_STATE = pytest.StashKey[BatchState]()
+# Set on each item when its outcome is replayed
+BATCH_OUTCOME = pytest.StashKey[BatchOutcome]()
+
+_task_output: ContextVar[Optional[io.StringIO]] = ContextVar("_task_output", default=None)
+
+
+class _TaskStdout(io.TextIOBase):
+    """Routes print() from each batch task into that task's own buffer"""
+
+    def __init__(self, fallback: TextIO) -> None:
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        buffer = _task_output.get()
+        return (buffer or self.fallback).write(text)
+
+    def flush(self) -> None:
+        self.fallback.flush()
+
+
+async def _send(page: Page, action: str, arguments: Dict[str, Any]) -> bool:
+    try:
+        await page.evaluate("_ => {}", executor_command(action, arguments))
+    except PlaywrightError:
+        return False
+    return True
+
+
+async def _annotate(page: Page, reporter: StatusReporter) -> None:
+    """Send a test's queued events to the batch's session, with its status as an annotation
+
+    All tests of the batch share that session, so only the batch sets its status.
+    """
+    batch = reporter.batched()
+    reporter.stats.merged += len(reporter.events) - len(batch)
+    reporter.events = []
+    if not batch or batch[-1].action != "setSessionStatus":
+        batch.append(StatusEvent("setSessionStatus", {"status": "passed", "reason": ""}))
+    for event in batch:
+        arguments = event.arguments
+        if event.action == "setSessionStatus":
+            result = f"{arguments['status']}: {arguments['reason']}" if arguments["reason"] else arguments["status"]
+            level = "error" if arguments["status"] == "failed" else "info"
+            arguments = {"data": f"{reporter.nodeid} {result}", "level": level}
+        started = time.perf_counter()
+        sent = await _send(page, "annotate", arguments)
+        reporter.stats.seconds += time.perf_counter() - started
+        if sent:
+            reporter.stats.calls += 1
+        else:
+            reporter.stats.failed += 1
+
+
+async def run_batch(
+    items: List[pytest.Function], settings: BatchSettings, max_pages: int
+) -> Dict[str, BatchOutcome]:
+    """Run async tests concurrently, one page each, in a single browser context
+
+    Each test gets a session_status of its own. Locally its events go to the
+    status backend as usual. The batch has a browser of its own, which on
+    BrowserStack is a session of its own: there each test's events and result
+    are annotated in that session, and the session is marked failed if any of
+    the tests failed.
+    """
+    async with async_playwright() as playwright:
+        browser_type = getattr(playwright, settings.browser_name)
+        if settings.connect_options:
+            browser = await browser_type.connect(**settings.connect_options)
+        else:
+            browser = await browser_type.launch(**settings.launch_args)
+        context = await browser.new_context(**settings.context_args)
+        slots = asyncio.Semaphore(max_pages)
+
+        async def run(item: pytest.Function) -> BatchOutcome:
+            output = io.StringIO()
+            _task_output.set(output)
+            async with slots:
+                page = await context.new_page()
+                reporter = StatusReporter(item.nodeid, settings.status_backend, settings.status_stats)
+                arguments = {"async_page": page, "base_url": settings.base_url, "session_status": reporter}
+                started = time.perf_counter()
+                error: Optional[BaseException] = None
+                try:
+                    await item.obj(**{name: arguments[name] for name in _argnames(item)})
+                except (KeyboardInterrupt, SystemExit):
+                    raise
+                except BaseException as exc:  # pytest.fail raises a BaseException
+                    error = exc
+                duration = time.perf_counter() - started
+                if error is not None and not reporter.has_status:
+                    reporter.failed(clean_error(error))
+                if settings.executor:
+                    await _annotate(page, reporter)
+                else:
+                    reporter.flush(None)
+                await page.close()
+            return BatchOutcome(error, output.getvalue(), duration)
+
+        try:
+            results = await asyncio.gather(*(run(item) for item in items))
+            if settings.executor:
+                failures = [
+                    f"{item.nodeid}: {clean_error(result.error)}"
+                    for item, result in zip(items, results)
+                    if result.error is not None
+                ]
+                status = "failed" if failures else "passed"
+                reason = "; ".join(failures) or f"{len(items)} concurrent_readonly tests passed"
+                await _send(await context.new_page(), "setSessionStatus", {"status": status, "reason": reason})
+        finally:
+            await context.close()
+            await browser.close()
+    return {item.nodeid: result for item, result in zip(items, results)}
+
+
+def _argnames(item: pytest.Function) -> List[str]:
+    return list(inspect.signature(item.obj).parameters)
+
+
+def _browser_name(item: pytest.Item) -> Optional[str]:
+    callspec = getattr(item, "callspec", None)
+    return callspec.params.get("browser_name") if callspec else None
+
+
+def _batch_for(item: pytest.Function, state: BatchState) -> List[pytest.Function]:
+    """Marked tests still to run that can share item's browser and event loop"""
+    config = item.config
+    # Under xdist each worker only runs its share of the tests; --dist loadgroup
+    # and affinity scheduling keep every concurrent test on one worker (see
+    # pytest_collection_modifyitems). Workers see --dist as "no", but xdist
+    # sets the loadgroup option for them.
+    if hasattr(config, "workerinput") and not (config.getoption("loadgroup", False) or uses_affinity(config)):
+        return [item]
+    return [
+        other
+        for other in item.session.items
+        if isinstance(other, pytest.Function)
+        and other.get_closest_marker(MARKER)
+        and other.nodeid not in state.outcomes
+        and other.nodeid not in state.reported
+        and CACHED_PASS not in other.stash
+        # Skips are decided at setup, so leave those tests to run on their own
+        and not other.get_closest_marker("skip")
+        and not other.get_closest_marker("skipif")
+        and _browser_name(other) == _browser_name(item)
+    ]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("concurrent", "concurrent read-only tests")
+    group.addoption(
+        "--concurrent-pages",
+        type=int,
+        default=4,
+        help="Pages open at once when running concurrent_readonly tests (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        f"{MARKER}: async test that only reads the page; runs concurrently with the other "
+        "marked tests on pages of one browser context",
+    )
+    config.stash[BATCH_STATE] = BatchState()
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    for item in items:
+        if not item.get_closest_marker(MARKER):
+            continue
+        function = getattr(item, "obj", None)
+        if not inspect.iscoroutinefunction(function):
+            raise pytest.UsageError(f"{item.nodeid}: {MARKER} tests must be async def")
+        argnames = set(_argnames(item))
+        if "async_page" not in argnames:
+            raise pytest.UsageError(f"{item.nodeid}: {MARKER} tests must take async_page")
+        unsupported = argnames - BATCH_ARGUMENTS
+        if unsupported:
+            raise pytest.UsageError(
+                f"{item.nodeid}: {MARKER} tests can only take {', '.join(sorted(BATCH_ARGUMENTS))}, "
+                f"not {', '.join(sorted(unsupported))}"
+            )
+        item.add_marker(pytest.mark.xdist_group(MARKER))
+
+
+@pytest.fixture
+def async_page(
+    browser_name: str,
+    browser_type_launch_args: Dict[str, Any],
+    browser_context_args: Dict[str, Any],
+    connect_options: Optional[Dict[str, Any]],
+    base_url: str,
+    status_backend: StatusBackend,
+    pytestconfig: pytest.Config,
+) -> BatchSettings:
+    """playwright.async_api Page for a concurrent_readonly test
+
+    pytest only sees these settings; the batch runner passes the real page.
+    """
+    return BatchSettings(
+        browser_name,
+        browser_type_launch_args,
+        browser_context_args,
+        connect_options,
+        base_url,
+        status_backend,
+        pytestconfig.stash.get(STATUS_STATS, None),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> Optional[bool]:
+    if not pyfuncitem.get_closest_marker(MARKER):
+        return None
+    state = pyfuncitem.config.stash[BATCH_STATE]
+    if pyfuncitem.nodeid not in state.outcomes:
+        batch = _batch_for(pyfuncitem, state)
+        settings = pyfuncitem.funcargs["async_page"]
+        max_pages = pyfuncitem.config.getoption("concurrent_pages")
+        started = time.perf_counter()
+        # A thread of its own keeps this event loop clear of the sync API's loop
+        with redirect_stdout(_TaskStdout(sys.stdout)), ThreadPoolExecutor(1) as executor:
+            outcomes = executor.submit(asyncio.run, run_batch(batch, settings, max_pages)).result()
+        state.outcomes.update(outcomes)
+        state.stats.batches += 1
+        state.stats.tests += len(outcomes)
+        state.stats.wall_seconds += time.perf_counter() - started
+        state.stats.test_seconds += sum(outcome.duration for outcome in outcomes.values())
+    outcome = state.outcomes.pop(pyfuncitem.nodeid)
+    state.reported.add(pyfuncitem.nodeid)
+    pyfuncitem.stash[BATCH_OUTCOME] = outcome
+    if STATUS_REPORTER in pyfuncitem.stash:
+        # The batch has sent this test's status already
+        del pyfuncitem.stash[STATUS_REPORTER]
+    sys.stdout.write(outcome.output)
+    if outcome.error is not None:
+        raise outcome.error
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo) -> Generator[None, None, None]:
+    result = yield
+    outcome = item.stash.get(BATCH_OUTCOME, None)
+    if outcome is not None and call.when == "call":
+        # The test that started the batch waited for all of it; report its own time
+        result.get_result().duration = outcome.duration
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(BATCH_STATE, BatchState()).stats
+    if not stats.batches:
+        return
+    terminalreporter.write_sep("-", "concurrent read-only tests")
+    terminalreporter.write_line(
+        f"{stats.tests} tests in {stats.batches} batch(es) took {stats.wall_seconds:.1f}s "
+        f"of wall time for {stats.test_seconds:.1f}s of test time"
+    )
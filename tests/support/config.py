@@ -0,0 +1,72 @@
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+CONFIG_PATH = ROOT_DIR / "browserstack.yml"
+DEFAULT_BASE_URL = "https://testathon.live/"
+LOCAL_PLATFORM = {"sessionName": "local"}
+
+
+@lru_cache(maxsize=None)
+def load_browserstack_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """Load browserstack.yml, returning an empty config if it is missing"""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return yaml.safe_load(handle) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def platforms() -> List[Dict[str, Any]]:
+    """Platform entries from browserstack.yml"""
+    return list(load_browserstack_config().get("platforms") or [])
+
+
+def current_platform() -> Dict[str, Any]:
+    """Platform entry the BrowserStack SDK is running this process for"""
+    index = os.environ.get("BROWSERSTACK_PLATFORM_INDEX")
+    entries = platforms()
+    if index is None or not index.isdigit() or int(index) >= len(entries):
+        return dict(LOCAL_PLATFORM)
+    return entries[int(index)]
+
+
+def on_browserstack() -> bool:
+    """Whether the BrowserStack SDK started this process for one of its platforms"""
+    return os.environ.get("BROWSERSTACK_PLATFORM_INDEX") is not None
+
+
+def platform_key(platform: Optional[Dict[str, Any]] = None) -> str:
+    """Filesystem-safe key for a platform entry, e.g. 'windows-11-chrome'"""
+    platform = current_platform() if platform is None else platform
+    name = platform.get("sessionName") or "-".join(
+        str(platform[field])
+        for field in ("os", "osVersion", "deviceName", "browserName", "browserVersion")
+        if platform.get(field)
+    )
+    return slugify(name or "local")
+
+
+def worker_id() -> str:
+    """pytest-xdist worker id, or 'main' when running without xdist"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def slugify(value: str) -> str:
+    """Lowercase value with every run of non-alphanumerics collapsed to '-'"""
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path through a temporary file, so readers never see it half written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Thread idents repeat across xdist workers, which may write the same path
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,186 @@
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+)
+
+import pytest
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import Page
+
+SNAPSHOT_FIELDS = ("tag", "id", "classes", "data", "visible", "text")
+
+IS_VISIBLE_JS = """
+(el) => {
+    const style = getComputedStyle(el);
+    return style.visibility !== "hidden" && style.display !== "none" && el.getClientRects().length > 0;
+}
+"""
+
+# Collects every requested field for all matching nodes in one evaluate call
+# and returns them column by column, so the payload stays small.
+SNAPSHOT_JS = f"""
+([selector, fields, limit, textLength]) => {{
+    const isVisible = {IS_VISIBLE_JS};
+    const extract = {{
+        tag: (el) => el.tagName.toLowerCase(),
+        id: (el) => el.id || "",
+        classes: (el) => el.getAttribute("class") || "",
+        data: (el) => {{
+            const attrs = {{}};
+            for (const attr of el.attributes) {{
+                if (attr.name.startsWith("data-")) attrs[attr.name] = attr.value;
+            }}
+            return attrs;
+        }},
+        visible: isVisible,
+        text: (el) => (el.innerText || "").trim().slice(0, textLength),
+    }};
+    let nodes = Array.from(document.querySelectorAll(selector));
+    if (limit !== null) nodes = nodes.slice(0, limit);
+    const columns = {{}};
+    for (const field of fields) columns[field] = nodes.map(extract[field]);
+    return columns;
+}}
+"""
+
+
+class DomSnapshot:
+    """Columnar view of matched nodes: one list per field, aligned by index"""
+
+    def __init__(self, columns: Dict[str, List[Any]]) -> None:
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def __getitem__(self, field: str) -> List[Any]:
+        return self.columns[field]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Iterate nodes as dicts, for printing rather than bulk work"""
+        fields = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(fields, values))
+
+    def take(self, indices: Sequence[int]) -> "DomSnapshot":
+        return DomSnapshot({field: [values[i] for i in indices] for field, values in self.columns.items()})
+
+    def head(self, count: int) -> "DomSnapshot":
+        return DomSnapshot({field: values[:count] for field, values in self.columns.items()})
+
+    def where(self, **conditions: Any) -> "DomSnapshot":
+        """Keep nodes whose fields equal the given values or satisfy the given callables
+
+        Only the columns named in conditions are scanned.
+        """
+        indices = range(len(self))
+        for field, expected in conditions.items():
+            column = self.columns[field]
+            # expected.__eq__ would return a truthy NotImplemented for values of another type
+            test: Callable[[Any], bool] = expected if callable(expected) else lambda value: value == expected
+            indices = [i for i in indices if test(column[i])]
+        return self.take(list(indices))
+
+    def unique(self, *fields: str) -> List[Tuple[Hashable, ...]]:
+        """Distinct combinations of fields in first-seen order"""
+        columns = [[_hashable(value) for value in self.columns[field]] for field in fields]
+        return list(dict.fromkeys(zip(*columns)))
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def dom_snapshot(
+    page: "Page",
+    selector: str = "*",
+    fields: Sequence[str] = SNAPSHOT_FIELDS,
+    limit: Optional[int] = None,
+    text_length: int = 100,
+) -> DomSnapshot:
+    """Tag, id, classes, data attributes, visibility and text of every node matching a CSS selector"""
+    args = _snapshot_args(selector, fields, limit, text_length)
+    return DomSnapshot(page.evaluate(SNAPSHOT_JS, args))
+
+
+async def dom_snapshot_async(
+    page: "AsyncPage",
+    selector: str = "*",
+    fields: Sequence[str] = SNAPSHOT_FIELDS,
+    limit: Optional[int] = None,
+    text_length: int = 100,
+) -> DomSnapshot:
+    """dom_snapshot for playwright.async_api pages"""
+    args = _snapshot_args(selector, fields, limit, text_length)
+    return DomSnapshot(await page.evaluate(SNAPSHOT_JS, args))
+
+
+def _snapshot_args(
+    selector: str, fields: Sequence[str], limit: Optional[int], text_length: int
+) -> List[Any]:
+    unknown = set(fields) - set(SNAPSHOT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown snapshot fields: {', '.join(sorted(unknown))}")
+    return [selector, list(fields), limit, text_length]
+
+
+# Counts (and optionally visible counts) plus leading text samples for many
+# selectors in one evaluate call.
+QUERY_JS = f"""
+([selectors, samples, textLength, countVisible]) => {{
+    const isVisible = {IS_VISIBLE_JS};
+    const result = {{}};
+    for (const selector of selectors) {{
+        const nodes = Array.from(document.querySelectorAll(selector));
+        result[selector] = {{
+            count: nodes.length,
+            visible: countVisible ? nodes.filter(isVisible).length : null,
+            samples: nodes.slice(0, samples).map((el) => (el.innerText || "").trim().slice(0, textLength)),
+        }};
+    }}
+    return result;
+}}
+"""
+
+
+class SelectorMatch(NamedTuple):
+    """What one selector matched: total count, visible count and text samples"""
+
+    count: int
+    visible: Optional[int]
+    samples: List[str]
+
+
+def query_elements(
+    page: "Page",
+    selectors: Sequence[str],
+    samples: int = 0,
+    text_length: int = 50,
+    count_visible: bool = False,
+) -> Dict[str, SelectorMatch]:
+    """Count matches for every CSS selector and sample their text in one page.evaluate call"""
+    result = page.evaluate(QUERY_JS, [list(selectors), samples, text_length, count_visible])
+    return {selector: SelectorMatch(**match) for selector, match in result.items()}
+
+
+async def query_elements_async(
+    page: "AsyncPage",
+    selectors: Sequence[str],
+    samples: int = 0,
+    text_length: int = 50,
+    count_visible: bool = False,
+) -> Dict[str, SelectorMatch]:
+    """query_elements for playwright.async_api pages"""
+    result = await page.evaluate(QUERY_JS, [list(selectors), samples, text_length, count_visible])
+    return {selector: SelectorMatch(**match) for selector, match in result.items()}
+
+
+@pytest.fixture
+def element_query() -> Callable[..., Dict[str, SelectorMatch]]:
+    """query_elements, for tests that take their helpers as fixtures"""
+    return query_elements
@@ -0,0 +1,113 @@
+import itertools
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Sequence
+
+import pytest
+
+from support.config import ROOT_DIR, platform_key, slugify
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext
+
+HAR_MODES = ("off", "record", "replay")
+NOT_FOUND_POLICIES = ("abort", "fallback")
+
+
+class HarStore:
+    """Per-test compressed HAR files, recorded natively and replayed through routes"""
+
+    def __init__(
+        self,
+        root: Path,
+        not_found: str = "abort",
+        passthrough: Sequence[str] = (),
+    ) -> None:
+        self.root = Path(root)
+        self.not_found = not_found
+        self.passthrough = list(passthrough)
+
+    def path_for(self, nodeid: str, index: int = 0) -> Path:
+        """HAR archive for the index-th context a test opens"""
+        suffix = f"-{index}" if index else ""
+        return self.root / f"{slugify(nodeid)}{suffix}.har.zip"
+
+    def record_args(self, path: Path) -> Dict[str, Any]:
+        """new_context() arguments that record traffic into a zipped HAR"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return {
+            "record_har_path": str(path),
+            "record_har_mode": "minimal",
+            "record_har_content": "attach",
+        }
+
+    def replay(self, context: "BrowserContext", path: Path) -> None:
+        """Serve context requests from path, letting passthrough patterns hit the network"""
+        if path.exists():
+            context.route_from_har(str(path), not_found=self.not_found)
+        elif self.not_found == "abort":
+            pytest.fail(f"No HAR recorded at {path}, run with --har-mode=record first", pytrace=False)
+        # Routes registered later take precedence over the HAR router
+        for pattern in self.passthrough:
+            context.route(pattern, lambda route: route.continue_())
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("har", "HAR record/replay")
+    group.addoption(
+        "--har-mode",
+        choices=HAR_MODES,
+        default="off",
+        help="Record network traffic per test, replay it, or go to the network (default: off)",
+    )
+    group.addoption(
+        "--har-dir",
+        default=str(ROOT_DIR / "har"),
+        help="Directory holding the recorded HAR archives",
+    )
+    group.addoption(
+        "--har-not-found",
+        choices=NOT_FOUND_POLICIES,
+        default="abort",
+        help="What replay does with requests missing from the HAR (default: abort)",
+    )
+    group.addoption(
+        "--har-passthrough",
+        action="append",
+        default=[],
+        metavar="URL_GLOB",
+        help="URL pattern always sent to the network during replay, may be repeated",
+    )
+
+
+@pytest.fixture(scope="session")
+def har_store(pytestconfig: pytest.Config) -> HarStore:
+    return HarStore(
+        Path(pytestconfig.getoption("har_dir")) / platform_key(),
+        not_found=pytestconfig.getoption("har_not_found"),
+        passthrough=pytestconfig.getoption("har_passthrough"),
+    )
+
+
+@pytest.fixture
+def new_context(
+    new_context: Callable[..., "BrowserContext"],
+    har_store: HarStore,
+    pytestconfig: pytest.Config,
+    request: pytest.FixtureRequest,
+) -> Callable[..., "BrowserContext"]:
+    """pytest-playwright's new_context with HAR recording or replay applied"""
+    mode = pytestconfig.getoption("har_mode")
+    if mode == "off":
+        return new_context
+    counter = itertools.count()
+
+    def _new_context(**kwargs: Any) -> "BrowserContext":
+        path = har_store.path_for(request.node.nodeid, next(counter))
+        if mode == "record":
+            return new_context(**har_store.record_args(path), **kwargs)
+        context = new_context(**kwargs)
+        har_store.replay(context, path)
+        return context
+
+    return _new_context
+
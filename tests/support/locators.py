@@ -0,0 +1,146 @@
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
+from urllib.parse import urlsplit
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from support.config import platform_key
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Locator, Page
+
+CACHE_KEY = "selectors/winners"
+
+
+@dataclass
+class ChainStats:
+    """How one named chain resolved over the session"""
+
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    lost_ms: float = 0.0
+
+
+def _page_key(url: str) -> str:
+    return urlsplit(url).path or "/"
+
+
+def _matches(locator: "Locator", state: str) -> bool:
+    if state == "visible":
+        return locator.first.is_visible()
+    return locator.count() > 0
+
+
+class SelectorResolver:
+    """Resolves alternative selectors to the one that matches, remembering it per page path
+
+    The remembered winner is tried first with a short probe. If it has gone
+    stale the full chain is waited on as a union, and the first alternative
+    that matches becomes the new winner. Time spent on stale probes counts as
+    lost; waiting on the chain is what resolving it would cost anyway.
+    """
+
+    def __init__(self, winners: Optional[Dict[str, Dict[str, str]]] = None, probe_timeout: float = 1000) -> None:
+        self.winners: Dict[str, Dict[str, str]] = winners or {}
+        self.probe_timeout = probe_timeout
+        self.stats: Dict[str, ChainStats] = {}
+        self.changed = False
+
+    def locate(
+        self,
+        page: "Page",
+        name: str,
+        selectors: Sequence[str],
+        timeout: float = 10000,
+        state: str = "visible",
+    ) -> "Locator":
+        """Locator for whichever of selectors matches, waiting up to timeout for one to reach state"""
+        stats = self.stats.setdefault(name, ChainStats())
+        path = _page_key(page.url)
+        remembered = self.winners.get(path, {}).get(name)
+        if remembered in selectors:
+            locator = page.locator(remembered)
+            started = time.perf_counter()
+            try:
+                locator.first.wait_for(state=state, timeout=min(timeout, self.probe_timeout))
+                stats.hits += 1
+                return locator
+            except PlaywrightTimeoutError:
+                stats.stale += 1
+                stats.lost_ms += (time.perf_counter() - started) * 1000
+
+        union = page.locator(selectors[0])
+        for selector in selectors[1:]:
+            union = union.or_(page.locator(selector))
+        union.first.wait_for(state=state, timeout=timeout)
+        winner = next(
+            (selector for selector in selectors if _matches(page.locator(selector), state)), selectors[0]
+        )
+        stats.misses += 1
+        if winner != remembered:
+            self.winners.setdefault(path, {})[name] = winner
+            self.changed = True
+        return page.locator(winner)
+
+
+SELECTOR_RESOLVER = pytest.StashKey[SelectorResolver]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("selectors", "selector resolution cache")
+    group.addoption(
+        "--selector-probe-ms",
+        type=float,
+        default=1000,
+        help="How long a remembered selector is tried before the full chain (default: %(default)s)",
+    )
+    group.addoption(
+        "--no-selector-cache",
+        action="store_true",
+        help="Resolve every chain from scratch and do not save the winners",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    winners = {}
+    if getattr(config, "cache", None) is not None and not config.getoption("no_selector_cache"):
+        winners = config.cache.get(f"{CACHE_KEY}/{platform_key()}", {})
+    config.stash[SELECTOR_RESOLVER] = SelectorResolver(
+        winners, probe_timeout=config.getoption("selector_probe_ms")
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    resolver = config.stash.get(SELECTOR_RESOLVER, None)
+    if resolver is None or not resolver.changed or getattr(config, "cache", None) is None:
+        return
+    if config.getoption("no_selector_cache"):
+        return
+    # Merge with what other workers saved meanwhile rather than overwrite it
+    key = f"{CACHE_KEY}/{platform_key()}"
+    saved = config.cache.get(key, {})
+    for path, winners in resolver.winners.items():
+        saved.setdefault(path, {}).update(winners)
+    config.cache.set(key, saved)
+
+
+@pytest.fixture(scope="session")
+def selector_resolver(pytestconfig: pytest.Config) -> SelectorResolver:
+    """Session-wide SelectorResolver backed by the pytest cache"""
+    return pytestconfig.stash[SELECTOR_RESOLVER]
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    resolver = config.stash.get(SELECTOR_RESOLVER, None)
+    if resolver is None or not resolver.stats:
+        return
+    terminalreporter.write_sep("-", "selector cache")
+    for name, stats in sorted(resolver.stats.items(), key=lambda item: -item[1].lost_ms):
+        terminalreporter.write_line(
+            f"{name}: {stats.hits} hits, {stats.misses} full-chain lookups "
+            f"({stats.stale} stale), {stats.lost_ms:.0f} ms lost to stale probes"
+        )
@@ -0,0 +1,19 @@
+from typing import Dict, Generator
+
+import pytest
+
+PHASE_REPORTS = pytest.StashKey[Dict[str, pytest.TestReport]]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo) -> Generator[None, None, None]:
+    """Keep each phase's report on the item so fixtures can see the outcome at teardown"""
+    outcome = yield
+    report = outcome.get_result()
+    item.stash.setdefault(PHASE_REPORTS, {})[report.when] = report
+
+
+def has_failed(item: pytest.Item) -> bool:
+    """Whether setup or the test body of item failed"""
+    return any(report.failed for report in item.stash.get(PHASE_REPORTS, {}).values())
+
@@ -0,0 +1,297 @@
+import json
+import os
+import threading
+import uuid
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from support.config import ROOT_DIR, platform_key, worker_id
+from support.stats import summarize
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Page
+
+# Long tasks are not kept in the performance timeline, so count them from the
+# first script on every document. Browsers without the entry type report null.
+LONG_TASKS_JS = """
+(() => {
+    if (window.__perfLongTasks || !window.PerformanceObserver) return;
+    const totals = { count: 0, total: 0 };
+    try {
+        new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) {
+                totals.count++;
+                totals.total += entry.duration;
+            }
+        }).observe({ type: "longtask", buffered: true });
+        window.__perfLongTasks = totals;
+    } catch (e) {}
+})();
+"""
+
+# Navigation Timing, paint timings, resource totals and long tasks in one call
+METRICS_JS = """
+() => {
+    const [nav] = performance.getEntriesByType("navigation");
+    const paints = {};
+    for (const entry of performance.getEntriesByType("paint")) paints[entry.name] = entry.startTime;
+    const resources = performance.getEntriesByType("resource");
+    const longTasks = window.__perfLongTasks || null;
+    return {
+        ttfb_ms: nav ? nav.responseStart - nav.startTime : null,
+        dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+        load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+        document_bytes: nav ? nav.transferSize : null,
+        first_paint_ms: paints["first-paint"] ?? null,
+        first_contentful_paint_ms: paints["first-contentful-paint"] ?? null,
+        resource_count: resources.length,
+        resource_bytes: resources.reduce((sum, entry) => sum + (entry.transferSize || 0), 0),
+        long_task_count: longTasks ? longTasks.count : null,
+        long_task_ms: longTasks ? longTasks.total : null,
+    };
+}
+"""
+
+GATED_METRICS = ("ttfb_ms", "dom_content_loaded_ms", "load_ms", "first_contentful_paint_ms")
+
+
+class PerfRegressionWarning(UserWarning):
+    """A page got slower than the --perf-baseline allows"""
+
+
+class PerfBaseline:
+    """p50/p95 per (test, platform, metric) over previously recorded navigations"""
+
+    def __init__(self, summaries: Dict[Tuple[str, str], Dict[str, Dict[str, float]]]) -> None:
+        self.summaries = summaries
+
+    @classmethod
+    def load(cls, path: Path, exclude_prefix: Optional[str] = None) -> "PerfBaseline":
+        """Read a JSON-lines file, or every *.jsonl file in a directory"""
+        path = Path(path)
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        samples: Dict[Tuple[str, str], Dict[str, List[float]]] = {}
+        for file in files:
+            if exclude_prefix and file.name.startswith(exclude_prefix):
+                continue
+            for record in _read_records(file):
+                metrics = samples.setdefault((record["test"], record["platform"]), {})
+                for metric in GATED_METRICS:
+                    if record.get(metric) is not None:
+                        metrics.setdefault(metric, []).append(record[metric])
+        return cls({
+            key: {metric: summarize(values) for metric, values in metrics.items()}
+            for key, metrics in samples.items()
+        })
+
+    def get(self, test: str, platform: str) -> Dict[str, Dict[str, float]]:
+        return self.summaries.get((test, platform), {})
+
+
+def _read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def find_regressions(
+    samples: List[Dict[str, Any]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """Metrics whose p50 or p95 grew by more than threshold percent and min_delta_ms"""
+    current = {
+        metric: summarize(values)
+        for metric in GATED_METRICS
+        for values in [[sample[metric] for sample in samples if sample.get(metric) is not None]]
+        if values
+    }
+    messages = []
+    for metric, quantiles in current.items():
+        for quantile, value in quantiles.items():
+            before = baseline.get(metric, {}).get(quantile)
+            if before is None:
+                continue
+            if value > before * (1 + threshold / 100) and value - before > min_delta_ms:
+                messages.append(f"{metric} {quantile} {before:.0f} ms -> {value:.0f} ms")
+    return messages
+
+
+class PerfLog:
+    """This process's navigation records, appended to one JSON-lines file"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.records = 0
+        self.regressions: List[str] = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+            self.records += 1
+
+
+PERF_LOG = pytest.StashKey[PerfLog]()
+PERF_BASELINE = pytest.StashKey[Optional[PerfBaseline]]()
+
+
+class PerfRecorder:
+    """Collects metrics after every goto/reload on the pages of one test"""
+
+    def __init__(self, nodeid: str, log: Optional[PerfLog] = None) -> None:
+        self.nodeid = nodeid
+        self.log = log
+        self.samples: List[Dict[str, Any]] = []
+
+    def instrument_context(self, context: "BrowserContext") -> None:
+        context.add_init_script(LONG_TASKS_JS)
+        for page in context.pages:
+            self.instrument_page(page)
+        context.on("page", self.instrument_page)
+
+    def instrument_page(self, page: "Page") -> None:
+        for action in ("goto", "reload"):
+            setattr(page, action, self._wrap(page, action, getattr(page, action)))
+
+    def _wrap(self, page: "Page", action: str, original: Callable[..., Any]) -> Callable[..., Any]:
+        def navigate(*args: Any, **kwargs: Any) -> Any:
+            response = original(*args, **kwargs)
+            self.collect(page, action)
+            return response
+
+        return navigate
+
+    def collect(self, page: "Page", action: str) -> Optional[Dict[str, Any]]:
+        try:
+            metrics = page.evaluate(METRICS_JS)
+        except PlaywrightError:
+            return None
+        sample = {"test": self.nodeid, "platform": platform_key(), "action": action, "url": page.url, **metrics}
+        self.samples.append(sample)
+        if self.log is not None:
+            self.log.write(sample)
+        return sample
+
+
+PERF_RECORDER = pytest.StashKey[PerfRecorder]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("perf", "web performance metrics")
+    group.addoption(
+        "--perf",
+        action="store_true",
+        help="Record page metrics after every goto/reload in every test",
+    )
+    group.addoption(
+        "--perf-dir",
+        default=str(ROOT_DIR / "perf"),
+        help="Where per-run JSON-lines metric files are written",
+    )
+    group.addoption(
+        "--perf-baseline",
+        default=None,
+        help="Metrics file or directory of earlier runs to compare p50/p95 against (implies --perf)",
+    )
+    group.addoption(
+        "--perf-threshold",
+        type=float,
+        default=20.0,
+        help="Percent a p50/p95 may grow over the baseline (default: %(default)s)",
+    )
+    group.addoption(
+        "--perf-min-delta-ms",
+        type=float,
+        default=50.0,
+        help="Smallest growth in ms that counts as a regression (default: %(default)s)",
+    )
+    group.addoption(
+        "--perf-gate",
+        choices=("warn", "fail"),
+        default="warn",
+        help="Warn about regressions or fail the test (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Workers of one xdist run share its uid, so their files sort together
+    run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    directory = Path(config.getoption("perf_dir"))
+    config.stash[PERF_LOG] = PerfLog(directory / f"{run_id}-{platform_key()}-{worker_id()}.jsonl")
+    baseline = config.getoption("perf_baseline")
+    config.stash[PERF_BASELINE] = PerfBaseline.load(Path(baseline), exclude_prefix=run_id) if baseline else None
+
+
+def _enabled(config: pytest.Config) -> bool:
+    return bool(config.getoption("perf") or config.getoption("perf_baseline"))
+
+
+@pytest.fixture
+def perf_metrics(pytestconfig: pytest.Config, request: pytest.FixtureRequest) -> PerfRecorder:
+    """Page metrics recorded after each navigation of this test, gated against --perf-baseline"""
+    recorder = PerfRecorder(request.node.nodeid, pytestconfig.stash[PERF_LOG])
+    request.node.stash[PERF_RECORDER] = recorder
+    return recorder
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo) -> Generator[None, None, None]:
+    """Gate the call phase on the baseline, so a regression fails the test before its status is sent"""
+    outcome = yield
+    report = outcome.get_result()
+    recorder = item.stash.get(PERF_RECORDER, None)
+    baseline = item.config.stash.get(PERF_BASELINE, None)
+    if call.when != "call" or not report.passed or recorder is None or baseline is None or not recorder.samples:
+        return
+    config = item.config
+    regressions = find_regressions(
+        recorder.samples,
+        baseline.get(item.nodeid, platform_key()),
+        config.getoption("perf_threshold"),
+        config.getoption("perf_min_delta_ms"),
+    )
+    if not regressions:
+        return
+    message = f"{item.nodeid} slower than baseline: {'; '.join(regressions)}"
+    config.stash[PERF_LOG].regressions.append(message)
+    if config.getoption("perf_gate") == "fail":
+        report.outcome = "failed"
+        report.longrepr = message
+    else:
+        warnings.warn(PerfRegressionWarning(message))
+
+
+@pytest.fixture
+def new_context(
+    new_context: Callable[..., "BrowserContext"], pytestconfig: pytest.Config, request: pytest.FixtureRequest
+) -> Callable[..., "BrowserContext"]:
+    """Instrument contexts for perf_metrics in tests that use it, or in every test with --perf"""
+    if not _enabled(pytestconfig) and "perf_metrics" not in request.fixturenames:
+        return new_context
+    recorder: PerfRecorder = request.getfixturevalue("perf_metrics")
+
+    def _new_context(**kwargs: Any) -> "BrowserContext":
+        context = new_context(**kwargs)
+        recorder.instrument_context(context)
+        return context
+
+    return _new_context
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    log = config.stash.get(PERF_LOG, None)
+    if log is None or not log.records:
+        return
+    terminalreporter.write_sep("-", "page performance")
+    terminalreporter.write_line(f"{log.records} navigations recorded in {log.path}")
+    for message in log.regressions:
+        terminalreporter.write_line(f"REGRESSION {message}")
@@ -0,0 +1,263 @@
+import functools
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Generator, Optional, Set
+from urllib.parse import urlsplit
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from support.outcomes import has_failed
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Frame, Page
+
+# Starts the navigation and returns at once, so the page loads while other
+# tests run; setTimeout keeps the evaluate result from racing the unload.
+NAVIGATE_JS = "(url) => { setTimeout(() => { window.location.href = url; }, 0); }"
+RESET_STORAGE_JS = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+NAVIGATION_MS_JS = """
+() => {
+    const [entry] = performance.getEntriesByType("navigation");
+    return entry ? entry.duration : 0;
+}
+"""
+
+
+@dataclass
+class PoolStats:
+    """How often tests got a warm page and how much loading that took off their clock"""
+
+    hits: int = 0
+    misses: int = 0
+    # Tests whose page came from their own new_context fixture, see pooled_page
+    bypassed: int = 0
+    recycled: int = 0
+    warmup_ms: float = 0.0
+    waited_ms: float = 0.0
+    cold_ms: float = 0.0
+
+    @property
+    def saved_ms(self) -> float:
+        """Page loads done ahead of time, minus what tests still waited for"""
+        return self.warmup_ms - self.waited_ms
+
+
+POOL_STATS = pytest.StashKey[PoolStats]()
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class PooledPage:
+    """A context with one page, and the origins it has visited since its last reset"""
+
+    def __init__(self, context: "BrowserContext", page: "Page", pooled: bool = True) -> None:
+        self.context = context
+        self.page = page
+        self.pooled = pooled
+        self.uses = 0
+        self.origins: Set[str] = set()
+        page.on("framenavigated", self._on_navigated)
+
+    def _on_navigated(self, frame: "Frame") -> None:
+        if frame.parent_frame is None and frame.url.startswith("http"):
+            self.origins.add(_origin(frame.url))
+
+
+class PagePool:
+    """Contexts with a page already loading base_url, handed out one per test
+
+    Pages go back to the pool with cookies and storage cleared and start
+    loading base_url again straight away. A context is closed instead when it
+    reached max_uses, its test failed, or it left the base origin.
+    """
+
+    def __init__(
+        self,
+        new_context: Callable[..., "BrowserContext"],
+        base_url: str,
+        size: int = 2,
+        max_uses: int = 20,
+        timeout: float = 30000,
+        stats: Optional[PoolStats] = None,
+    ) -> None:
+        self.new_context = new_context
+        self.base_url = base_url
+        self.size = size
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self.stats = stats or PoolStats()
+        self.idle: Deque[PooledPage] = deque()
+
+    def _create(self) -> PooledPage:
+        context = self.new_context()
+        return PooledPage(context, context.new_page())
+
+    def _warm(self, entry: PooledPage) -> PooledPage:
+        entry.page.evaluate(NAVIGATE_JS, self.base_url)
+        return entry
+
+    def fill(self) -> None:
+        """Top the pool up to size with pages that have started loading"""
+        while len(self.idle) < self.size:
+            self.idle.append(self._warm(self._create()))
+
+    def acquire(self, new_context: Optional[Callable[..., "BrowserContext"]] = None) -> PooledPage:
+        """A page on base_url: warm from the pool if possible, loaded on the spot otherwise
+
+        With new_context, the page is loaded on the spot in a context from it,
+        and is left to its creator to close instead of going back to the pool.
+        """
+        started = time.perf_counter()
+        if new_context is not None:
+            context = new_context()
+            entry = PooledPage(context, context.new_page(), pooled=False)
+            entry.page.goto(self.base_url, timeout=self.timeout)
+            self.stats.bypassed += 1
+            self.stats.cold_ms += (time.perf_counter() - started) * 1000
+            return entry
+        while self.idle:
+            entry = self.idle.popleft()
+            try:
+                entry.page.wait_for_url(
+                    lambda url: url != "about:blank", wait_until="load", timeout=self.timeout
+                )
+                navigation_ms = entry.page.evaluate(NAVIGATION_MS_JS)
+            except PlaywrightError:
+                self._discard(entry)
+                continue
+            self.stats.hits += 1
+            self.stats.waited_ms += (time.perf_counter() - started) * 1000
+            self.stats.warmup_ms += navigation_ms
+            entry.uses += 1
+            return entry
+        entry = self._create()
+        entry.page.goto(self.base_url, timeout=self.timeout)
+        self.stats.misses += 1
+        self.stats.cold_ms += (time.perf_counter() - started) * 1000
+        entry.uses += 1
+        return entry
+
+    def release(self, entry: PooledPage, reusable: bool = True) -> None:
+        """Reset entry and queue it to load base_url again, or close it"""
+        if not entry.pooled:
+            return
+        extra_pages = [page for page in entry.context.pages if page is not entry.page]
+        reusable = (
+            reusable
+            and entry.uses < self.max_uses
+            and not extra_pages
+            and not entry.page.is_closed()
+            and entry.origins <= {_origin(self.base_url)}
+        )
+        if reusable:
+            try:
+                entry.context.clear_cookies()
+                entry.page.evaluate(RESET_STORAGE_JS)
+                entry.page.goto("about:blank")
+                entry.origins.clear()
+                self.idle.append(self._warm(entry))
+            except PlaywrightError:
+                reusable = False
+        if not reusable:
+            self._discard(entry)
+        self.fill()
+
+    def _discard(self, entry: PooledPage) -> None:
+        self.stats.recycled += 1
+        try:
+            entry.context.close()
+        except PlaywrightError:
+            pass
+
+    def close(self) -> None:
+        while self.idle:
+            try:
+                self.idle.popleft().context.close()
+            except PlaywrightError:
+                pass
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("pool", "pre-warmed page pool")
+    group.addoption(
+        "--page-pool-size",
+        type=int,
+        default=2,
+        help="Pages kept loading base_url ahead of the tests that use them (default: %(default)s)",
+    )
+    group.addoption(
+        "--page-pool-max-uses",
+        type=int,
+        default=20,
+        help="Tests a pooled context serves before it is replaced (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[POOL_STATS] = PoolStats()
+
+
+def _instrumented(new_context: Callable[..., "BrowserContext"], config: pytest.Config) -> bool:
+    """Whether contexts of this test must come from its new_context fixture
+
+    The new_context overrides in support.har, perf, tracing and waits return
+    pytest-playwright's callable unchanged unless they have work to do, and
+    pytest-playwright itself records traces, videos and screenshots of the
+    contexts it makes.
+    """
+    if not getattr(new_context, "__module__", "").startswith("pytest_playwright"):
+        return True
+    return any(config.getoption(name, "off") != "off" for name in ("tracing", "video", "screenshot"))
+
+
+@pytest.fixture(scope="session")
+def page_pool(
+    pytestconfig: pytest.Config,
+    browser: "Browser",
+    browser_context_args: Dict[str, Any],
+    base_url: str,
+) -> Generator[PagePool, None, None]:
+    """Warm pages in the worker's browser, shared by the tests on this worker"""
+    pool = PagePool(
+        functools.partial(browser.new_context, **browser_context_args),
+        base_url,
+        size=pytestconfig.getoption("page_pool_size"),
+        max_uses=pytestconfig.getoption("page_pool_max_uses"),
+        stats=pytestconfig.stash[POOL_STATS],
+    )
+    pool.fill()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pooled_page(
+    page_pool: PagePool, new_context: Callable[..., "BrowserContext"], request: pytest.FixtureRequest
+) -> Generator["Page", None, None]:
+    """Clean page already on base_url, taken from the pool and returned after the test
+
+    When HAR replay, perf metrics, ring traces, app_ready or Playwright's own
+    tracing or video apply to the test, its page is loaded through new_context
+    instead, since pooled contexts were created before the test.
+    """
+    entry = page_pool.acquire(new_context if _instrumented(new_context, request.config) else None)
+    yield entry.page
+    page_pool.release(entry, reusable=not has_failed(request.node))
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(POOL_STATS, None)
+    if not stats or not (stats.hits or stats.misses or stats.bypassed):
+        return
+    terminalreporter.write_sep("-", "page pool")
+    terminalreporter.write_line(
+        f"{stats.hits} warm hits, {stats.misses} misses and {stats.bypassed} loaded through new_context "
+        f"({stats.cold_ms:.0f} ms loading cold), "
+        f"{stats.recycled} contexts recycled; {stats.warmup_ms:.0f} ms of page loads done ahead "
+        f"of tests, {stats.waited_ms:.0f} ms still waited ({stats.saved_ms:.0f} ms saved)"
+    )
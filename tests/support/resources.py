@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+import time
+import uuid
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+import psutil
+import pytest
+
+from support.config import ROOT_DIR, platform_key, worker_id
+
+MB = 1024 * 1024
+# Float columns of a sample; the RSS columns are bytes
+COLUMNS = ("t", "cpu", "rss_worker", "rss_driver", "rss_browser", "fds")
+
+
+class ProcessSampler:
+    """Samples CPU, RSS and open fds of this process and its children on a background thread
+
+    The direct child running node is the Playwright driver, and every other
+    descendant counts as the browser. Samples go into one array per column.
+    """
+
+    def __init__(self, interval: float = 0.5, pid: Optional[int] = None) -> None:
+        self.interval = interval
+        self.root = psutil.Process(pid or os.getpid())
+        self.columns: Dict[str, array] = {name: array("d") for name in COLUMNS}
+        self._processes: Dict[int, psutil.Process] = {self.root.pid: self.root}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.columns["t"])
+
+    def start(self) -> None:
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _role(self, process: psutil.Process) -> str:
+        if process.pid == self.root.pid:
+            return "worker"
+        try:
+            if process.ppid() == self.root.pid and process.name().startswith("node"):
+                return "driver"
+        except psutil.Error:
+            pass
+        return "browser"
+
+    def _tree(self) -> List[psutil.Process]:
+        try:
+            children = self.root.children(recursive=True)
+        except psutil.Error:
+            children = []
+        # Reuse Process objects so cpu_percent measures since the previous sample
+        tree = [self.root] + [self._processes.setdefault(child.pid, child) for child in children]
+        alive = {process.pid for process in tree}
+        for pid in list(self._processes):
+            if pid not in alive:
+                self._processes.pop(pid, None)
+        return tree
+
+    def sample(self) -> None:
+        # Tests sample from the main thread as well, and cpu_percent of a
+        # shared Process object is only meaningful between consecutive calls
+        with self._lock:
+            row = {"t": round(time.monotonic() - self.started, 3), "cpu": 0.0, "fds": 0.0}
+            row.update(rss_worker=0.0, rss_driver=0.0, rss_browser=0.0)
+            for process in self._tree():
+                try:
+                    with process.oneshot():
+                        row["cpu"] += process.cpu_percent(interval=None)
+                        row[f"rss_{self._role(process)}"] += process.memory_info().rss
+                        count = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+                        row["fds"] += count
+                except psutil.Error:
+                    continue
+            for name in COLUMNS:
+                self.columns[name].append(row[name])
+
+    def window(self, start: int, end: int) -> Dict[str, List[float]]:
+        """Samples [start, end) as lists per column"""
+        with self._lock:
+            return {name: values[start:end].tolist() for name, values in self.columns.items()}
+
+
+def total_rss(window: Dict[str, List[float]]) -> List[float]:
+    return [sum(values) for values in zip(window["rss_worker"], window["rss_driver"], window["rss_browser"])]
+
+
+def assess(
+    window: Dict[str, List[float]], leak_mb: float, peak_mb: Optional[float]
+) -> Tuple[Dict[str, float], List[str]]:
+    """Summary of one test's samples and the flags it raises"""
+    rss = total_rss(window)
+    if not rss:
+        return {}, []
+    summary = {
+        "samples": len(rss),
+        "peak_rss_mb": round(max(rss) / MB, 1),
+        "rss_growth_mb": round((rss[-1] - rss[0]) / MB, 1),
+        "cpu_mean": round(sum(window["cpu"]) / len(rss), 1),
+        "fds_max": max(window["fds"]),
+    }
+    flags = []
+    if summary["rss_growth_mb"] >= leak_mb:
+        flags.append(f"LEAK grew {summary['rss_growth_mb']:.0f} MB")
+    if peak_mb is not None and summary["peak_rss_mb"] >= peak_mb:
+        flags.append(f"PEAK {summary['peak_rss_mb']:.0f} MB")
+    return summary, flags
+
+
+class ResourceLog:
+    """Per-test timeseries of this process, one JSON line per test"""
+
+    def __init__(self, path: Path, sampler: ProcessSampler) -> None:
+        self.path = Path(path)
+        self.sampler = sampler
+        self.tests = 0
+        self.flagged: List[str] = []
+        self.peak_rss = 0.0
+
+    def write(self, nodeid: str, window: Dict[str, List[float]], summary: Dict[str, float]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"test": nodeid, "platform": platform_key(), **summary, "columns": window}
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.tests += 1
+        self.peak_rss = max(self.peak_rss, summary.get("peak_rss_mb", 0.0))
+
+
+RESOURCE_LOG = pytest.StashKey[ResourceLog]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("resources", "process resource sampling")
+    group.addoption(
+        "--resources",
+        action="store_true",
+        help="Sample CPU, RSS and open fds of this process, the Playwright driver and the browser",
+    )
+    group.addoption(
+        "--resource-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between samples (default: %(default)s)",
+    )
+    group.addoption(
+        "--resource-dir",
+        default=str(ROOT_DIR / "resources"),
+        help="Where per-run JSON-lines timeseries are written",
+    )
+    group.addoption(
+        "--resource-leak-mb",
+        type=float,
+        default=100,
+        help="RSS growth over one test that flags it as leaking (default: %(default)s)",
+    )
+    group.addoption(
+        "--resource-peak-mb",
+        type=float,
+        default=None,
+        help="Total RSS that flags a test as peaking too high",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.getoption("resources"):
+        return
+    if not hasattr(config, "workerinput") and config.getoption("numprocesses", None):
+        # The xdist controller runs no tests; each worker samples its own tree
+        return
+    sampler = ProcessSampler(config.getoption("resource_interval"))
+    run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    path = Path(config.getoption("resource_dir")) / f"{run_id}-{platform_key()}-{worker_id()}.jsonl"
+    config.stash[RESOURCE_LOG] = ResourceLog(path, sampler)
+    sampler.start()
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    log = config.stash.get(RESOURCE_LOG, None)
+    if log is not None:
+        log.sampler.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: pytest.Item) -> Generator[None, None, None]:
+    log = item.config.stash.get(RESOURCE_LOG, None)
+    if log is None:
+        yield
+        return
+    # Samples at both ends, so even a test shorter than the interval has two
+    log.sampler.sample()
+    start = len(log.sampler)
+    yield
+    log.sampler.sample()
+    window = log.sampler.window(start - 1, len(log.sampler))
+    config = item.config
+    summary, flags = assess(window, config.getoption("resource_leak_mb"), config.getoption("resource_peak_mb"))
+    log.write(item.nodeid, window, summary)
+    log.flagged.extend(f"{item.nodeid}: {flag}" for flag in flags)
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    log = config.stash.get(RESOURCE_LOG, None)
+    if log is None or not log.tests:
+        return
+    terminalreporter.write_sep("-", "process resources")
+    total = psutil.virtual_memory().total / MB
+    terminalreporter.write_line(
+        f"{log.tests} tests sampled into {log.path}; peak RSS {log.peak_rss:.0f} MB of {total:.0f} MB "
+        f"(room for about {int(total // max(log.peak_rss, 1))} workers like this one)"
+    )
+    for message in log.flagged:
+        terminalreporter.write_line(message)
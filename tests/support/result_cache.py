@@ -0,0 +1,262 @@
+import hashlib
+import inspect
+import json
+import re
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from support.config import DEFAULT_BASE_URL, current_platform, platform_key
+
+CACHE_KEY = "results/passes"
+MARKER = "app_url"
+# user_properties entry on the reports of a reused pass
+PROPERTY = "cached_result"
+# Tests that reach these fixtures open a browser on the application
+BROWSER_FIXTURES = ("browser", "async_page")
+ASSET_RE = re.compile(r"<(?:script|link)\b[^>]*?\b(?:src|href)\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+SUPPORT_DIR = Path(__file__).resolve().parent
+DAY = 24 * 60 * 60
+
+
+def app_fingerprint(url: str, timeout: float = 10) -> Optional[str]:
+    """Hash of the script and stylesheet URLs the page at url serves, or None if it cannot be fetched
+
+    Bundlers put a content hash in asset names, so the asset list changes
+    with every deploy while markup such as nonces, which changes with every
+    request, is left out. A page without assets is hashed whole.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": "pytest-result-cache"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            html = response.read().decode("utf-8", "replace")
+    except (OSError, ValueError):
+        return None
+    assets = sorted(set(ASSET_RE.findall(html)))
+    manifest = "\n".join([url, *assets]) if assets else f"{url}\n{html}"
+    return hashlib.sha256(manifest.encode()).hexdigest()
+
+
+def support_fingerprint() -> str:
+    """Hash of conftest.py and the support package, which every test depends on"""
+    digest = hashlib.sha256()
+    for path in sorted([SUPPORT_DIR.parent / "conftest.py", *SUPPORT_DIR.glob("*.py")]):
+        if path.exists():
+            digest.update(path.name.encode() + b"\0" + path.read_bytes())
+    return digest.hexdigest()
+
+
+def result_key(app: str, source: str, support: str, platform: Dict[str, Any]) -> str:
+    parts = [app, source, support, json.dumps(platform, sort_keys=True)]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def app_url_of(item: pytest.Item) -> str:
+    marker = item.get_closest_marker(MARKER)
+    if marker is not None:
+        return str(marker.args[0] if marker.args else marker.kwargs["url"])
+    return item.config.getoption("base_url", None) or DEFAULT_BASE_URL
+
+
+class ResultCache:
+    """Passes of one platform, keyed by test and the fingerprint they passed with"""
+
+    def __init__(self, cache: Any, platform: str, max_age: float = 7 * DAY, max_entries: int = 5000) -> None:
+        self.cache = cache
+        self.key = f"{CACHE_KEY}/{platform}"
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = cache.get(self.key, {}) if cache else {}
+        self.recorded: Dict[str, Dict[str, Any]] = {}
+        self.forgotten: Set[str] = set()
+
+    def lookup(self, nodeid: str, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(nodeid)
+        now = time.time() if now is None else now
+        if entry is None or entry["key"] != key or now - entry["at"] > self.max_age:
+            return None
+        return entry
+
+    def record(self, nodeid: str, key: str, duration: float) -> None:
+        self.recorded[nodeid] = {"key": key, "at": time.time(), "duration": round(duration, 3)}
+        self.forgotten.discard(nodeid)
+
+    def forget(self, nodeid: str) -> None:
+        self.recorded.pop(nodeid, None)
+        self.forgotten.add(nodeid)
+
+    def save(self, now: Optional[float] = None) -> None:
+        """Merge this run into the cache, dropping expired entries and the oldest beyond max_entries"""
+        if not self.cache or not (self.recorded or self.forgotten):
+            return
+        now = time.time() if now is None else now
+        # Re-read, since other xdist workers save their tests too
+        entries = {**self.cache.get(self.key, {}), **self.recorded}
+        for nodeid in self.forgotten:
+            entries.pop(nodeid, None)
+        fresh = [(nodeid, entry) for nodeid, entry in entries.items() if now - entry["at"] <= self.max_age]
+        fresh.sort(key=lambda pair: pair[1]["at"], reverse=True)
+        self.entries = dict(fresh[: self.max_entries])
+        self.cache.set(self.key, self.entries)
+
+
+# Set on items whose stored pass is reused; the batch runner in support.concurrent skips them
+CACHED_PASS = pytest.StashKey[Dict[str, Any]]()
+
+
+def _cached_property(report: pytest.TestReport) -> Optional[Dict[str, Any]]:
+    return next((value for name, value in report.user_properties if name == PROPERTY), None)
+
+
+class ResultCachePlugin:
+    """Reports a cached pass instead of running a browser test whose fingerprint matches it"""
+
+    def __init__(self, config: pytest.Config) -> None:
+        self.config = config
+        self.results = ResultCache(
+            getattr(config, "cache", None),
+            platform_key(),
+            max_age=config.getoption("result_cache_max_age") * DAY,
+            max_entries=config.getoption("result_cache_max_entries"),
+        )
+        self.apps: Dict[str, Optional[str]] = {}
+        self.keys: Dict[str, str] = {}
+        self.passed: Dict[str, float] = {}
+        self.reused = 0
+        self.saved_seconds = 0.0
+        self.ran = 0
+
+    def fingerprint(self, item: pytest.Item, support: str) -> Optional[str]:
+        function = getattr(item, "function", None)
+        if function is None or not any(name in getattr(item, "fixturenames", ()) for name in BROWSER_FIXTURES):
+            return None
+        url = app_url_of(item)
+        if url not in self.apps:
+            self.apps[url] = app_fingerprint(url)
+        if self.apps[url] is None:
+            return None
+        try:
+            source = inspect.getsource(function)
+        except (OSError, TypeError):
+            return None
+        return result_key(self.apps[url], source, support, current_platform())
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[pytest.Item]) -> None:
+        if self.config.option.collectonly:
+            return
+        support = support_fingerprint()
+        for item in items:
+            key = self.fingerprint(item, support)
+            if key is None:
+                continue
+            self.keys[item.nodeid] = key
+            entry = self.results.lookup(item.nodeid, key)
+            if entry is not None:
+                item.stash[CACHED_PASS] = entry
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Optional[bool]:
+        entry = item.stash.get(CACHED_PASS, None)
+        if entry is None:
+            return None
+        keywords = {name: 1 for name in item.keywords}
+        properties = [*item.user_properties, (PROPERTY, {"at": entry["at"], "duration": entry["duration"]})]
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for when in ("setup", "call", "teardown"):
+            report = pytest.TestReport(
+                item.nodeid, item.location, keywords, "passed", None, when, user_properties=properties
+            )
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        cached = _cached_property(report)
+        if report.when == "call":
+            # Counted on the xdist controller too, from the workers' reports
+            if cached is not None:
+                self.reused += 1
+                self.saved_seconds += cached["duration"]
+            else:
+                self.ran += 1
+        if cached is not None or report.nodeid not in self.keys:
+            return
+        if report.failed:
+            self.passed.pop(report.nodeid, None)
+            self.results.forget(report.nodeid)
+        elif report.when == "call" and report.passed and not hasattr(report, "wasxfail"):
+            self.passed[report.nodeid] = report.duration
+        elif report.when == "teardown" and report.nodeid in self.passed:
+            self.results.record(report.nodeid, self.keys[report.nodeid], self.passed.pop(report.nodeid))
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        self.results.save()
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if not self.reused and not self.keys and not self.apps:
+            return
+        terminalreporter.write_sep("-", "result cache")
+        for url, fingerprint in sorted(self.apps.items()):
+            state = f"fingerprint {fingerprint[:12]}" if fingerprint else "could not be fetched; its tests ran"
+            terminalreporter.write_line(f"{url}: {state}")
+        if self.reused or self.ran:
+            terminalreporter.write_line(
+                f"{self.reused} cached pass(es) reused, {self.saved_seconds:.1f}s of test time skipped; "
+                f"{self.ran} test(s) ran"
+            )
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("result-cache", "application fingerprint result cache")
+    group.addoption(
+        "--result-cache",
+        action="store_true",
+        help="Report a cached pass instead of running a browser test whose app, test code and "
+        "platform match it; nothing is sent to BrowserStack for those tests",
+    )
+    group.addoption(
+        "--no-result-cache",
+        action="store_true",
+        help="Run every test, overriding --result-cache (for example one set in addopts)",
+    )
+    group.addoption(
+        "--result-cache-max-age",
+        type=float,
+        default=7,
+        help="Days a cached pass can be reused for (default: %(default)s)",
+    )
+    group.addoption(
+        "--result-cache-max-entries",
+        type=int,
+        default=5000,
+        help="Cached passes kept per platform, newest first (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        f"{MARKER}(url): application the test runs against, fingerprinted for the result cache "
+        "instead of the base URL",
+    )
+    if not config.getoption("result_cache") or config.getoption("no_result_cache"):
+        return
+    if config.getoption("har_mode", "off") == "replay":
+        # Fingerprinting fetches the live application, which replay runs must not touch
+        if not hasattr(config, "workerinput"):
+            config.issue_config_time_warning(
+                pytest.PytestConfigWarning("--result-cache is not used with --har-mode=replay"), stacklevel=2
+            )
+        return
+    if getattr(config, "cache", None) is not None:
+        config.pluginmanager.register(ResultCachePlugin(config), "result-cache")
+
+
+def pytest_report_teststatus(report: pytest.TestReport) -> Optional[Tuple[str, str, str]]:
+    if report.when == "call" and report.passed and _cached_property(report) is not None:
+        return "passed", "c", "PASSED (cached)"
+    return None
@@ -0,0 +1,389 @@
+"""Per-test results from every worker and platform, merged into one report
+
+With --results-log each pytest process (an xdist worker, or one platform
+run of the BrowserStack SDK) appends one compact JSON line per finished test
+to results/<run>-<platform>-<worker>.jsonl. The merger streams those files
+into a test x platform matrix with durations and failure reasons. Memory
+grows with the number of tests and platforms, not with the records read,
+and --follow keeps the report and a one-line summary per platform up to
+date while the run is going. Only each platform's newest run is merged
+unless --run or --all-runs picks others:
+
+    python tests/support/results.py --follow
+    python tests/support/results.py results/ --report results/report.json
+    python tests/support/results.py --run 3f2a --report results/3f2a.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+import warnings
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
+
+# Running as a script puts this directory, not tests/, on sys.path, and its
+# modules would shadow others of the same name (concurrent, for one)
+SUPPORT_DIR = Path(__file__).resolve().parent
+if __name__ == "__main__":
+    sys.path[:] = [path for path in sys.path if Path(path or ".").resolve() != SUPPORT_DIR]
+    sys.path.insert(0, str(SUPPORT_DIR.parent))
+
+import pytest  # noqa: E402
+
+from support.config import ROOT_DIR, platform_key, worker_id, write_atomic  # noqa: E402
+from support.outcomes import PHASE_REPORTS  # noqa: E402
+from support.result_cache import CACHED_PASS  # noqa: E402
+from support.status import clean_error  # noqa: E402
+
+RESULTS_DIR = ROOT_DIR / "results"
+OUTCOMES = ("passed", "failed", "error", "skipped", "xfailed", "xpassed")
+# Failure reasons are cut to this many characters in the report
+MAX_REASON = 300
+
+
+def outcome_of(reports: Dict[str, pytest.TestReport]) -> str:
+    """One outcome for a test from its setup, call and teardown reports"""
+    call = reports.get("call")
+    if any(report.failed for when, report in reports.items() if when != "call"):
+        return "error"
+    if call is None:
+        return "skipped"
+    if hasattr(call, "wasxfail"):
+        return "xfailed" if call.skipped else "xpassed"
+    return call.outcome
+
+
+def reason_of(reports: Dict[str, pytest.TestReport]) -> Optional[str]:
+    """Failure or skip message of the first phase that has one, without Playwright's call log"""
+    for report in reports.values():
+        if report.passed:
+            continue
+        longrepr = report.longrepr
+        if isinstance(longrepr, tuple):
+            return clean_error(longrepr[2])[:MAX_REASON]
+        crash = getattr(longrepr, "reprcrash", None)
+        message = crash.message if crash is not None else str(longrepr)
+        return clean_error(message)[:MAX_REASON]
+    return None
+
+
+def properties_of(user_properties: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """user_properties as a dict; a name that appears more than once gets a list"""
+    values: Dict[str, List[Any]] = {}
+    for name, value in user_properties:
+        values.setdefault(name, []).append(value)
+    return {name: found[0] if len(found) == 1 else found for name, found in values.items()}
+
+
+def build_record(item: pytest.Item, run_id: str) -> Optional[Dict[str, Any]]:
+    cached = item.stash.get(CACHED_PASS, None)
+    reports = item.stash.get(PHASE_REPORTS, {})
+    if cached is None and not reports:
+        return None
+    record = {
+        "test": item.nodeid,
+        "platform": platform_key(),
+        "worker": worker_id(),
+        "run": run_id,
+        "at": round(time.time(), 3),
+    }
+    if cached is not None:
+        record.update(outcome="passed", duration=0.0, cached=True)
+        return record
+    record["outcome"] = outcome_of(reports)
+    record["duration"] = round(sum(report.duration for report in reports.values()), 3)
+    reason = reason_of(reports)
+    if reason:
+        record["reason"] = reason
+    properties = properties_of(list(item.user_properties))
+    if properties:
+        record["properties"] = properties
+    return record
+
+
+class ResultLog:
+    """This process's results, one JSON line per test, appended as tests finish"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.records = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Opened per record, so a merger following the file sees every finished test
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self.records += 1
+
+
+RESULT_LOG = pytest.StashKey[ResultLog]()
+RUN_ID = pytest.StashKey[str]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("results", "streamed per-test results")
+    group.addoption(
+        "--results-log",
+        action="store_true",
+        help="Append one JSON line per finished test for tests/support/results.py to merge",
+    )
+    group.addoption(
+        "--results-dir",
+        default=str(RESULTS_DIR),
+        help="Where per-worker JSON-lines results are written",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.getoption("results_log"):
+        return
+    # Workers of one xdist run share its uid, so their files sort together
+    run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    config.stash[RUN_ID] = run_id
+    path = Path(config.getoption("results_dir")) / f"{run_id}-{platform_key()}-{worker_id()}.jsonl"
+    config.stash[RESULT_LOG] = ResultLog(path)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: pytest.Item) -> Generator[None, None, None]:
+    yield
+    log = item.config.stash.get(RESULT_LOG, None)
+    if log is None:
+        return
+    record = build_record(item, item.config.stash[RUN_ID])
+    if record is not None:
+        log.write(record)
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    log = config.stash.get(RESULT_LOG, None)
+    if log is None or not log.records:
+        return
+    terminalreporter.write_sep("-", "results log")
+    terminalreporter.write_line(
+        f"{log.records} results appended to {log.path}; merge with python tests/support/results.py"
+    )
+
+
+@lru_cache(maxsize=None)
+def _jsonmerge() -> Optional[Callable[[Any, Any], Any]]:
+    """jsonmerge.merge, or None when the optional jsonmerge is not installed"""
+    try:
+        with warnings.catch_warnings():
+            # jsonmerge still uses jsonschema's deprecated RefResolver
+            warnings.simplefilter("ignore", DeprecationWarning)
+            from jsonmerge import merge
+    except ImportError:
+        return None
+    return merge
+
+
+def merge_properties(base: Dict[str, Any], head: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep-merge head into base, with jsonmerge when it is installed"""
+    merge = _jsonmerge()
+    if merge is not None:
+        with warnings.catch_warnings():
+            # It warns again on every merge
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return merge(base, head)
+    merged = dict(base)
+    for name, value in head.items():
+        if isinstance(value, dict) and isinstance(merged.get(name), dict):
+            merged[name] = merge_properties(merged[name], value)
+        else:
+            merged[name] = value
+    return merged
+
+
+class ResultMatrix:
+    """Latest result of every test on every platform, folded in one record at a time
+
+    Unless across_runs is set, a record from a newer run than a cell's starts
+    that cell over, so attempts are only counted within one run.
+    """
+
+    def __init__(self, across_runs: bool = False) -> None:
+        self.tests: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.records = 0
+        self.across_runs = across_runs
+
+    def feed(self, record: Dict[str, Any]) -> None:
+        self.records += 1
+        cells = self.tests.setdefault(record["test"], {})
+        previous = cells.get(record["platform"])
+        if previous is not None and previous.get("run") != record.get("run") and not self.across_runs:
+            if previous["at"] > record["at"]:
+                # An attempt of an older run
+                return
+            previous = None
+        if previous is not None and previous["at"] > record["at"]:
+            # An older attempt read after a newer one; only count it
+            previous["attempts"] += 1
+            return
+        cell = {name: record[name] for name in ("outcome", "duration", "at") if name in record}
+        for name in ("reason", "cached", "worker", "run"):
+            if record.get(name) is not None:
+                cell[name] = record[name]
+        cell["attempts"] = 1 if previous is None else previous["attempts"] + 1
+        properties = record.get("properties") or {}
+        if previous is not None and previous.get("properties"):
+            properties = merge_properties(previous["properties"], properties)
+        if properties:
+            cell["properties"] = properties
+        cells[record["platform"]] = cell
+
+    def platforms(self) -> Dict[str, Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for test, cells in self.tests.items():
+            for platform, cell in cells.items():
+                total = totals.setdefault(
+                    platform, {**dict.fromkeys(OUTCOMES, 0), "duration": 0.0, "slowest": None}
+                )
+                total[cell["outcome"]] = total.get(cell["outcome"], 0) + 1
+                total["duration"] = round(total["duration"] + cell["duration"], 3)
+                if total["slowest"] is None or cell["duration"] > total["slowest"][1]:
+                    total["slowest"] = [test, cell["duration"]]
+        return dict(sorted(totals.items()))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "platforms": self.platforms(),
+            "tests": {test: dict(sorted(cells.items())) for test, cells in sorted(self.tests.items())},
+        }
+
+
+def run_of(path: Path) -> Tuple[str, str]:
+    """Run id and platform of a <run>-<platform>-<worker>.jsonl results file"""
+    run, _, rest = path.stem.partition("-")
+    return run, rest.rpartition("-")[0]
+
+
+def newest_runs(files: List[Path]) -> List[Path]:
+    """The files of each platform's most recently written run
+
+    Each platform of an SDK build is a pytest process, with a run id of its
+    own, so the newest run is picked per platform.
+    """
+    written: Dict[Tuple[str, str], float] = {}
+    for file in files:
+        key = run_of(file)
+        written[key] = max(written.get(key, 0.0), file.stat().st_mtime)
+    newest: Dict[str, Tuple[float, str]] = {}
+    for (run, platform), mtime in written.items():
+        newest[platform] = max(newest.get(platform, (0.0, "")), (mtime, run))
+    return [file for file in files if run_of(file)[0] == newest[run_of(file)[1]][1]]
+
+
+class ResultFollower:
+    """Reads the complete lines added to the results files since the last poll
+
+    Files named on the command line are always read. Of the files found in
+    a directory, only those of run (a run id prefix) are read, or with no
+    run, those of each platform's newest run unless all_runs is set.
+    """
+
+    def __init__(self, paths: List[Path], run: Optional[str] = None, all_runs: bool = False) -> None:
+        self.paths = paths
+        self.run = run
+        self.all_runs = all_runs
+        self.offsets: Dict[Path, int] = {}
+
+    def files(self) -> List[Path]:
+        files: List[Path] = []
+        for path in self.paths:
+            if not path.is_dir():
+                files.append(path)
+                continue
+            found = sorted(path.glob("*.jsonl"))
+            if self.run is not None:
+                found = [file for file in found if run_of(file)[0].startswith(self.run)]
+            elif not self.all_runs:
+                found = newest_runs(found)
+            files.extend(found)
+        return [file for file in files if file.exists()]
+
+    def poll(self) -> Iterator[Dict[str, Any]]:
+        for file in self.files():
+            with open(file, "rb") as handle:
+                handle.seek(self.offsets.get(file, 0))
+                yield from self._read(file, handle)
+
+    def _read(self, file: Path, handle: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        while True:
+            line_start = handle.tell()
+            raw = handle.readline()
+            if not raw.endswith(b"\n"):
+                # EOF, or a line still being written; start from it next time
+                self.offsets[file] = line_start
+                return
+            if raw.strip():
+                yield json.loads(raw)
+
+
+def format_summary(platforms: Dict[str, Dict[str, Any]]) -> List[str]:
+    lines = []
+    for platform, total in platforms.items():
+        counts = ", ".join(f"{total[outcome]} {outcome}" for outcome in OUTCOMES if total.get(outcome))
+        slowest = total["slowest"]
+        lines.append(
+            f"{platform}: {counts} in {total['duration']:.1f}s (slowest {slowest[0]} {slowest[1]:.1f}s)"
+        )
+    return lines
+
+
+def format_failures(report: Dict[str, Any]) -> List[str]:
+    return [
+        f"{cell['outcome'].upper()} {test} [{platform}]: {cell.get('reason', '')}"
+        for test, cells in report["tests"].items()
+        for platform, cell in cells.items()
+        if cell["outcome"] in ("failed", "error", "xpassed")
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=[RESULTS_DIR], help="results files or directories")
+    parser.add_argument("--report", type=Path, default=RESULTS_DIR / "report.json", help="merged report output")
+    parser.add_argument("--follow", action="store_true", help="keep merging as results are appended")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls with --follow")
+    runs = parser.add_mutually_exclusive_group()
+    runs.add_argument("--run", help="only merge this run id (or prefix); default: each platform's newest run")
+    runs.add_argument("--all-runs", action="store_true", help="merge every run, counting attempts across them")
+    args = parser.parse_args(argv)
+
+    matrix = ResultMatrix(across_runs=args.all_runs)
+    follower = ResultFollower(args.paths, args.run, args.all_runs)
+    summary: List[str] = []
+    try:
+        while True:
+            before = matrix.records
+            for record in follower.poll():
+                matrix.feed(record)
+            if matrix.records != before:
+                report = matrix.report()
+                write_atomic(args.report, json.dumps(report, indent=2).encode())
+                summary = format_summary(report["platforms"])
+                if args.follow:
+                    print(f"[{time.strftime('%H:%M:%S')}] {matrix.records} results", *summary, sep="\n  ")
+            if not args.follow:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    if not matrix.records:
+        print(f"no results in {', '.join(str(path) for path in args.paths)}")
+        return 0
+    if not args.follow:
+        print(*summary, sep="\n")
+    for line in format_failures(matrix.report()):
+        print(line)
+    print(f"{matrix.records} results merged into {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
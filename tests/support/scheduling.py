@@ -0,0 +1,166 @@
+import heapq
+import statistics
+import time
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import pytest
+
+from support.config import load_browserstack_config, platform_key, platforms
+
+HISTORY_KEY = "scheduling/durations"
+# Weight of the newest run in the per-test moving average
+SMOOTHING = 0.5
+
+
+def lpt_assign(
+    jobs: Sequence[Tuple[Hashable, float]], slots: int
+) -> Tuple[List[List[Hashable]], float]:
+    """Longest-processing-time-first packing of jobs onto slots
+
+    Returns the jobs given to each slot, in start order, and the predicted
+    makespan.
+    """
+    slots = max(1, slots)
+    assignment: List[List[Hashable]] = [[] for _ in range(slots)]
+    loads = [(0.0, slot) for slot in range(slots)]
+    for key, duration in sorted(jobs, key=lambda job: job[1], reverse=True):
+        load, slot = heapq.heappop(loads)
+        assignment[slot].append(key)
+        heapq.heappush(loads, (load + duration, slot))
+    return assignment, max(load for load, _ in loads)
+
+
+class DurationHistory:
+    """Smoothed per-test durations for one platform, kept in the pytest cache"""
+
+    def __init__(self, cache: Any, platform: str) -> None:
+        self.cache = cache
+        self.key = f"{HISTORY_KEY}/{platform}"
+        self.durations: Dict[str, float] = cache.get(self.key, {}) if cache else {}
+
+    def predict(self, nodeid: str) -> Optional[float]:
+        return self.durations.get(nodeid)
+
+    def default(self) -> float:
+        """Guess for tests with no history: the median of the known ones"""
+        return statistics.median(self.durations.values()) if self.durations else 1.0
+
+    def update(self, measured: Dict[str, float]) -> None:
+        for nodeid, seconds in measured.items():
+            previous = self.durations.get(nodeid)
+            self.durations[nodeid] = (
+                seconds if previous is None else SMOOTHING * seconds + (1 - SMOOTHING) * previous
+            )
+        if self.cache:
+            self.cache.set(self.key, self.durations)
+
+
+class DurationScheduler:
+    """Orders tests longest-first and compares predicted with actual makespan"""
+
+    def __init__(self, config: pytest.Config) -> None:
+        self.config = config
+        self.history = DurationHistory(config.cache, platform_key())
+        self.measured: Dict[str, float] = {}
+        self.predicted: Optional[float] = None
+        self.unknown = 0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def slots(self) -> int:
+        workers = getattr(self.config.option, "numprocesses", None)
+        return workers if isinstance(workers, int) and workers > 0 else 1
+
+    @property
+    def runs_tests(self) -> bool:
+        """False for --collect-only, --setup-plan and --setup-only, which run nothing to measure"""
+        option = self.config.option
+        return not (option.collectonly or option.setupplan or option.setuponly)
+
+    def predict(self, nodeids: Sequence[str]) -> Dict[str, float]:
+        default = self.history.default()
+        predictions = {}
+        self.unknown = 0
+        for nodeid in nodeids:
+            predicted = self.history.predict(nodeid)
+            if predicted is None:
+                self.unknown += 1
+            predictions[nodeid] = default if predicted is None else predicted
+        _, self.predicted = lpt_assign(list(predictions.items()), self.slots)
+        return predictions
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[pytest.Item]) -> None:
+        predictions = self.predict([item.nodeid for item in items])
+        # Stable sort, so every xdist worker collects the same order; with
+        # --dist load the longest tests are then handed out first
+        items.sort(key=lambda item: predictions[item.nodeid], reverse=True)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node: Any, ids: List[str]) -> None:
+        # The xdist controller does not collect, so predict from the first worker's items
+        if self.predicted is None:
+            self.predict(ids)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        self.measured[report.nodeid] = self.measured.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        self.finished = time.monotonic()
+        if not self.runs_tests:
+            return
+        if not hasattr(self.config, "workerinput") and self.measured:
+            self.history.update(self.measured)
+
+    def matrix_makespan(self, slots: int) -> Optional[float]:
+        """Predicted makespan of every (test, platform) pair on the parallel quota"""
+        jobs = []
+        for entry in platforms():
+            durations = self.config.cache.get(f"{HISTORY_KEY}/{platform_key(entry)}", {})
+            jobs.extend(((platform_key(entry), nodeid), seconds) for nodeid, seconds in durations.items())
+        return lpt_assign(jobs, slots)[1] if jobs else None
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if self.predicted is None or self.finished is None or hasattr(self.config, "workerinput"):
+            return
+        if not self.runs_tests:
+            return
+        actual = self.finished - self.started
+        terminalreporter.write_sep("-", "duration-aware scheduling")
+        terminalreporter.write_line(
+            f"{platform_key()}: predicted makespan {self.predicted:.1f}s on {self.slots} slot(s), "
+            f"actual {actual:.1f}s ({self.unknown} tests without history)"
+        )
+        quota = self.config.getoption("parallel_slots") or default_parallel_slots()
+        matrix = self.matrix_makespan(quota)
+        if matrix is not None:
+            terminalreporter.write_line(
+                f"platform matrix: predicted makespan {matrix:.1f}s on {quota} parallel session(s)"
+            )
+
+
+def default_parallel_slots() -> int:
+    """Parallel sessions browserstack.yml asks for across all platforms"""
+    per_platform = int(load_browserstack_config().get("parallelsPerPlatform") or 1)
+    return per_platform * max(1, len(platforms()))
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("scheduling", "duration-aware scheduling")
+    group.addoption(
+        "--no-lpt",
+        action="store_true",
+        help="Keep file order instead of running the longest tests first",
+    )
+    group.addoption(
+        "--parallel-slots",
+        type=int,
+        default=None,
+        help="Parallel session quota used to predict the platform-matrix makespan",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if not config.getoption("no_lpt") and getattr(config, "cache", None) is not None:
+        config.pluginmanager.register(DurationScheduler(config), "duration-scheduler")
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Generator, List
+
+import pytest
+
+from support.config import ROOT_DIR, platform_key, slugify, write_atomic
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+
+class ScreenshotStore:
+    """Content-addressed screenshot objects, written to disk on a background thread pool"""
+
+    def __init__(self, root: Path, workers: int = 2) -> None:
+        self.root = Path(root)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshots")
+        self._lock = threading.Lock()
+        self._known: set = set()
+        self._pending: List[Future] = []
+        self.captured = 0
+        self.bytes_written = 0
+        self.bytes_deduplicated = 0
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.png"
+
+    def manifest_path(self, nodeid: str) -> Path:
+        return self.root / "manifests" / platform_key() / f"{slugify(nodeid)}.json"
+
+    def add(self, data: bytes) -> str:
+        """Store PNG bytes once and return their sha256 digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.captured += 1
+            path = self.object_path(digest)
+            if digest in self._known or path.exists():
+                self._known.add(digest)
+                self.bytes_deduplicated += len(data)
+                return digest
+            self._known.add(digest)
+            self.bytes_written += len(data)
+            self._pending.append(self._executor.submit(write_atomic, path, data))
+        return digest
+
+    def write_manifest(self, nodeid: str, entries: Dict[str, str]) -> Path:
+        """Record which object each named screenshot of a test points at"""
+        path = self.manifest_path(nodeid)
+        data = json.dumps(entries, indent=2, sort_keys=True).encode("utf-8")
+        with self._lock:
+            self._pending.append(self._executor.submit(write_atomic, path, data))
+        return path
+
+    def flush(self) -> None:
+        """Block until every queued write has finished, re-raising write errors"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+class TestScreenshots:
+    """Screenshots taken by one test, named within that test"""
+
+    __test__ = False
+
+    def __init__(self, store: ScreenshotStore) -> None:
+        self.store = store
+        self.entries: Dict[str, str] = {}
+
+    def take(self, page: "Page", name: str, **kwargs: Any) -> bytes:
+        """Capture page as PNG, queue it for storage and return the raw bytes"""
+        data = page.screenshot(**kwargs)
+        self.entries[name] = self.store.add(data)
+        return data
+
+    def path(self, name: str) -> Path:
+        """Where the named screenshot's object is (or will be) on disk"""
+        return self.store.object_path(self.entries[name])
+
+
+SCREENSHOT_STORE = pytest.StashKey[ScreenshotStore]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("screenshots", "screenshot storage")
+    group.addoption(
+        "--screenshot-dir",
+        default=str(ROOT_DIR / "screenshots"),
+        help="Root of the content-addressed screenshot store",
+    )
+    group.addoption(
+        "--screenshot-workers",
+        type=int,
+        default=2,
+        help="Background threads writing screenshots to disk (default: %(default)s)",
+    )
+
+
+@pytest.fixture(scope="session")
+def screenshot_store(pytestconfig: pytest.Config) -> Generator[ScreenshotStore, None, None]:
+    store = ScreenshotStore(
+        Path(pytestconfig.getoption("screenshot_dir")),
+        workers=pytestconfig.getoption("screenshot_workers"),
+    )
+    pytestconfig.stash[SCREENSHOT_STORE] = store
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def screenshots(
+    screenshot_store: ScreenshotStore, request: pytest.FixtureRequest
+) -> Generator[TestScreenshots, None, None]:
+    """Per-test screenshot taker; its manifest is written when the test ends"""
+    shots = TestScreenshots(screenshot_store)
+    yield shots
+    if shots.entries:
+        path = screenshot_store.write_manifest(request.node.nodeid, shots.entries)
+        request.node.user_properties.append(("screenshots", str(path)))
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    store = config.stash.get(SCREENSHOT_STORE, None)
+    if store is None or not store.captured:
+        return
+    terminalreporter.write_sep("-", "screenshots")
+    terminalreporter.write_line(
+        f"{store.captured} captured, {store.bytes_written // 1024} KiB written, "
+        f"{store.bytes_deduplicated // 1024} KiB skipped as duplicates"
+    )
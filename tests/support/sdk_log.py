@@ -0,0 +1,289 @@
+"""Streaming analyzer for the BrowserStack SDK CLI log (log/sdk-cli.log)
+
+Reads the log incrementally, optionally following it as it grows or
+resuming from the byte offset saved by a previous run, and turns testhub
+events into a per-build, per-test timeline:
+
+    python tests/support/sdk_log.py log/sdk-cli.log --csv log/sdk-timeline.csv
+    python tests/support/sdk_log.py --follow
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+LOG_DIR = Path(__file__).resolve().parents[2] / "log"
+
+HEADER_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z) CLI (\w+) ?(.*)$")
+TAG_RE = re.compile(r"\s*\[([^\]]*)\]")
+RUN_ID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+# Only the top level of an event and of its test_run/hook_run object is kept;
+# deeper payloads such as the test source code are skipped line by line.
+EVENT_TYPE_RE = re.compile(r"^  event_type: '(\w+)'")
+FIELD_RE = re.compile(r"^    (\w+): '?([^']*?)'?,?$")
+
+EVENT_MESSAGE = "Added the event {"
+TIMELINE_COLUMNS = [
+    "build_id", "run_id", "test", "file", "result",
+    "setup_ms", "body_ms", "teardown_ms", "status_upload_ms",
+]
+
+
+class LogEntry:
+    """One timestamped log record, with the top-level fields of its event if it has one"""
+
+    def __init__(self, timestamp: str, level: str, tags: List[str], message: str) -> None:
+        self.timestamp = timestamp
+        self.level = level
+        self.tags = tags
+        self.message = message
+        self.event_type: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+
+    @property
+    def run_id(self) -> Optional[str]:
+        return next((tag for tag in reversed(self.tags) if RUN_ID_RE.match(tag)), None)
+
+    @classmethod
+    def parse_header(cls, line: str) -> Optional["LogEntry"]:
+        match = HEADER_RE.match(line)
+        if not match:
+            return None
+        timestamp, level, rest = match.groups()
+        tags = []
+        position = 0
+        for tag in TAG_RE.finditer(rest):
+            if tag.start() != position:
+                break
+            tags.append(tag.group(1))
+            position = tag.end()
+        return cls(timestamp, level, tags, rest[position:].strip())
+
+    def add_line(self, line: str) -> None:
+        if self.message != EVENT_MESSAGE:
+            return
+        match = EVENT_TYPE_RE.match(line)
+        if match:
+            self.event_type = match.group(1)
+            return
+        match = FIELD_RE.match(line)
+        if match and match.group(1) not in self.fields:
+            self.fields[match.group(1)] = match.group(2)
+
+
+def iter_entries(
+    handle: IO[bytes], follow: bool = False, poll_interval: float = 1.0
+) -> Iterator[Tuple[LogEntry, int]]:
+    """Yield (entry, resume_offset) pairs from a binary log handle
+
+    resume_offset is where reading should restart to pick up the entries
+    after this one. With follow, keeps polling for new lines at EOF.
+    """
+    current: Optional[LogEntry] = None
+    while True:
+        line_start = handle.tell()
+        raw = handle.readline()
+        if not raw:
+            if not follow:
+                break
+            time.sleep(poll_interval)
+            continue
+        if not raw.endswith(b"\n") and follow:
+            # A partially written line; wait for the rest of it
+            handle.seek(line_start)
+            time.sleep(poll_interval)
+            continue
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        entry = LogEntry.parse_header(line)
+        if entry is None:
+            if current is not None:
+                current.add_line(line)
+            continue
+        if current is not None:
+            yield current, line_start
+        current = entry
+    if current is not None:
+        yield current, handle.tell()
+
+
+def _ms_between(start: Optional[str], end: Optional[str]) -> Optional[int]:
+    if not start or not end:
+        return None
+    parse = lambda value: datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")  # noqa: E731
+    return round((parse(end) - parse(start)).total_seconds() * 1000)
+
+
+class Timeline:
+    """Per-build and per-test milestones, small enough to persist between runs"""
+
+    def __init__(self, builds: Optional[Dict[str, Any]] = None) -> None:
+        self.builds: Dict[str, Any] = builds or {}
+
+    def feed(self, entry: LogEntry) -> None:
+        run_id = entry.run_id
+        if run_id is None:
+            return
+        build = self.builds.setdefault(run_id, {"cli_started_at": entry.timestamp, "tests": {}})
+        message = entry.message
+        if message.startswith("startBuild: payload"):
+            build["build_requested_at"] = entry.timestamp
+        elif message.startswith("startBuild: response="):
+            build["build_id"] = message.split("=", 1)[1].strip()
+            build["build_created_at"] = entry.timestamp
+        elif message.startswith("stopBuild"):
+            build["stopped_at"] = entry.timestamp
+        elif message == EVENT_MESSAGE and entry.event_type:
+            self._feed_event(build, entry)
+
+    def _feed_event(self, build: Dict[str, Any], entry: LogEntry) -> None:
+        fields, event_type = entry.fields, entry.event_type
+        test_id = fields.get("test_run_id") or fields.get("uuid")
+        if not test_id:
+            return
+        test = build["tests"].setdefault(test_id, {})
+        if event_type in ("HookRunStarted", "HookRunFinished"):
+            build.setdefault("first_hook_at", fields.get("started_at"))
+            # Tests that fail during setup never send TestRunStarted, so name them from the hook
+            test.setdefault("name", fields.get("scope"))
+            test.setdefault("file", fields.get("file_name"))
+            phase = "setup" if fields.get("hook_type", "").startswith("BEFORE") else "teardown"
+            started, finished = fields.get("started_at"), fields.get("finished_at")
+            if started and (f"{phase}_started_at" not in test or started < test[f"{phase}_started_at"]):
+                test[f"{phase}_started_at"] = started
+            if finished and finished > test.get(f"{phase}_finished_at", ""):
+                test[f"{phase}_finished_at"] = finished
+        elif event_type in ("TestRunStarted", "TestRunFinished"):
+            test["name"] = fields.get("name", test.get("name"))
+            test["file"] = fields.get("file_name", test.get("file"))
+            test["started_at"] = fields.get("started_at", test.get("started_at"))
+            if event_type == "TestRunFinished":
+                test["result"] = fields.get("result")
+                test["duration_ms"] = int(fields.get("duration_in_ms") or 0)
+                test["finished_at"] = fields.get("finished_at")
+                test["reported_at"] = entry.timestamp
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """One row per test with its phase durations in milliseconds"""
+        for run_id, build in self.builds.items():
+            for test in build["tests"].values():
+                if "name" not in test:
+                    continue
+                yield {
+                    "build_id": build.get("build_id"),
+                    "run_id": run_id,
+                    "test": test["name"],
+                    "file": test.get("file"),
+                    "result": test.get("result"),
+                    "setup_ms": _ms_between(test.get("setup_started_at"), test.get("setup_finished_at")),
+                    "body_ms": test.get("duration_ms"),
+                    "teardown_ms": _ms_between(test.get("teardown_started_at"), test.get("teardown_finished_at")),
+                    "status_upload_ms": _ms_between(test.get("finished_at"), test.get("reported_at")),
+                }
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact per-build summary: SDK overhead, totals per phase and per-test rows"""
+        rows_by_run: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.rows():
+            rows_by_run.setdefault(row["run_id"], []).append(row)
+        builds = []
+        for run_id, build in self.builds.items():
+            rows = rows_by_run.get(run_id, [])
+            totals = {
+                column: sum(row[column] or 0 for row in rows)
+                for column in ("setup_ms", "body_ms", "teardown_ms", "status_upload_ms")
+            }
+            builds.append({
+                "run_id": run_id,
+                "build_id": build.get("build_id"),
+                "started_at": build.get("cli_started_at"),
+                "build_create_ms": _ms_between(build.get("build_requested_at"), build.get("build_created_at")),
+                "sdk_setup_ms": _ms_between(build.get("cli_started_at"), build.get("first_hook_at")),
+                "wall_ms": _ms_between(build.get("cli_started_at"), build.get("stopped_at")),
+                "tests": len(rows),
+                "totals": totals,
+                "timeline": rows,
+            })
+        return {"builds": builds}
+
+
+def analyze(
+    log_path: Path,
+    state_path: Optional[Path] = None,
+    follow: bool = False,
+    on_update: Optional[Any] = None,
+    poll_interval: float = 1.0,
+) -> Timeline:
+    """Stream log_path into a Timeline, resuming from and saving to state_path
+
+    The state is saved and on_update called once more however reading ends,
+    including Ctrl-C while following.
+    """
+    state: Dict[str, Any] = {}
+    if state_path and state_path.exists():
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    offset = state.get("offset", 0)
+    timeline = Timeline(state.get("builds"))
+    try:
+        with open(log_path, "rb") as handle:
+            if offset > handle.seek(0, 2):
+                # The log was truncated or rotated; start over
+                offset, timeline = 0, Timeline()
+            handle.seek(offset)
+            for entry, offset in iter_entries(handle, follow=follow, poll_interval=poll_interval):
+                timeline.feed(entry)
+                if follow and on_update and entry.message.startswith("stopBuild"):
+                    on_update(timeline)
+    finally:
+        if state_path:
+            state_path.write_text(json.dumps({"offset": offset, "builds": timeline.builds}), encoding="utf-8")
+        if on_update:
+            on_update(timeline)
+    return timeline
+
+
+def write_outputs(timeline: Timeline, json_path: Optional[Path], csv_path: Optional[Path]) -> None:
+    if json_path:
+        json_path.write_text(json.dumps(timeline.summary(), indent=2), encoding="utf-8")
+    if csv_path:
+        with open(csv_path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=TIMELINE_COLUMNS)
+            writer.writeheader()
+            for row in timeline.rows():
+                writer.writerow(row)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", nargs="?", type=Path, default=LOG_DIR / "sdk-cli.log")
+    parser.add_argument("--json", type=Path, default=LOG_DIR / "sdk-timeline.json", help="summary JSON output")
+    parser.add_argument("--csv", type=Path, help="per-test timeline CSV output")
+    parser.add_argument("--state", type=Path, help="resume from and save the byte offset in this file")
+    parser.add_argument("--follow", action="store_true", help="keep reading as the log grows")
+    args = parser.parse_args(argv)
+
+    def on_update(timeline: Timeline) -> None:
+        write_outputs(timeline, args.json, args.csv)
+
+    try:
+        timeline = analyze(args.log, args.state, follow=args.follow, on_update=on_update)
+    except KeyboardInterrupt:
+        # analyze has saved the state and outputs
+        return 0
+    for build in timeline.summary()["builds"]:
+        totals = build["totals"]
+        print(
+            f"{build['build_id'] or build['run_id']}: {build['tests']} tests, "
+            f"sdk setup {build['sdk_setup_ms']} ms, setup {totals['setup_ms']} ms, "
+            f"body {totals['body_ms']} ms, teardown {totals['teardown_ms']} ms, "
+            f"status upload {totals['status_upload_ms']} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
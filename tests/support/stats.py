@@ -0,0 +1,106 @@
+import bisect
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile (0-100) with linear interpolation between closest ranks"""
+    if not values:
+        raise ValueError("percentile of an empty sequence")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Iterable[float], quantiles: Sequence[float] = (50, 95)) -> Dict[str, float]:
+    """{"p50": ..., "p95": ...} for the given quantiles"""
+    ordered = sorted(values)
+    return {f"p{q:g}": percentile(ordered, q) for q in quantiles}
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile in constant memory (Jain & Chlamtac's P² algorithm)
+
+    Five markers track the minimum, the target quantile, the maximum and the
+    points halfway to them; each observation nudges their heights along a
+    piecewise-parabolic fit. The first five observations are kept as-is.
+    """
+
+    def __init__(self, q: float) -> None:
+        if not 0 < q < 100:
+            raise ValueError("quantile must be between 0 and 100")
+        self.q = q
+        self.count = 0
+        self.heights: List[float] = []
+        p = q / 100
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.count <= 5:
+            bisect.insort(self.heights, value)
+            return
+        heights, positions = self.heights, self.positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect.bisect_right(heights, value) - 1
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in (1, 2, 3):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return percentile(self.heights, self.q)
+        return self.heights[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "q": self.q,
+            "count": self.count,
+            "heights": self.heights,
+            "positions": self.positions,
+            "desired": self.desired,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "P2Quantile":
+        estimate = cls(state["q"])
+        estimate.count = state["count"]
+        estimate.heights = list(state["heights"])
+        estimate.positions = list(state["positions"])
+        estimate.desired = list(state["desired"])
+        return estimate
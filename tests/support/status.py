@@ -0,0 +1,223 @@
+import abc
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import Page
+
+from support.config import ROOT_DIR, on_browserstack, platform_key
+from support.outcomes import PHASE_REPORTS, has_failed
+
+EXECUTOR_PREFIX = "browserstack_executor: "
+
+
+def clean_error(err: Any) -> str:
+    """One-line failure message without Playwright's call log"""
+    return " ".join(str(err).split("Call log:")[0].split())
+
+
+def executor_command(action: str, arguments: Dict[str, Any]) -> str:
+    """browserstack_executor string for page.evaluate, JSON-encoded so any reason text is safe"""
+    return EXECUTOR_PREFIX + json.dumps({"action": action, "arguments": arguments})
+
+
+@dataclass
+class StatusEvent:
+    action: str
+    arguments: Dict[str, Any]
+
+
+@dataclass
+class StatusStats:
+    """Executor calls made at teardown and the time they took"""
+
+    queued: int = 0
+    calls: int = 0
+    merged: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+STATUS_STATS = pytest.StashKey[StatusStats]()
+
+
+class StatusBackend(abc.ABC):
+    """Delivers one event; returns False when it could not be sent"""
+
+    @abc.abstractmethod
+    def send(self, page: Optional[Page], event: StatusEvent, nodeid: str) -> bool:
+        ...
+
+
+class BrowserStackBackend(StatusBackend):
+    """Sends each event to the session as a browserstack_executor call"""
+
+    def send(self, page: Optional[Page], event: StatusEvent, nodeid: str) -> bool:
+        if page is None or page.is_closed():
+            return False
+        page.evaluate("_ => {}", executor_command(event.action, event.arguments))
+        return True
+
+
+class LocalBackend(StatusBackend):
+    """Offline stand-in that appends events to a JSON lines file"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, page: Optional[Page], event: StatusEvent, nodeid: str) -> bool:
+        record = {"test": nodeid, "platform": platform_key(), "action": event.action, **event.arguments}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+        return True
+
+
+class StatusReporter:
+    """Queues a test's session status and annotations and sends them at teardown
+
+    Consecutive annotations of the same level go out as one call, and only
+    the last status is sent.
+    """
+
+    def __init__(self, nodeid: str, backend: StatusBackend, stats: Optional[StatusStats] = None) -> None:
+        self.nodeid = nodeid
+        self.backend = backend
+        self.stats = stats or StatusStats()
+        self.events: List[StatusEvent] = []
+
+    def mark(self, status: str, reason: str = "") -> None:
+        self._queue(StatusEvent("setSessionStatus", {"status": status, "reason": reason}))
+
+    def passed(self, reason: str = "") -> None:
+        self.mark("passed", reason)
+
+    def failed(self, reason: str = "") -> None:
+        self.mark("failed", reason)
+
+    def annotate(self, data: str, level: str = "info") -> None:
+        self._queue(StatusEvent("annotate", {"data": data, "level": level}))
+
+    @property
+    def has_status(self) -> bool:
+        return self.status is not None
+
+    @property
+    def status(self) -> Optional[str]:
+        """The status that will be sent, if any"""
+        statuses = [event.arguments["status"] for event in self.events if event.action == "setSessionStatus"]
+        return statuses[-1] if statuses else None
+
+    def _queue(self, event: StatusEvent) -> None:
+        self.events.append(event)
+        self.stats.queued += 1
+
+    def batched(self) -> List[StatusEvent]:
+        """Events as they will be sent: annotations merged, then the final status"""
+        batch: List[StatusEvent] = []
+        status: Optional[StatusEvent] = None
+        for event in self.events:
+            if event.action == "setSessionStatus":
+                status = event
+            elif batch and batch[-1].arguments["level"] == event.arguments["level"]:
+                merged = batch[-1].arguments["data"] + "\n" + event.arguments["data"]
+                batch[-1] = StatusEvent("annotate", {**batch[-1].arguments, "data": merged})
+            else:
+                batch.append(event)
+        return batch + ([status] if status else [])
+
+    def flush(self, page: Optional[Page]) -> None:
+        batch = self.batched()
+        self.stats.merged += len(self.events) - len(batch)
+        self.events = []
+        for event in batch:
+            started = time.perf_counter()
+            try:
+                sent = self.backend.send(page, event, self.nodeid)
+            except PlaywrightError:
+                sent = False
+            self.stats.seconds += time.perf_counter() - started
+            if sent:
+                self.stats.calls += 1
+            else:
+                self.stats.failed += 1
+
+
+STATUS_REPORTER = pytest.StashKey[StatusReporter]()
+
+
+def _failure_reason(item: pytest.Item) -> str:
+    for report in item.stash.get(PHASE_REPORTS, {}).values():
+        if report.failed:
+            crash = getattr(report.longrepr, "reprcrash", None)
+            return clean_error(crash.message if crash else report.longreprtext)
+    return ""
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("status", "session status reporting")
+    group.addoption(
+        "--status-backend",
+        choices=("auto", "browserstack", "local"),
+        default="auto",
+        help="Where session statuses go; auto uses browserstack under the SDK and local otherwise",
+    )
+    group.addoption(
+        "--status-log",
+        default=str(ROOT_DIR / "log" / "session-status.jsonl"),
+        help="File the local status backend appends to",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[STATUS_STATS] = StatusStats()
+
+
+@pytest.fixture(scope="session")
+def status_backend(pytestconfig: pytest.Config) -> StatusBackend:
+    choice = pytestconfig.getoption("status_backend")
+    if choice == "browserstack" or (choice == "auto" and on_browserstack()):
+        return BrowserStackBackend()
+    return LocalBackend(Path(pytestconfig.getoption("status_log")))
+
+
+@pytest.fixture
+def session_status(
+    pytestconfig: pytest.Config, status_backend: StatusBackend, request: pytest.FixtureRequest
+) -> StatusReporter:
+    """Session status and annotations for this test, sent after it finishes"""
+    reporter = StatusReporter(request.node.nodeid, status_backend, pytestconfig.stash[STATUS_STATS])
+    request.node.stash[STATUS_REPORTER] = reporter
+    return reporter
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item: pytest.Item) -> None:
+    # Runs before fixtures are finalized, so the test's page is still open
+    reporter = item.stash.get(STATUS_REPORTER, None)
+    if reporter is None:
+        return
+    # A test that queued passed can still fail afterwards, on the --perf-gate for one
+    if has_failed(item) and reporter.status != "failed":
+        reporter.failed(_failure_reason(item))
+    funcargs: Dict[str, Any] = getattr(item, "funcargs", {})
+    page = next((value for value in funcargs.values() if isinstance(value, Page)), None)
+    reporter.flush(page)
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(STATUS_STATS, None)
+    if not stats or not stats.queued:
+        return
+    terminalreporter.write_sep("-", "session status")
+    terminalreporter.write_line(
+        f"{stats.queued} events queued, {stats.calls} executor calls in "
+        f"{stats.seconds * 1000:.0f} ms ({stats.merged} merged, {stats.failed} not delivered)"
+    )
@@ -0,0 +1,161 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+import pytest
+
+from support.config import platform_key
+from support.stats import P2Quantile
+
+CACHE_KEY = "timeouts/latencies"
+QUANTILE = 99
+
+
+class TimeoutPolicy:
+    """Step timeouts derived from the p99 latency each step has shown before
+
+    A step with at least min_samples successful runs gets multiplier times its
+    streaming p99 estimate, clamped to [floor_ms, ceiling_ms]. Steps without
+    enough history keep the default their caller passes.
+    """
+
+    def __init__(
+        self,
+        estimates: Optional[Dict[str, P2Quantile]] = None,
+        multiplier: float = 3.0,
+        floor_ms: float = 1000,
+        ceiling_ms: float = 60000,
+        min_samples: int = 10,
+        adapt: bool = True,
+    ) -> None:
+        self.estimates: Dict[str, P2Quantile] = estimates or {}
+        self.multiplier = multiplier
+        self.floor_ms = floor_ms
+        self.ceiling_ms = ceiling_ms
+        self.min_samples = min_samples
+        self.adapt = adapt
+        self.updated: Set[str] = set()
+        self.adaptive = 0
+        self.fallback = 0
+        # Written defaults minus the adaptive timeouts that replaced them
+        self.cut_ms = 0.0
+
+    def timeout(self, key: str, default: float) -> float:
+        estimate = self.estimates.get(key)
+        if not self.adapt or estimate is None or estimate.count < self.min_samples:
+            self.fallback += 1
+            return default
+        self.adaptive += 1
+        chosen = min(self.ceiling_ms, max(self.floor_ms, self.multiplier * estimate.value))
+        self.cut_ms += default - chosen
+        return chosen
+
+    def record(self, key: str, elapsed_ms: float) -> None:
+        self.estimates.setdefault(key, P2Quantile(QUANTILE)).add(elapsed_ms)
+        self.updated.add(key)
+
+
+class StepTimeouts:
+    """TimeoutPolicy scoped to one test, with steps keyed by label"""
+
+    def __init__(self, policy: TimeoutPolicy, nodeid: str) -> None:
+        self.policy = policy
+        self.nodeid = nodeid
+
+    def key(self, label: str) -> str:
+        return f"{self.nodeid}::{label}"
+
+    def timeout(self, label: str, default: float) -> float:
+        return self.policy.timeout(self.key(label), default)
+
+    @contextmanager
+    def step(self, label: str, default: float) -> Iterator[float]:
+        """Yield the timeout for a step and record its latency if it succeeds"""
+        started = time.perf_counter()
+        yield self.timeout(label, default)
+        self.policy.record(self.key(label), (time.perf_counter() - started) * 1000)
+
+
+TIMEOUT_POLICY = pytest.StashKey[TimeoutPolicy]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("timeouts", "adaptive step timeouts")
+    group.addoption(
+        "--timeout-multiplier",
+        type=float,
+        default=3.0,
+        help="Step timeout as a multiple of its observed p99 latency (default: %(default)s)",
+    )
+    group.addoption(
+        "--timeout-floor-ms",
+        type=float,
+        default=1000,
+        help="Shortest timeout a step is given (default: %(default)s)",
+    )
+    group.addoption(
+        "--timeout-ceiling-ms",
+        type=float,
+        default=60000,
+        help="Longest timeout a step is given (default: %(default)s)",
+    )
+    group.addoption(
+        "--timeout-min-samples",
+        type=int,
+        default=10,
+        help="Successful runs a step needs before its timeout adapts (default: %(default)s)",
+    )
+    group.addoption(
+        "--no-adaptive-timeouts",
+        action="store_true",
+        help="Use the timeouts written in the tests and record nothing",
+    )
+
+
+def _cache_key() -> str:
+    return f"{CACHE_KEY}/{platform_key()}"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    saved: Dict[str, Any] = {}
+    if getattr(config, "cache", None) is not None and not config.getoption("no_adaptive_timeouts"):
+        saved = config.cache.get(_cache_key(), {})
+    config.stash[TIMEOUT_POLICY] = TimeoutPolicy(
+        {key: P2Quantile.from_dict(state) for key, state in saved.items()},
+        multiplier=config.getoption("timeout_multiplier"),
+        floor_ms=config.getoption("timeout_floor_ms"),
+        ceiling_ms=config.getoption("timeout_ceiling_ms"),
+        min_samples=config.getoption("timeout_min_samples"),
+        adapt=not config.getoption("no_adaptive_timeouts"),
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    policy = config.stash.get(TIMEOUT_POLICY, None)
+    if policy is None or not policy.updated or getattr(config, "cache", None) is None:
+        return
+    if config.getoption("no_adaptive_timeouts"):
+        return
+    # Each test runs on one worker, so only write back the steps this process ran
+    saved = config.cache.get(_cache_key(), {})
+    for key in policy.updated:
+        saved[key] = policy.estimates[key].to_dict()
+    config.cache.set(_cache_key(), saved)
+
+
+@pytest.fixture
+def step_timeouts(pytestconfig: pytest.Config, request: pytest.FixtureRequest) -> StepTimeouts:
+    """Adaptive timeouts for this test's steps, learned per platform across runs"""
+    return StepTimeouts(pytestconfig.stash[TIMEOUT_POLICY], request.node.nodeid)
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    policy = config.stash.get(TIMEOUT_POLICY, None)
+    if policy is None or not (policy.adaptive or policy.fallback):
+        return
+    terminalreporter.write_sep("-", "adaptive timeouts")
+    terminalreporter.write_line(
+        f"{policy.adaptive} step timeouts from p{QUANTILE} history, {policy.fallback} at their written "
+        f"default; adaptive timeouts were {policy.cut_ms:.0f} ms shorter in total than the defaults"
+    )
@@ -0,0 +1,274 @@
+import re
+import tempfile
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Generator, List, Optional, Tuple
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from support.config import ROOT_DIR, platform_key, slugify, write_atomic
+from support.outcomes import PHASE_REPORTS
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Page
+
+MB = 1024 * 1024
+
+
+class TraceRing:
+    """The newest trace chunks of one test, bounded by count and total bytes"""
+
+    def __init__(self, max_chunks: int = 5, max_bytes: int = 50 * MB) -> None:
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.chunks: Deque[Tuple[str, bytes]] = deque()
+        self.bytes = 0
+        self.dropped = 0
+
+    def push(self, title: str, data: bytes) -> None:
+        self.chunks.append((title, data))
+        self.bytes += len(data)
+        # The newest chunk is kept even when it is over max_bytes on its own
+        while len(self.chunks) > self.max_chunks or (self.bytes > self.max_bytes and len(self.chunks) > 1):
+            _, dropped = self.chunks.popleft()
+            self.bytes -= len(dropped)
+            self.dropped += 1
+
+
+class RingTracer:
+    """Traces a test's contexts in chunks, cut at every goto/reload and kept in a TraceRing
+
+    Playwright only hands a chunk over as a file, so each one passes through
+    scratch on its way into memory.
+    """
+
+    def __init__(self, nodeid: str, ring: TraceRing, scratch: Path) -> None:
+        self.nodeid = nodeid
+        self.ring = ring
+        self.scratch = Path(scratch)
+        self._titles: Dict["BrowserContext", str] = {}
+
+    def instrument_context(self, context: "BrowserContext") -> None:
+        context.tracing.start(title=self.nodeid, screenshots=True, snapshots=True)
+        context.tracing.start_chunk(title="new_context")
+        self._titles[context] = "new_context"
+        original_close = context.close
+
+        def close(*args: Any, **kwargs: Any) -> None:
+            self._cut(context, None)
+            original_close(*args, **kwargs)
+
+        context.close = close
+        for page in context.pages:
+            self.instrument_page(page)
+        context.on("page", self.instrument_page)
+
+    def instrument_page(self, page: "Page") -> None:
+        for action in ("goto", "reload"):
+            setattr(page, action, self._wrap(page, action, getattr(page, action)))
+
+    def _wrap(self, page: "Page", action: str, original: Callable[..., Any]) -> Callable[..., Any]:
+        def navigate(*args: Any, **kwargs: Any) -> Any:
+            url = args[0] if args else kwargs.get("url", page.url)
+            self._cut(page.context, f"{action} {url}")
+            return original(*args, **kwargs)
+
+        return navigate
+
+    def checkpoint(self, title: str) -> None:
+        """Start a new chunk in every traced context, e.g. before a step worth seeing on its own"""
+        for context in list(self._titles):
+            self._cut(context, title)
+
+    def finish(self) -> None:
+        """Push the open chunk of every context that is still open"""
+        for context in list(self._titles):
+            self._cut(context, None)
+
+    def _cut(self, context: "BrowserContext", next_title: Optional[str]) -> None:
+        title = self._titles.pop(context, None)
+        if title is None:
+            return
+        path = self.scratch / f"{uuid.uuid4().hex}.zip"
+        try:
+            context.tracing.stop_chunk(path=str(path))
+            if next_title is not None:
+                context.tracing.start_chunk(title=next_title)
+                self._titles[context] = next_title
+        except PlaywrightError:
+            # The browser went away; whatever made it is in the earlier chunks
+            return
+        finally:
+            if path.exists():
+                self.ring.push(title, path.read_bytes())
+                path.unlink()
+
+
+class TraceWriter:
+    """Writes kept rings on a background thread, up to a byte budget for the session"""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="traces")
+        self._pending: List[Future] = []
+        self.tests = 0
+        self.bytes_written = 0
+        self.skipped = 0
+
+    def submit(self, nodeid: str, ring: TraceRing) -> List[Path]:
+        """Queue ring's chunks as <test>-<n>.trace.zip, oldest first, and return their paths
+
+        Chunks an earlier run left for the test are removed first, so a
+        shorter ring does not leave stale ones behind.
+        """
+        if not ring.chunks:
+            return []
+        if self.bytes_written + ring.bytes > self.max_bytes:
+            self.skipped += 1
+            return []
+        self.tests += 1
+        self.bytes_written += ring.bytes
+        base = self.root / platform_key() / slugify(nodeid)
+        paths = [base.with_name(f"{base.name}-{index}.trace.zip") for index in range(1, len(ring.chunks) + 1)]
+        chunks = [data for _, data in ring.chunks]
+        self._pending.append(self._executor.submit(_replace_chunks, paths, chunks))
+        return paths
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for future in self._pending:
+            future.result()
+
+
+def _replace_chunks(paths: List[Path], chunks: List[bytes]) -> None:
+    """Write chunks to paths after removing the test's chunks from an earlier run"""
+    first = paths[0]
+    stem = first.name[: -len("1.trace.zip")]
+    earlier = re.compile(re.escape(stem) + r"\d+\.trace\.zip")
+    if first.parent.is_dir():
+        for path in first.parent.iterdir():
+            if earlier.fullmatch(path.name):
+                path.unlink()
+    for path, data in zip(paths, chunks):
+        write_atomic(path, data)
+
+
+def should_keep(reports: Dict[str, pytest.TestReport], budget: Optional[float]) -> bool:
+    """Whether a test failed, or its body ran longer than budget seconds"""
+    if any(report.failed for report in reports.values()):
+        return True
+    call = reports.get("call")
+    return budget is not None and call is not None and call.duration > budget
+
+
+TRACE_WRITER = pytest.StashKey[TraceWriter]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("ring-trace", "ring-buffer tracing")
+    group.addoption(
+        "--ring-trace",
+        action="store_true",
+        help="Trace every test into memory and keep the last chunks of failed or slow tests",
+    )
+    group.addoption(
+        "--ring-trace-chunks",
+        type=int,
+        default=5,
+        help="Chunks (one per goto/reload) kept per test (default: %(default)s)",
+    )
+    group.addoption(
+        "--ring-trace-mb",
+        type=float,
+        default=50,
+        help="Memory the chunks of one test may take (default: %(default)s)",
+    )
+    group.addoption(
+        "--ring-trace-budget",
+        type=float,
+        default=None,
+        help="Also keep the trace of tests whose body takes longer than this many seconds",
+    )
+    group.addoption(
+        "--ring-trace-disk-mb",
+        type=float,
+        default=500,
+        help="Trace bytes written per session before further traces are dropped (default: %(default)s)",
+    )
+    group.addoption(
+        "--ring-trace-dir",
+        default=str(ROOT_DIR / "traces"),
+        help="Where kept traces are written",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption("ring_trace") and config.getoption("tracing", "off") != "off":
+        raise pytest.UsageError("--ring-trace replaces pytest-playwright's --tracing; pass only one")
+
+
+@pytest.fixture(scope="session")
+def trace_writer(pytestconfig: pytest.Config) -> Generator[TraceWriter, None, None]:
+    writer = TraceWriter(
+        Path(pytestconfig.getoption("ring_trace_dir")), int(pytestconfig.getoption("ring_trace_disk_mb") * MB)
+    )
+    pytestconfig.stash[TRACE_WRITER] = writer
+    yield writer
+    writer.close()
+
+
+@pytest.fixture(scope="session")
+def _trace_scratch() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory(prefix="ring-trace-") as scratch:
+        yield Path(scratch)
+
+
+@pytest.fixture
+def ring_trace(
+    pytestconfig: pytest.Config, trace_writer: TraceWriter, _trace_scratch: Path, request: pytest.FixtureRequest
+) -> Generator[RingTracer, None, None]:
+    """This test's ring-buffer tracer; its chunks are written if the test fails or runs over budget"""
+    ring = TraceRing(
+        pytestconfig.getoption("ring_trace_chunks"), int(pytestconfig.getoption("ring_trace_mb") * MB)
+    )
+    tracer = RingTracer(request.node.nodeid, ring, _trace_scratch)
+    yield tracer
+    # Contexts new_context has not closed yet still hold their last chunk
+    tracer.finish()
+    budget = pytestconfig.getoption("ring_trace_budget")
+    if not should_keep(request.node.stash.get(PHASE_REPORTS, {}), budget):
+        return
+    for path in trace_writer.submit(request.node.nodeid, ring):
+        request.node.user_properties.append(("trace", str(path)))
+
+
+@pytest.fixture
+def new_context(
+    new_context: Callable[..., "BrowserContext"], pytestconfig: pytest.Config, request: pytest.FixtureRequest
+) -> Callable[..., "BrowserContext"]:
+    """Trace contexts into the ring in tests that use ring_trace, or in every test with --ring-trace"""
+    if not pytestconfig.getoption("ring_trace") and "ring_trace" not in request.fixturenames:
+        return new_context
+    tracer: RingTracer = request.getfixturevalue("ring_trace")
+
+    def _new_context(**kwargs: Any) -> "BrowserContext":
+        context = new_context(**kwargs)
+        tracer.instrument_context(context)
+        return context
+
+    return _new_context
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    writer = config.stash.get(TRACE_WRITER, None)
+    if writer is None or not (writer.tests or writer.skipped):
+        return
+    terminalreporter.write_sep("-", "ring-buffer traces")
+    terminalreporter.write_line(
+        f"kept traces of {writer.tests} failed or slow test(s) in {writer.root} "
+        f"({writer.bytes_written / MB:.1f} MB); {writer.skipped} dropped over --ring-trace-disk-mb"
+    )
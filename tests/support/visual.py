@@ -0,0 +1,236 @@
+import hashlib
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from support.config import ROOT_DIR, platform_key, slugify
+
+
+@dataclass
+class VisualDiff:
+    """Outcome of comparing a screenshot with its baseline"""
+
+    changed_pixels: int
+    total_pixels: int
+    changed_tiles: int
+    total_tiles: int
+    mask: Optional[np.ndarray] = None
+
+    @property
+    def changed_percent(self) -> float:
+        return 100.0 * self.changed_pixels / self.total_pixels if self.total_pixels else 0.0
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """PNG bytes as an (height, width, 3) uint8 array"""
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+
+
+def _tiled(pixels: np.ndarray, tile: int) -> np.ndarray:
+    """View pixels, zero-padded to whole tiles, as (rows, cols, tile, tile, ...)"""
+    height, width = pixels.shape[:2]
+    rows, cols = -(-height // tile), -(-width // tile)
+    pad = [(0, rows * tile - height), (0, cols * tile - width)] + [(0, 0)] * (pixels.ndim - 2)
+    padded = np.pad(pixels, pad)
+    return padded.reshape(rows, tile, cols, tile, *pixels.shape[2:]).swapaxes(1, 2)
+
+
+def tile_digests(pixels: np.ndarray, tile: int = 64) -> np.ndarray:
+    """64-bit hash of every tile, shaped (rows, cols)"""
+    tiles = _tiled(pixels, tile)
+    rows, cols = tiles.shape[:2]
+    flat = np.ascontiguousarray(tiles).reshape(rows * cols, -1)
+    digests = b"".join(hashlib.blake2b(row.tobytes(), digest_size=8).digest() for row in flat)
+    return np.frombuffer(digests, dtype="<u8").reshape(rows, cols)
+
+
+def diff_images(
+    baseline: np.ndarray,
+    actual: np.ndarray,
+    tile: int = 64,
+    tolerance: int = 8,
+    baseline_digests: Optional[np.ndarray] = None,
+    actual_digests: Optional[np.ndarray] = None,
+) -> VisualDiff:
+    """Per-pixel diff restricted to tiles whose hashes differ
+
+    A pixel counts as changed when any channel moved by more than tolerance.
+    Where the images differ in size, the area outside their overlap counts
+    as changed.
+    """
+    height, width = max(baseline.shape[0], actual.shape[0]), max(baseline.shape[1], actual.shape[1])
+    common_h, common_w = min(baseline.shape[0], actual.shape[0]), min(baseline.shape[1], actual.shape[1])
+    if baseline.shape != actual.shape:
+        baseline, actual = baseline[:common_h, :common_w], actual[:common_h, :common_w]
+        baseline_digests = actual_digests = None
+    if baseline_digests is None:
+        baseline_digests = tile_digests(baseline, tile)
+    if actual_digests is None:
+        actual_digests = tile_digests(actual, tile)
+
+    changed_rows, changed_cols = np.nonzero(baseline_digests != actual_digests)
+    mask_tiles = np.zeros(baseline_digests.shape + (tile, tile), dtype=bool)
+    if len(changed_rows):
+        before = _tiled(baseline, tile)[changed_rows, changed_cols].astype(np.int16)
+        after = _tiled(actual, tile)[changed_rows, changed_cols].astype(np.int16)
+        mask_tiles[changed_rows, changed_cols] = np.abs(after - before).max(axis=-1) > tolerance
+    rows, cols = baseline_digests.shape
+    common_mask = mask_tiles.swapaxes(1, 2).reshape(rows * tile, cols * tile)[:common_h, :common_w]
+
+    mask = np.ones((height, width), dtype=bool)
+    mask[:common_h, :common_w] = common_mask
+    return VisualDiff(
+        changed_pixels=int(mask.sum()),
+        total_pixels=height * width,
+        changed_tiles=len(changed_rows),
+        total_tiles=rows * cols,
+        mask=mask,
+    )
+
+
+def render_diff(actual: np.ndarray, mask: np.ndarray) -> bytes:
+    """PNG of the actual screenshot, dimmed, with changed pixels in red"""
+    height, width = mask.shape
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    canvas[: actual.shape[0], : actual.shape[1]] = actual // 3
+    canvas[mask] = (255, 0, 0)
+    buffer = io.BytesIO()
+    Image.fromarray(canvas).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class VisualBaselines:
+    """Baseline PNGs per platform, with their tile hashes cached next to them"""
+
+    def __init__(self, root: Path, tile: int = 64, tolerance: int = 8) -> None:
+        self.root = Path(root)
+        self.tile = tile
+        self.tolerance = tolerance
+
+    def paths(self, nodeid: str, name: str) -> Tuple[Path, Path]:
+        stem = f"{slugify(nodeid)}--{slugify(name)}"
+        return self.root / f"{stem}.png", self.root / f"{stem}.tiles-{self.tile}.npy"
+
+    def exists(self, nodeid: str, name: str) -> bool:
+        return self.paths(nodeid, name)[0].exists()
+
+    def save(self, nodeid: str, name: str, png: bytes, pixels: Optional[np.ndarray] = None) -> None:
+        image_path, digests_path = self.paths(nodeid, name)
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        image_path.write_bytes(png)
+        pixels = decode_png(png) if pixels is None else pixels
+        np.save(digests_path, tile_digests(pixels, self.tile))
+
+    def compare(self, nodeid: str, name: str, png: bytes) -> Tuple[VisualDiff, np.ndarray]:
+        """Diff png against the baseline, decoding the baseline only if a tile changed"""
+        image_path, digests_path = self.paths(nodeid, name)
+        actual = decode_png(png)
+        actual_digests = tile_digests(actual, self.tile)
+        baseline_digests = np.load(digests_path) if digests_path.exists() else None
+        if baseline_digests is not None and np.array_equal(baseline_digests, actual_digests):
+            rows, cols = actual_digests.shape
+            total = actual.shape[0] * actual.shape[1]
+            return VisualDiff(0, total, 0, rows * cols), actual
+        baseline = decode_png(image_path.read_bytes())
+        diff = diff_images(
+            baseline, actual, self.tile, self.tolerance, baseline_digests, actual_digests
+        )
+        return diff, actual
+
+
+class VisualCheck:
+    """Compares one test's screenshots against their per-platform baselines"""
+
+    def __init__(
+        self,
+        baselines: VisualBaselines,
+        diff_dir: Path,
+        nodeid: str,
+        threshold: float,
+        update: bool = False,
+    ) -> None:
+        self.baselines = baselines
+        self.diff_dir = Path(diff_dir)
+        self.nodeid = nodeid
+        self.threshold = threshold
+        self.update = update
+
+    def compare(self, name: str, png: bytes) -> Optional[VisualDiff]:
+        """Diff against the baseline, or record png as the baseline if there is none yet"""
+        if self.update or not self.baselines.exists(self.nodeid, name):
+            self.baselines.save(self.nodeid, name, png)
+            return None
+        diff, actual = self.baselines.compare(self.nodeid, name, png)
+        if diff.changed_pixels:
+            path = self.diff_path(name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(render_diff(actual, diff.mask))
+        return diff
+
+    def assert_matches(self, name: str, png: bytes) -> Optional[VisualDiff]:
+        """Fail when more than threshold percent of the pixels changed"""
+        diff = self.compare(name, png)
+        if diff is not None and diff.changed_percent > self.threshold:
+            raise AssertionError(
+                f"Screenshot {name} changed {diff.changed_percent:.2f}% "
+                f"(threshold {self.threshold}%), diff saved to {self.diff_path(name)}"
+            )
+        return diff
+
+    def diff_path(self, name: str) -> Path:
+        return self.diff_dir / f"{slugify(self.nodeid)}--{slugify(name)}.png"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("visual", "visual regression")
+    group.addoption(
+        "--visual-baseline-dir",
+        default=str(ROOT_DIR / "visual-baselines"),
+        help="Where baseline screenshots are kept, one folder per platform",
+    )
+    group.addoption(
+        "--update-visual-baselines",
+        action="store_true",
+        help="Replace baselines with the screenshots taken in this run",
+    )
+    group.addoption(
+        "--visual-threshold",
+        type=float,
+        default=0.5,
+        help="Percentage of changed pixels that fails a comparison (default: %(default)s)",
+    )
+    group.addoption(
+        "--visual-tolerance",
+        type=int,
+        default=8,
+        help="Per-channel difference ignored when comparing pixels (default: %(default)s)",
+    )
+    group.addoption(
+        "--visual-tile",
+        type=int,
+        default=64,
+        help="Tile edge in pixels used to skip unchanged regions (default: %(default)s)",
+    )
+
+
+@pytest.fixture
+def visual(pytestconfig: pytest.Config, request: pytest.FixtureRequest) -> VisualCheck:
+    """Visual baseline comparison for the current test and platform"""
+    root = Path(pytestconfig.getoption("visual_baseline_dir"))
+    baselines = VisualBaselines(
+        root / platform_key(),
+        tile=pytestconfig.getoption("visual_tile"),
+        tolerance=pytestconfig.getoption("visual_tolerance"),
+    )
+    return VisualCheck(
+        baselines,
+        root / "diffs" / platform_key(),
+        request.node.nodeid,
+        threshold=pytestconfig.getoption("visual_threshold"),
+        update=pytestconfig.getoption("update_visual_baselines"),
+    )
@@ -0,0 +1,214 @@
+import json
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import BrowserContext, Page
+
+DEFAULT_IGNORE = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "hotjar",
+    "segment.io",
+    "/analytics",
+)
+
+# Installs window.__appReady: a MutationObserver plus fetch/XHR counters that
+# remember when the page last changed. wait() resolves with the elapsed
+# milliseconds once nothing is pending and the DOM has been quiet for quietMs.
+TRACKER_JS = """
+(ignore) => {
+    if (window.__appReady) return;
+    const state = { pending: 0, lastActivity: performance.now() };
+    const touch = () => { state.lastActivity = performance.now(); };
+    const ignored = (url) => ignore.some((pattern) => String(url || "").includes(pattern));
+
+    new MutationObserver(touch).observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true,
+    });
+
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function (input) {
+            const url = typeof input === "string" ? input : input && input.url;
+            if (ignored(url)) return originalFetch.apply(this, arguments);
+            state.pending++;
+            touch();
+            return originalFetch.apply(this, arguments).finally(() => { state.pending--; touch(); });
+        };
+    }
+    const open = XMLHttpRequest.prototype.open;
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__appReadyUrl = url;
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        if (!ignored(this.__appReadyUrl)) {
+            state.pending++;
+            touch();
+            this.addEventListener("loadend", () => { state.pending--; touch(); }, { once: true });
+        }
+        return send.apply(this, arguments);
+    };
+
+    window.__appReady = {
+        wait(quietMs, timeoutMs) {
+            const start = performance.now();
+            return new Promise((resolve, reject) => {
+                const check = () => {
+                    const now = performance.now();
+                    const quiet = now - state.lastActivity >= quietMs;
+                    if (document.readyState !== "loading" && state.pending === 0 && quiet) {
+                        resolve(now - start);
+                    } else if (now - start >= timeoutMs) {
+                        reject(new Error(`App not ready after ${timeoutMs}ms (${state.pending} pending requests)`));
+                    } else {
+                        setTimeout(check, Math.min(50, quietMs));
+                    }
+                };
+                check();
+            });
+        },
+    };
+}
+"""
+
+WAIT_JS = f"""
+([quietMs, timeoutMs, ignore]) => {{
+    ({TRACKER_JS})(ignore);
+    return window.__appReady.wait(quietMs, timeoutMs);
+}}
+"""
+
+
+class WaitStats:
+    """Time spent in app-ready waits compared with the fixed sleeps they replaced"""
+
+    def __init__(self) -> None:
+        self.waits: List[Tuple[str, float, Optional[float]]] = []
+
+    def record(self, label: str, waited_ms: float, replaces_ms: Optional[float] = None) -> None:
+        self.waits.append((label, waited_ms, replaces_ms))
+
+    @property
+    def waited_ms(self) -> float:
+        return sum(waited for _, waited, _ in self.waits)
+
+    @property
+    def replaced_ms(self) -> float:
+        return sum(replaced for _, _, replaced in self.waits if replaced)
+
+    @property
+    def saved_ms(self) -> float:
+        return sum(replaced - waited for _, waited, replaced in self.waits if replaced)
+
+
+WAIT_STATS = pytest.StashKey[WaitStats]()
+
+
+def install_app_ready_tracker(
+    target: "BrowserContext", ignore: Sequence[str] = DEFAULT_IGNORE
+) -> None:
+    """Add the tracker as an init script so requests from the first paint are counted"""
+    target.add_init_script(f"({TRACKER_JS})({json.dumps(list(ignore))})")
+
+
+def wait_for_app_ready(
+    page: "Page",
+    quiet_ms: float = 500,
+    timeout: float = 10000,
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+    replaces_ms: Optional[float] = None,
+    stats: Optional[WaitStats] = None,
+    label: str = "",
+) -> float:
+    """Wait until the DOM has been quiet for quiet_ms with no tracked requests pending
+
+    Returns the milliseconds actually waited. replaces_ms is the fixed sleep
+    this wait stands in for and is only used for reporting.
+    """
+    try:
+        waited = page.evaluate(WAIT_JS, [quiet_ms, timeout, list(ignore)])
+    except PlaywrightError as err:
+        if "Execution context was destroyed" not in str(err):
+            raise
+        # The page navigated mid-wait; start again on the new document
+        waited = page.evaluate(WAIT_JS, [quiet_ms, timeout, list(ignore)])
+    if stats is not None:
+        stats.record(label, waited, replaces_ms)
+    return waited
+
+
+async def wait_for_app_ready_async(
+    page: "AsyncPage",
+    quiet_ms: float = 500,
+    timeout: float = 10000,
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+) -> float:
+    """wait_for_app_ready for playwright.async_api pages"""
+    try:
+        return await page.evaluate(WAIT_JS, [quiet_ms, timeout, list(ignore)])
+    except PlaywrightError as err:
+        if "Execution context was destroyed" not in str(err):
+            raise
+        return await page.evaluate(WAIT_JS, [quiet_ms, timeout, list(ignore)])
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("waits", "DOM quiescence waits")
+    group.addoption(
+        "--app-ready-quiet-ms",
+        type=float,
+        default=500,
+        help="How long the DOM must stay unchanged before the app counts as ready (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[WAIT_STATS] = WaitStats()
+
+
+@pytest.fixture
+def new_context(
+    new_context: Callable[..., "BrowserContext"], request: pytest.FixtureRequest
+) -> Callable[..., "BrowserContext"]:
+    """Install the app-ready tracker in contexts of tests that wait on it"""
+    if "app_ready" not in request.fixturenames:
+        return new_context
+
+    def _new_context(**kwargs: Any) -> "BrowserContext":
+        context = new_context(**kwargs)
+        install_app_ready_tracker(context)
+        return context
+
+    return _new_context
+
+
+@pytest.fixture
+def app_ready(pytestconfig: pytest.Config, request: pytest.FixtureRequest) -> Callable[..., float]:
+    """wait_for_app_ready bound to the session's wait statistics"""
+    stats = pytestconfig.stash[WAIT_STATS]
+    quiet_ms = pytestconfig.getoption("app_ready_quiet_ms")
+
+    def _wait(page: "Page", timeout: float = 10000, replaces_ms: Optional[float] = None) -> float:
+        return wait_for_app_ready(
+            page, quiet_ms, timeout, replaces_ms=replaces_ms, stats=stats, label=request.node.nodeid
+        )
+
+    return _wait
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    stats = config.stash.get(WAIT_STATS, None)
+    if not stats or not stats.waits:
+        return
+    terminalreporter.write_sep("-", "app ready waits")
+    terminalreporter.write_line(
+        f"{len(stats.waits)} waits took {stats.waited_ms:.0f} ms in place of "
+        f"{stats.replaced_ms:.0f} ms of fixed sleeps ({stats.saved_ms:.0f} ms saved)"
+    )
@@ -0,0 +1,425 @@
+"""Warm runner daemon: pytest runs without the fixed startup cost
+
+The daemon imports pytest, its plugins and the heavy libraries once, keeps a
+Chromium running, and listens on a unix socket. Each run is forked from it,
+so it starts with everything imported, and connects to the warm Chromium over
+CDP instead of launching one. Each run still starts its own Playwright driver,
+which is timed and reported next to the startup the run skipped. Modules from
+the tests tree are dropped in every fork, so edits to tests and support code
+are picked up on the next run.
+
+    python tests/support/warm.py serve &
+    python tests/support/warm.py run -- -s tests/sample-test.py -k search
+    python tests/support/warm.py stop
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import urllib.request
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Optional, Tuple
+
+import pytest
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserType
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+SOCKET_PATH = TESTS_DIR.parent / ".pytest_cache" / "warm.sock"
+# Set in forked runs; the browser fixture connects to it instead of launching
+CDP_ENV = "WARM_BROWSER_CDP"
+# "1" or "0", whether the warm Chromium is headless
+HEADLESS_ENV = "WARM_BROWSER_HEADLESS"
+# Set in forked runs to "<pid>:<fd>", the pipe the run reports the startup it
+# still paid on; subprocesses such as xdist workers inherit it but not the pipe
+COSTS_ENV = "WARM_RUN_COSTS_FD"
+# Everything the run wrote comes before it, the result after it
+TRAILER = b"\0"
+PRELOAD = (
+    "pytest",
+    "playwright.sync_api",
+    "playwright.async_api",
+    "numpy",
+    "PIL.Image",
+    "psutil",
+    "yaml",
+    "dotenv",
+    "browserstack_sdk",
+)
+
+
+def report_cost(name: str, ms: float) -> None:
+    """Tell the warm daemon this run spent ms on name, which the daemon could not save"""
+    pid, _, fd = os.environ.get(COSTS_ENV, "").partition(":")
+    if pid == str(os.getpid()):
+        os.write(int(fd), json.dumps({name: round(ms)}).encode() + b"\n")
+
+
+def read_costs(data: bytes) -> Dict[str, float]:
+    costs: Dict[str, float] = {}
+    for line in data.splitlines():
+        for name, ms in json.loads(line).items():
+            costs[name] = costs.get(name, 0) + ms
+    return costs
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef: Any) -> Generator[None, None, None]:
+    if fixturedef.argname != "playwright" or not os.environ.get(COSTS_ENV):
+        yield
+        return
+    started = time.perf_counter()
+    yield
+    report_cost("driver", (time.perf_counter() - started) * 1000)
+
+
+def can_use_warm_chromium(
+    browser_name: str, launch_args: Dict[str, Any], connect_options: Optional[Dict]
+) -> bool:
+    """Whether this run can connect to the warm Chromium instead of launching a browser
+
+    The warm Chromium is launched with nothing but its headless mode, so runs
+    with --headed (unless the daemon is), --browser-channel, --slowmo or
+    --browser-arg need a browser of their own.
+    """
+    if not os.environ.get(CDP_ENV) or browser_name != "chromium" or connect_options:
+        return False
+    warm_args = {"headless": os.environ.get(HEADLESS_ENV) != "0"}
+    return {"headless": True, **launch_args} == warm_args
+
+
+@pytest.fixture(scope="session")
+def browser(
+    launch_browser: Callable[[], "Browser"],
+    browser_type: "BrowserType",
+    browser_type_launch_args: Dict[str, Any],
+    connect_options: Optional[Dict],
+) -> Generator["Browser", None, None]:
+    """pytest-playwright's browser, or the warm daemon's Chromium in runs forked from it"""
+    started = time.perf_counter()
+    if can_use_warm_chromium(browser_type.name, browser_type_launch_args, connect_options):
+        browser = browser_type.connect_over_cdp(os.environ[CDP_ENV])
+        report_cost("connect", (time.perf_counter() - started) * 1000)
+    else:
+        browser = launch_browser()
+        report_cost("browser", (time.perf_counter() - started) * 1000)
+    yield browser
+    # For the warm Chromium this only disconnects and closes this run's contexts
+    browser.close()
+
+
+def preload() -> Tuple[float, List[str]]:
+    """Import PRELOAD and every pytest plugin entry point
+
+    Returns the time since this interpreter started, which every cold run
+    pays too, and the modules that failed to import.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python 3.7
+        from importlib_metadata import entry_points
+
+    failed = []
+    for name in PRELOAD:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            failed.append(name)
+    points = entry_points()
+    plugins = points.select(group="pytest11") if hasattr(points, "select") else points.get("pytest11", [])
+    for point in plugins:
+        try:
+            point.load()
+        except Exception:
+            failed.append(point.value)
+    import psutil
+
+    return (time.time() - psutil.Process().create_time()) * 1000, failed
+
+
+def purge_modules(root: Path = TESTS_DIR) -> int:
+    """Drop modules loaded from root, so a run imports them from the current sources"""
+    stale = [
+        name
+        for name, module in sys.modules.items()
+        # __main__ is this script in the daemon and its forks
+        if name != "__main__"
+        and getattr(module, "__file__", None)
+        and root in Path(module.__file__).resolve().parents
+    ]
+    for name in stale:
+        del sys.modules[name]
+    return len(stale)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class WarmChromium:
+    """A Chromium with a CDP endpoint, relaunched if it exits"""
+
+    def __init__(self, headless: bool = True) -> None:
+        self.headless = headless
+        self.process: Optional[subprocess.Popen] = None
+        self.endpoint = ""
+        self.launch_ms = 0.0
+        self._profile = ""
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as playwright:
+            self.executable = playwright.chromium.executable_path
+
+    def ensure(self) -> str:
+        if self.process is not None and self.process.poll() is None:
+            return self.endpoint
+        self.close()
+        started = time.perf_counter()
+        port = _free_port()
+        self._profile = tempfile.mkdtemp(prefix="warm-chromium-")
+        args = [
+            self.executable,
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={self._profile}",
+            "--no-first-run",
+            "--no-default-browser-check",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.endpoint = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    raise RuntimeError(f"Chromium at {self.executable} did not open {self.endpoint}")
+                time.sleep(0.05)
+        self.launch_ms = (time.perf_counter() - started) * 1000
+        return self.endpoint
+
+    def close(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+        if self._profile:
+            shutil.rmtree(self._profile, ignore_errors=True)
+
+
+class WarmDaemon:
+    """Serves one run at a time, each in a fork of this process"""
+
+    def __init__(self, path: Path, chromium: Optional[WarmChromium], import_ms: float) -> None:
+        self.path = Path(path)
+        self.chromium = chromium
+        self.import_ms = import_ms
+        self.runs = 0
+        self.saved_ms = 0.0
+
+    def startup_ms(self) -> Dict[str, float]:
+        """What a cold run pays that a forked run does not, at most
+
+        The imports cover everything preloaded, some of which a given run
+        would not have imported.
+        """
+        costs = {"imports": round(self.import_ms)}
+        if self.chromium is not None:
+            costs["browser"] = round(self.chromium.launch_ms)
+        return costs
+
+    def serve(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(self.path))
+            server.listen()
+            print(f"warm daemon listening on {self.path} (startup {self.startup_ms()} ms)", flush=True)
+            try:
+                while True:
+                    connection, _ = server.accept()
+                    with connection:
+                        request = json.loads(connection.makefile("rb").readline() or b"{}")
+                        if request.get("command") == "stop":
+                            return
+                        self.run(connection, request)
+            finally:
+                self.path.unlink()
+                if self.chromium is not None:
+                    self.chromium.close()
+
+    def run(self, connection: socket.socket, request: Dict[str, Any]) -> None:
+        env = dict(request.get("env") or os.environ)
+        if self.chromium is not None:
+            env[CDP_ENV] = self.chromium.ensure()
+            env[HEADLESS_ENV] = "1" if self.chromium.headless else "0"
+        read_fd, write_fd = os.pipe()
+        started = time.perf_counter()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._child(connection, request, {**env, COSTS_ENV: f"{os.getpid()}:{write_fd}"})
+        os.close(write_fd)
+        _, status = os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as pipe:
+            paid = read_costs(pipe.read())
+        code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+        costs = self.startup_ms()
+        self.runs += 1
+        self.saved_ms += sum(costs.values()) - sum(paid.values())
+        result = {
+            "exit": code,
+            "run_ms": round((time.perf_counter() - started) * 1000),
+            "saved_ms": costs,
+            "paid_ms": paid,
+            "runs": self.runs,
+            "total_saved_ms": round(self.saved_ms),
+        }
+        try:
+            connection.sendall(TRAILER + json.dumps(result).encode())
+        except OSError:
+            # The client went away before the run finished
+            pass
+        print(f"run {self.runs}: {request.get('args')} exited {code}", flush=True)
+
+    @staticmethod
+    def _child(connection: socket.socket, request: Dict[str, Any], env: Dict[str, str]) -> None:
+        code = 1
+        try:
+            os.dup2(connection.fileno(), 1)
+            os.dup2(connection.fileno(), 2)
+            os.chdir(request.get("cwd") or os.getcwd())
+            os.environ.clear()
+            os.environ.update(env)
+            purge_modules()
+            # The preloaded plugins were imported without pytest's assertion rewriting
+            args = ["-W", "ignore:Module already imported:pytest.PytestAssertRewriteWarning"]
+            args += request.get("args") or []
+            sys.argv = ["pytest", *args]
+            code = int(pytest.main(args))
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+
+class ResultStream:
+    """Splits what the daemon sends into the run's output and its trailing result"""
+
+    def __init__(self, out: Any) -> None:
+        self.out = out
+        self.result: Optional[Dict[str, Any]] = None
+        self._trailer: Optional[bytes] = None
+
+    def feed(self, chunk: bytes) -> None:
+        if self._trailer is not None:
+            self._trailer += chunk
+            return
+        output, marker, rest = chunk.partition(TRAILER)
+        self.out.write(output)
+        self.out.flush()
+        if marker:
+            self._trailer = rest
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        if self._trailer is not None:
+            self.result = json.loads(self._trailer)
+        return self.result
+
+
+def _breakdown(costs: Dict[str, float]) -> str:
+    parts = ", ".join(f"{name} {ms / 1000:.1f}s" for name, ms in costs.items())
+    return f" ({parts})" if parts else ""
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    saved, paid = result["saved_ms"], result.get("paid_ms", {})
+    return (
+        f"warm run exited {result['exit']} in {result['run_ms'] / 1000:.1f}s, "
+        f"skipping up to {sum(saved.values()) / 1000:.1f}s of startup{_breakdown(saved)} "
+        f"and still paying {sum(paid.values()) / 1000:.1f}s{_breakdown(paid)}; "
+        f"{result['total_saved_ms'] / 1000:.1f}s saved over {result['runs']} run(s) of this daemon"
+    )
+
+
+def send(path: Path, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send request and stream the run's output to stdout, returning its result"""
+    stream = ResultStream(sys.stdout.buffer)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        client.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            stream.feed(chunk)
+    return stream.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH, help="unix socket of the daemon")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="start the daemon in the foreground")
+    serve.add_argument("--headed", action="store_true", help="show the warm Chromium's windows")
+    serve.add_argument("--no-browser", action="store_true", help="keep only the imports warm")
+    run = commands.add_parser("run", help="run pytest with these arguments in the daemon")
+    run.add_argument("pytest_args", nargs=argparse.REMAINDER)
+    commands.add_parser("stop", help="stop the daemon")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+            parser.error("the warm daemon needs fork() and unix sockets")
+        import_ms, failed = preload()
+        if failed:
+            print(f"could not preload {', '.join(failed)}; runs will import them", flush=True)
+        chromium = None if args.no_browser else WarmChromium(headless=not args.headed)
+        if chromium is not None:
+            chromium.ensure()
+        WarmDaemon(args.socket, chromium, import_ms).serve()
+        return 0
+
+    if args.command == "stop":
+        try:
+            send(args.socket, {"command": "stop"})
+        except OSError:
+            print(f"no warm daemon at {args.socket}")
+        return 0
+
+    pytest_args = args.pytest_args[1:] if args.pytest_args[:1] == ["--"] else args.pytest_args
+    request = {"args": pytest_args, "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        result = send(args.socket, request)
+    except OSError:
+        print(f"no warm daemon at {args.socket}; running pytest cold", flush=True)
+        return int(pytest.main(pytest_args))
+    if result is None:
+        print("the warm daemon closed the connection without a result")
+        return 1
+    print(format_result(result))
+    return int(result["exit"])
+
+
+if __name__ == "__main__":
+    # Running as a script puts this directory on sys.path, where config.py,
+    # stats.py and the rest would shadow modules of the same name
+    if sys.path[0] == str(Path(__file__).resolve().parent):
+        del sys.path[0]
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import pytest
+
+from support.affinity import SCOPES_KEY, AffinityScheduling, scope_of
+
+
+class FakeCache:
+    def __init__(self, values=None):
+        self.values = values or {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+
+class FakeOption:
+    loadscopereorder = True
+
+
+class FakeConfig:
+    option = FakeOption()
+
+    def __init__(self, scopes):
+        self.cache = FakeCache({SCOPES_KEY: {"run": "run-1", "scopes": scopes}})
+        self.stash = pytest.Stash()
+
+    def getvalue(self, name):
+        return ["2*popen"]
+
+
+class FakeGateway:
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeNode:
+    workerinput = {"testrunuid": "run-1"}
+
+    def __init__(self, name):
+        self.gateway = FakeGateway(name)
+        self.shutting_down = False
+        self.sent = []
+        self.steal_requests = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def send_steal(self, indices):
+        self.steal_requests.append(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+class FakeMark:
+    def __init__(self, *args):
+        self.args = args
+        self.kwargs = {}
+
+
+class FakeItem:
+    def __init__(self, nodeid, fixturenames=(), affinity=None, groups=()):
+        self.nodeid = nodeid
+        self.fixturenames = list(fixturenames)
+        self.affinity = affinity
+        self.groups = groups
+
+    def get_closest_marker(self, name):
+        return FakeMark(self.affinity) if self.affinity else None
+
+    def iter_markers(self, name):
+        return [FakeMark(group) for group in self.groups]
+
+
+COLLECTION = ["t.py::cart1", "t.py::cart2", "t.py::cart3", "t.py::cart4", "t.py::landing", "t.py::search"]
+
+
+def start(scopes):
+    scheduler = AffinityScheduling(FakeConfig(scopes))
+    first, second = FakeNode("gw0"), FakeNode("gw1")
+    for node in (first, second):
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, COLLECTION)
+    scheduler.schedule()
+    return scheduler, first, second
+
+
+def finish(scheduler, node, *nodeids):
+    for nodeid in nodeids:
+        scheduler.mark_test_complete(node, COLLECTION.index(nodeid))
+
+
+def test_scope_prefers_groups_then_affinity_then_the_test_itself():
+    assert scope_of(FakeItem("a", groups=["concurrent_readonly"])) == "group:concurrent_readonly"
+    assert scope_of(FakeItem("b", ["page", "authenticated_page"])) == "affinity:signed-in"
+    assert scope_of(FakeItem("c", ["authenticated_page"], affinity="cart")) == "affinity:cart"
+    assert scope_of(FakeItem("d", ["page"])) == "d"
+
+
+def test_affinity_group_goes_to_one_worker():
+    scopes = {nodeid: "affinity:signed-in" for nodeid in COLLECTION[:4]}
+    scheduler, first, second = start(scopes)
+
+    assert first.sent == [0, 1, 2, 3]
+    assert second.sent == [4, 5]
+    assert scheduler.stats.groups == {"affinity:signed-in": 4}
+
+
+def test_idle_worker_steals_half_of_an_unbalanced_group():
+    scopes = {nodeid: "affinity:signed-in" for nodeid in COLLECTION[:4]}
+    scheduler, first, second = start(scopes)
+
+    finish(scheduler, second, "t.py::landing")
+    assert first.steal_requests == [[2, 3]]
+
+    scheduler.remove_pending_tests_from_node(first, [2, 3])
+    assert second.sent == [4, 5, 2, 3]
+    finish(scheduler, first, "t.py::cart1", "t.py::cart2")
+    finish(scheduler, second, "t.py::search", "t.py::cart3", "t.py::cart4")
+    assert scheduler.stats.steals == 1 and scheduler.stats.stolen == 2
+    assert not scheduler.has_pending
+
+
+def test_pinned_groups_are_never_split():
+    scopes = {nodeid: "group:concurrent_readonly" for nodeid in COLLECTION[:4]}
+    scheduler, first, second = start(scopes)
+
+    finish(scheduler, second, "t.py::landing")
+
+    assert first.steal_requests == []
+    assert second.shutting_down
@@ -0,0 +1,44 @@
+import json
+import os
+import time
+
+from support.auth import AuthStateCache
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.state = state
+
+    def storage_state(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle)
+
+
+def test_state_is_keyed_by_platform_and_user(tmp_path):
+    """Each platform/user pair gets its own storage_state file"""
+    chrome = AuthStateCache(tmp_path, "windows-11-chrome")
+    safari = AuthStateCache(tmp_path, "macos-safari")
+
+    assert chrome.path_for("a@example.com") != safari.path_for("a@example.com")
+    assert chrome.path_for("a@example.com") != chrome.path_for("b@example.com")
+
+
+def test_saved_state_is_loaded_until_it_expires(tmp_path):
+    """Cached state is reused while fresh and dropped once max_age passes"""
+    cache = AuthStateCache(tmp_path, "local", max_age=60)
+    path = cache.save(FakeContext({"cookies": [], "origins": []}), "a@example.com")
+
+    assert cache.load("a@example.com") == path
+
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert cache.load("a@example.com") is None
+    assert not path.exists()
+
+
+def test_expired_cookie_invalidates_state(tmp_path):
+    """A persistent cookie past its expiry makes the cached state stale"""
+    cache = AuthStateCache(tmp_path, "local")
+    state = {"cookies": [{"name": "session", "expires": time.time() - 1}], "origins": []}
+    cache.save(FakeContext(state), "a@example.com")
+
+    assert cache.load("a@example.com") is None
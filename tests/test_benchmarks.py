@@ -0,0 +1,77 @@
+import json
+import re
+import urllib.request
+from pathlib import Path
+
+from benchmarks.run import FLOWS, SAMPLE_TESTS, ActionTimer, find_baseline, read_test_durations
+from benchmarks.server import serve
+
+SAMPLE_TEST = Path(__file__).with_name("sample-test.py")
+
+
+def test_stand_in_serves_every_selector_the_sample_tests_use():
+    """The replica must keep up with the data-test hooks tests/sample-test.py relies on"""
+    used = set(re.findall(r"data-test='([\w-]+)'", SAMPLE_TEST.read_text(encoding="utf-8")))
+    with serve() as base_url:
+        html = urllib.request.urlopen(base_url).read().decode()
+        script = urllib.request.urlopen(base_url + "app.js").read().decode()
+    served = set(re.findall(r'data-test="([\w-]+)"', html + script))
+    served |= set(re.findall(r'setAttribute\("data-test", "([\w-]+)"\)', script))
+    served |= set(re.findall(r'"(search-results|filtered-products)"', script))
+
+    assert "<title>StackDemo</title>" in html
+    assert used - served == set()
+
+
+def test_timer_summarizes_each_action():
+    timer = ActionTimer()
+    timer.samples = {"click": [1.0, 2.0, 3.0, 4.0], "goto": [100.0]}
+
+    summary = timer.summary()
+
+    assert summary["click"]["count"] == 4 and summary["click"]["p50"] == 2.5
+    assert summary["goto"]["max"] == 100.0
+
+
+def test_baseline_is_the_latest_run_of_another_commit():
+    history = [
+        {"commit": "aaa111", "timestamp": "1"},
+        {"commit": "bbb222", "timestamp": "2"},
+        {"commit": "ccc333", "timestamp": "3"},
+        {"commit": "ccc333", "timestamp": "4"},
+    ]
+
+    assert find_baseline(history, "ccc333", None)["commit"] == "bbb222"
+    assert find_baseline(history, "ccc333", "aaa")["timestamp"] == "1"
+    assert find_baseline([], "ccc333", None) is None
+
+
+def test_compared_sample_tests_can_run_against_the_stand_in():
+    """They exist, navigate through base_url and need no signed-in user"""
+    source = SAMPLE_TEST.read_text(encoding="utf-8")
+    tests = dict(re.findall(r"^(?:async )?def (test_\w+)(.*?)(?=^[^\s)])", source, re.M | re.S))
+
+    assert set(SAMPLE_TESTS) <= set(FLOWS)
+    for name in SAMPLE_TESTS.values():
+        assert "authenticated_page" not in tests[name]
+        assert "testathon.live" not in tests[name]
+
+
+def test_sample_test_durations_are_read_from_the_results_log(tmp_path):
+    records = [
+        {"test": "tests/sample-test.py::test_product_search_functionality[chromium]", "platform": "local",
+         "outcome": "passed", "duration": 1.25},
+        {"test": "tests/sample-test.py::test_product_filtering[chromium]", "platform": "local",
+         "outcome": "failed", "duration": 3.0, "reason": "no filtered products"},
+        {"test": "tests/sample-test.py::test_checkout_process[chromium]", "platform": "local",
+         "outcome": "passed", "duration": 3.0},
+        {"test": "tests/sample-test.py::test_element_visibility_check[chromium]", "platform": "local",
+         "outcome": "passed", "duration": 0.5},
+    ]
+    (tmp_path / "run-local-main.jsonl").write_text("".join(json.dumps(record) + "\n" for record in records))
+    timer = ActionTimer()
+
+    failures = read_test_durations(tmp_path, "pytest", timer)
+
+    assert timer.samples == {"pytest:search": [1250.0]}
+    assert failures == ["tests/sample-test.py::test_product_filtering[chromium] on local failed: no filtered products"]
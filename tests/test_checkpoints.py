@@ -0,0 +1,118 @@
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from support.checkpoints import CheckpointedFlow, CheckpointStats, is_retryable
+
+
+class FakeContext:
+    def __init__(self, storage_state=None):
+        self.state = dict(storage_state or {"cookies": [], "origins": []})
+
+    def storage_state(self):
+        return dict(self.state)
+
+    def new_page(self):
+        return FakePage(self)
+
+
+class FakePage:
+    def __init__(self, context, url="about:blank"):
+        self.context = context
+        self.url = url
+
+    def goto(self, url):
+        self.url = url
+
+
+def flow_with_flaky_step(failures, retries=1, stats=None):
+    contexts = []
+
+    def new_context(storage_state):
+        contexts.append(FakeContext(storage_state))
+        return contexts[-1]
+
+    flow = CheckpointedFlow(new_context, FakePage(FakeContext(), "https://shop/"), retries, stats)
+    runs = []
+
+    @flow.step("cart")
+    def cart(page):
+        runs.append("cart")
+        page.context.state["cart"] = 1
+        page.goto("https://shop/checkout")
+
+    @flow.step("payment")
+    def payment(page):
+        runs.append("payment")
+        if failures:
+            failures.pop()
+            raise PlaywrightTimeoutError("payment-form not visible")
+
+    return flow, runs, contexts
+
+
+def test_failed_step_resumes_from_the_last_checkpoint():
+    stats = CheckpointStats()
+    flow, runs, contexts = flow_with_flaky_step([1], stats=stats)
+
+    page = flow.run()
+
+    assert runs == ["cart", "payment", "payment"]
+    assert [checkpoint.step for checkpoint in flow.checkpoints] == ["start", "cart", "payment"]
+    assert len(contexts) == 1 and contexts[0].state["cart"] == 1
+    assert page.url == "https://shop/checkout" and page.context is contexts[0]
+    assert (stats.flows, stats.retried_steps, stats.skipped_steps) == (1, 1, 1)
+
+
+def test_gives_up_after_the_configured_retries():
+    flow, runs, _ = flow_with_flaky_step([1, 1], retries=1)
+
+    with pytest.raises(PlaywrightTimeoutError):
+        flow.run()
+    assert runs == ["cart", "payment", "payment"]
+
+
+def test_other_errors_are_not_retried():
+    flow = CheckpointedFlow(lambda **kwargs: FakeContext(), FakePage(FakeContext()))
+
+    @flow.step("broken")
+    def broken(page):
+        raise KeyError("order")
+
+    with pytest.raises(KeyError):
+        flow.run()
+    assert flow.retried_steps == 0
+
+
+def raise_like_expect():
+    # expect() raises a plain AssertionError from inside Playwright
+    namespace = {"__name__": "playwright._impl._assertions"}
+    exec("def fail():\n    raise AssertionError('Locator expected to be visible')", namespace)
+    namespace["fail"]()
+
+
+def test_only_timeouts_and_expect_failures_are_retryable():
+    for fails, retryable in ((raise_like_expect, True), (lambda: exec("assert False"), False)):
+        with pytest.raises(AssertionError) as excinfo:
+            fails()
+        assert is_retryable(excinfo.value) is retryable
+    assert is_retryable(PlaywrightTimeoutError("waiting for selector"))
+    assert not is_retryable(KeyError("order"))
+
+
+def test_uncheckpointed_steps_run_again_and_unretryable_steps_do_not():
+    """A resume restarts after the last checkpoint; a step with retry=False fails the flow"""
+    flow, runs, contexts = flow_with_flaky_step([1])
+    flow.steps[0] = ("cart", flow.steps[0][1], False, True)
+
+    flow.run()
+
+    assert runs == ["cart", "payment", "cart", "payment"]
+    assert [checkpoint.step for checkpoint in flow.checkpoints] == ["start", "payment"]
+    assert len(contexts) == 1 and flow.page.context is contexts[0]
+
+    flow, runs, _ = flow_with_flaky_step([1])
+    flow.steps[1] = ("payment", flow.steps[1][1], True, False)
+
+    with pytest.raises(PlaywrightTimeoutError):
+        flow.run()
+    assert runs == ["cart", "payment"] and flow.retried_steps == 0
@@ -0,0 +1,179 @@
+import asyncio
+import io
+import json
+from contextlib import redirect_stdout
+
+import pytest
+
+from support.concurrent import (
+    BATCH_OUTCOME,
+    BATCH_STATE,
+    MARKER,
+    BatchSettings,
+    BatchState,
+    _task_output,
+    _TaskStdout,
+    pytest_pyfunc_call,
+    run_batch,
+)
+from support.status import EXECUTOR_PREFIX, STATUS_REPORTER, BrowserStackBackend, LocalBackend, StatusReporter
+
+
+def test_prints_from_concurrent_tasks_stay_with_their_task():
+    """Interleaved tasks each keep their own output; other prints pass through"""
+    async def task(name, buffer):
+        _task_output.set(buffer)
+        for step in range(3):
+            print(f"{name} {step}")
+            await asyncio.sleep(0)
+
+    async def batch(buffers):
+        await asyncio.gather(*(task(name, buffer) for name, buffer in buffers.items()))
+
+    fallback = io.StringIO()
+    buffers = {"a": io.StringIO(), "b": io.StringIO()}
+    with redirect_stdout(_TaskStdout(fallback)):
+        asyncio.run(batch(buffers))
+        print("outside")
+
+    assert buffers["a"].getvalue() == "a 0\na 1\na 2\n"
+    assert buffers["b"].getvalue() == "b 0\nb 1\nb 2\n"
+    assert fallback.getvalue() == "outside\n"
+
+
+class FakeAsyncPage:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def evaluate(self, expression, arg=None):
+        self.sent.append(json.loads(arg[len(EXECUTOR_PREFIX):]))
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncBrowser:
+    def __init__(self):
+        self.sent = []
+
+    async def new_context(self, **kwargs):
+        return self
+
+    async def new_page(self):
+        return FakeAsyncPage(self.sent)
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncPlaywright:
+    def __init__(self, browser):
+        self.chromium = self
+        self.browser = browser
+
+    async def launch(self, **kwargs):
+        return self.browser
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeItem:
+    def __init__(self, name, function):
+        self.nodeid = f"tests/sample-test.py::{name}"
+        self.obj = function
+        self.stash = pytest.Stash()
+        self.config = FakeConfig()
+
+    def get_closest_marker(self, name):
+        return name == MARKER
+
+
+class FakeConfig:
+    def __init__(self):
+        self.stash = pytest.Stash()
+        self.stash[BATCH_STATE] = BatchState()
+
+
+async def reads_the_page(async_page):
+    await asyncio.sleep(0)
+
+
+async def fails_an_assertion(async_page):
+    await asyncio.sleep(0)
+    assert False, "cart badge missing"
+
+
+def test_a_failing_coroutine_fails_only_its_own_item(monkeypatch):
+    """The batch runs everything; each item then reports only its own outcome"""
+    browser = FakeAsyncBrowser()
+    monkeypatch.setattr("support.concurrent.async_playwright", lambda: FakeAsyncPlaywright(browser))
+    items = [FakeItem("test_a", reads_the_page), FakeItem("test_b", fails_an_assertion)]
+    items.append(FakeItem("test_c", reads_the_page))
+    settings = BatchSettings("chromium", {}, {}, None, "https://testathon.live/", BrowserStackBackend())
+
+    outcomes = asyncio.run(run_batch(items, settings, max_pages=2))
+
+    assert [outcomes[item.nodeid].error is None for item in items] == [True, False, True]
+    for item in items:
+        item.config.stash[BATCH_STATE].outcomes[item.nodeid] = outcomes[item.nodeid]
+    assert pytest_pyfunc_call(items[0]) is True
+    with pytest.raises(AssertionError, match="cart badge missing"):
+        pytest_pyfunc_call(items[1])
+    assert pytest_pyfunc_call(items[2]) is True
+    assert items[1].stash[BATCH_OUTCOME] is outcomes[items[1].nodeid]
+
+    annotations = [event["arguments"] for event in browser.sent if event["action"] == "annotate"]
+    assert [annotation["level"] for annotation in annotations].count("error") == 1
+    [status] = [event["arguments"] for event in browser.sent if event["action"] == "setSessionStatus"]
+    assert status["status"] == "failed"
+    assert status["reason"] == "tests/sample-test.py::test_b: cart badge missing assert False"
+
+
+async def reports_its_own_status(async_page, session_status):
+    session_status.annotate("read the landing page")
+    session_status.passed("landing page read")
+
+
+def test_each_test_gets_its_own_session_status(monkeypatch, tmp_path):
+    """Locally statuses go to the status backend; a failure without one is marked failed"""
+    browser = FakeAsyncBrowser()
+    monkeypatch.setattr("support.concurrent.async_playwright", lambda: FakeAsyncPlaywright(browser))
+    items = [FakeItem("test_a", reports_its_own_status), FakeItem("test_b", fails_an_assertion)]
+    log = tmp_path / "status.jsonl"
+    settings = BatchSettings("chromium", {}, {}, None, "https://testathon.live/", LocalBackend(log))
+
+    asyncio.run(run_batch(items, settings, max_pages=2))
+
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert browser.sent == []
+    assert [(record["test"], record["action"]) for record in records if record["test"] == items[0].nodeid] == [
+        (items[0].nodeid, "annotate"), (items[0].nodeid, "setSessionStatus"),
+    ]
+    [failed] = [record for record in records if record["test"] == items[1].nodeid]
+    assert (failed["status"], failed["reason"]) == ("failed", "cart badge missing assert False")
+
+
+def test_statuses_are_annotations_in_the_batch_session(monkeypatch):
+    """On BrowserStack only the batch sets the shared session's status"""
+    browser = FakeAsyncBrowser()
+    monkeypatch.setattr("support.concurrent.async_playwright", lambda: FakeAsyncPlaywright(browser))
+    item = FakeItem("test_a", reports_its_own_status)
+    settings = BatchSettings("chromium", {}, {}, None, "https://testathon.live/", BrowserStackBackend())
+
+    outcomes = asyncio.run(run_batch([item], settings, max_pages=1))
+
+    assert [event["arguments"]["data"] for event in browser.sent if event["action"] == "annotate"] == [
+        "read the landing page", f"{item.nodeid} passed: landing page read",
+    ]
+    [status] = [event["arguments"] for event in browser.sent if event["action"] == "setSessionStatus"]
+    assert status["status"] == "passed"
+
+    # pytest's own session_status for the item must not send a second status
+    item.stash[STATUS_REPORTER] = StatusReporter(item.nodeid, BrowserStackBackend())
+    item.config.stash[BATCH_STATE].outcomes[item.nodeid] = outcomes[item.nodeid]
+    pytest_pyfunc_call(item)
+    assert STATUS_REPORTER not in item.stash
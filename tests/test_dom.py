@@ -0,0 +1,78 @@
+import pytest
+
+from support.dom import DomSnapshot, SelectorMatch, dom_snapshot, query_elements
+
+
+def make_snapshot():
+    return DomSnapshot({
+        "tag": ["div", "div", "button", "div"],
+        "classes": ["card", "", "btn", "card"],
+        "data": [{"data-test": "product"}, {}, {"data-test": "add-to-cart"}, {"data-test": "product"}],
+    })
+
+
+def test_where_filters_on_values_and_callables():
+    """Conditions accept a literal to compare against or a predicate"""
+    snapshot = make_snapshot()
+
+    assert snapshot.where(classes=bool)["tag"] == ["div", "button", "div"]
+    assert snapshot.where(tag="div", classes="card")["classes"] == ["card", "card"]
+    assert len(snapshot.where(tag="span")) == 0
+
+
+def test_where_does_not_match_values_of_another_type():
+    """A literal of a different type than the column matches nothing"""
+    snapshot = make_snapshot()
+
+    assert len(snapshot.where(classes=0)) == 0
+    assert snapshot.where(data={"data-test": "product"})["classes"] == ["card", "card"]
+
+
+def test_unique_deduplicates_in_first_seen_order():
+    """Rows are de-duplicated across fields, including dict-valued columns"""
+    snapshot = make_snapshot()
+
+    assert snapshot.unique("tag", "classes") == [("div", "card"), ("div", ""), ("button", "btn")]
+    assert len(snapshot.unique("data")) == 3
+
+
+def test_snapshot_is_a_single_evaluate_call():
+    """All fields for all nodes come back from one page.evaluate"""
+    class FakePage:
+        calls = []
+
+        def evaluate(self, expression, arg):
+            self.calls.append(arg)
+            return {"tag": ["div"], "text": ["Add to cart"]}
+
+    page = FakePage()
+    snapshot = dom_snapshot(page, "[data-test]", fields=["tag", "text"])
+
+    assert len(page.calls) == 1
+    assert page.calls[0] == ["[data-test]", ["tag", "text"], None, 100]
+    assert list(snapshot.rows()) == [{"tag": "div", "text": "Add to cart"}]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="href"):
+        dom_snapshot(None, fields=["tag", "href"])
+
+
+def test_query_elements_batches_all_selectors():
+    """Every selector's count and samples come back from one page.evaluate"""
+    class FakePage:
+        calls = []
+
+        def evaluate(self, expression, arg):
+            self.calls.append(arg)
+            return {
+                "button": {"count": 3, "visible": None, "samples": ["Add", "Buy"]},
+                "[class*='nav']": {"count": 0, "visible": None, "samples": []},
+            }
+
+    page = FakePage()
+    matches = query_elements(page, ["button", "[class*='nav']"], samples=2)
+
+    assert len(page.calls) == 1
+    assert matches["button"] == SelectorMatch(count=3, visible=None, samples=["Add", "Buy"])
+    assert matches["[class*='nav']"].count == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from support.har import HarStore
+
+
+class FakeContext:
+    def __init__(self):
+        self.calls = []
+
+    def route_from_har(self, path, not_found):
+        self.calls.append(("har", path, not_found))
+
+    def route(self, pattern, handler):
+        self.calls.append(("route", pattern))
+
+
+def test_replay_routes_har_before_passthrough(tmp_path):
+    """Passthrough routes are registered last so they win over the HAR router"""
+    store = HarStore(tmp_path, not_found="fallback", passthrough=["**/analytics/**"])
+    path = store.path_for("tests/sample-test.py::test_basic_page_loading[chromium]")
+    path.write_bytes(b"")
+    context = FakeContext()
+
+    store.replay(context, path)
+
+    assert context.calls == [("har", str(path), "fallback"), ("route", "**/analytics/**")]
+
+
+def test_replay_without_recording_fails_when_aborting(tmp_path):
+    """Replaying a test that was never recorded is reported instead of going live"""
+    store = HarStore(tmp_path, not_found="abort")
+
+    with pytest.raises(pytest.fail.Exception, match="--har-mode=record"):
+        store.replay(FakeContext(), store.path_for("tests/sample-test.py::test_missing"))
+
+
+def test_each_context_gets_its_own_archive(tmp_path):
+    """A test opening several contexts records each into a separate HAR"""
+    store = HarStore(tmp_path)
+    nodeid = "tests/sample-test.py::test_checkout_process[chromium]"
+
+    assert store.path_for(nodeid, 0) != store.path_for(nodeid, 1)
+    assert store.path_for(nodeid).name.endswith(".har.zip")
+    assert store.record_args(store.path_for(nodeid))["record_har_content"] == "attach"
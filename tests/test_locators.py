@@ -0,0 +1,86 @@
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from support.locators import SelectorResolver
+
+
+class FakeLocator:
+    def __init__(self, page, selectors):
+        self.page = page
+        self.selectors = selectors
+
+    @property
+    def first(self):
+        return self
+
+    def or_(self, other):
+        return FakeLocator(self.page, self.selectors + other.selectors)
+
+    def _present(self):
+        return any(selector in self.page.present for selector in self.selectors)
+
+    def wait_for(self, state, timeout):
+        self.page.waits.append((tuple(self.selectors), timeout))
+        if not self._present():
+            raise PlaywrightTimeoutError(f"{self.selectors} not {state}")
+
+    def is_visible(self):
+        return self._present()
+
+    def count(self):
+        return int(self._present())
+
+
+class FakePage:
+    url = "https://example.test/signup?step=1"
+
+    def __init__(self, present):
+        self.present = set(present)
+        self.waits = []
+
+    def locator(self, selector):
+        return FakeLocator(self, [selector])
+
+
+CHAIN = ["[data-test='email-input']", "input[type='email']", "input[name='email']"]
+
+
+def test_first_match_is_remembered_and_tried_first():
+    resolver = SelectorResolver()
+    page = FakePage({"input[type='email']"})
+
+    assert resolver.locate(page, "email", CHAIN).selectors == ["input[type='email']"]
+    assert resolver.winners == {"/signup": {"email": "input[type='email']"}}
+    assert resolver.stats["email"].lost_ms == 0
+
+    page.waits.clear()
+    assert resolver.locate(page, "email", CHAIN).selectors == ["input[type='email']"]
+    assert page.waits == [(("input[type='email']",), 1000)]
+    assert resolver.stats["email"].hits == 1
+
+
+def test_stale_winner_falls_back_to_the_chain():
+    resolver = SelectorResolver({"/signup": {"email": "input[type='email']"}}, probe_timeout=200)
+    page = FakePage({"input[name='email']"})
+
+    locator = resolver.locate(page, "email", CHAIN, timeout=5000)
+
+    assert locator.selectors == ["input[name='email']"]
+    assert page.waits == [(("input[type='email']",), 200), (tuple(CHAIN), 5000)]
+    assert resolver.winners["/signup"]["email"] == "input[name='email']"
+    assert resolver.stats["email"].stale == 1 and resolver.changed
+    assert resolver.stats["email"].lost_ms > 0
+
+
+def test_only_stale_probes_count_as_lost():
+    resolver = SelectorResolver()
+    page = FakePage({"input[name='email']"})
+
+    resolver.locate(page, "email", CHAIN)
+
+    assert resolver.stats["email"].lost_ms == 0
+
+
+def test_no_match_times_out():
+    with pytest.raises(PlaywrightTimeoutError):
+        SelectorResolver().locate(FakePage(set()), "email", CHAIN)
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from support.perf import (
+    METRICS_JS,
+    PERF_BASELINE,
+    PERF_LOG,
+    PERF_RECORDER,
+    PerfBaseline,
+    PerfLog,
+    PerfRecorder,
+    find_regressions,
+    pytest_runtest_makereport,
+)
+from support.stats import percentile, summarize
+
+
+class FakePage:
+    url = "https://testathon.live/"
+
+    def __init__(self, load_ms):
+        self.load_ms = load_ms
+        self.navigations = []
+
+    def goto(self, url, **kwargs):
+        self.navigations.append(url)
+        return "response"
+
+    def reload(self, **kwargs):
+        self.navigations.append("reload")
+
+    def evaluate(self, expression):
+        assert expression == METRICS_JS
+        return {"ttfb_ms": 80.0, "load_ms": self.load_ms}
+
+
+def test_percentile_interpolates_between_ranks():
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert summarize([1, 2, 3, 4, 5]) == {"p50": 3, "p95": pytest.approx(4.8)}
+
+
+def test_every_goto_and_reload_is_measured(tmp_path):
+    """Wrapped navigations still return their result and append one record each"""
+    log = PerfLog(tmp_path / "run.jsonl")
+    recorder = PerfRecorder("tests/sample-test.py::test_basic_page_loading", log)
+    page = FakePage(load_ms=900.0)
+    recorder.instrument_page(page)
+
+    assert page.goto("https://testathon.live/") == "response"
+    page.reload()
+
+    records = [json.loads(line) for line in log.path.read_text().splitlines()]
+    assert [record["action"] for record in records] == ["goto", "reload"]
+    assert records[0]["load_ms"] == 900.0 and records[0]["platform"] == "local"
+
+
+def test_baseline_flags_only_real_slowdowns(tmp_path):
+    """Growth must beat both the percentage threshold and the absolute floor"""
+    earlier = tmp_path / "earlier-local-main.jsonl"
+    earlier.write_text("".join(
+        json.dumps({"test": "t", "platform": "local", "load_ms": value, "ttfb_ms": 80.0}) + "\n"
+        for value in (1000.0, 1000.0, 1100.0)
+    ))
+    (tmp_path / "current-local-main.jsonl").write_text(
+        json.dumps({"test": "t", "platform": "local", "load_ms": 99999.0}) + "\n"
+    )
+    baseline = PerfBaseline.load(tmp_path, exclude_prefix="current").get("t", "local")
+
+    slower = [{"load_ms": 1500.0, "ttfb_ms": 95.0}]
+    messages = find_regressions(slower, baseline, threshold=20, min_delta_ms=50)
+
+    assert [message.split()[:2] for message in messages] == [["load_ms", "p50"], ["load_ms", "p95"]]
+    assert find_regressions([{"load_ms": 1050.0}], baseline, threshold=20, min_delta_ms=50) == []
+
+
+class FakeConfig:
+    def __init__(self, baseline, gate):
+        self.stash = pytest.Stash()
+        self.stash[PERF_BASELINE] = baseline
+        self.stash[PERF_LOG] = PerfLog("unused.jsonl")
+        self.options = {"perf_threshold": 20.0, "perf_min_delta_ms": 50.0, "perf_gate": gate}
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+class FakeItem:
+    nodeid = "t"
+
+    def __init__(self, config, samples):
+        self.config = config
+        self.stash = pytest.Stash()
+        self.stash[PERF_RECORDER] = PerfRecorder(self.nodeid)
+        self.stash[PERF_RECORDER].samples = samples
+
+
+class FakeCall:
+    def __init__(self, when):
+        self.when = when
+
+
+class FakeOutcome:
+    def __init__(self, report):
+        self.report = report
+
+    def get_result(self):
+        return self.report
+
+
+def make_report(item, when):
+    report = pytest.TestReport(item.nodeid, ("t.py", 0, "t"), {}, "passed", None, when)
+    hook = pytest_runtest_makereport(item, FakeCall(when))
+    next(hook)
+    with pytest.raises(StopIteration):
+        hook.send(FakeOutcome(report))
+    return report
+
+
+def test_fail_gate_fails_the_call_phase(monkeypatch):
+    """The test itself fails, rather than erroring in teardown after its status went out"""
+    monkeypatch.setattr("support.perf.platform_key", lambda: "local")
+    baseline = PerfBaseline({("t", "local"): {"load_ms": {"p50": 1000.0, "p95": 1100.0}}})
+    item = FakeItem(FakeConfig(baseline, "fail"), [{"load_ms": 1500.0}])
+
+    call = make_report(item, "call")
+    teardown = make_report(item, "teardown")
+
+    assert call.failed and "load_ms p50 1000 ms -> 1500 ms" in call.longreprtext
+    assert teardown.passed
+    assert item.config.stash[PERF_LOG].regressions == [call.longrepr]
@@ -0,0 +1,152 @@
+from support.pool import NAVIGATE_JS, RESET_STORAGE_JS, PagePool, _instrumented
+
+
+class FakeFrame:
+    parent_frame = None
+
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+        self.listeners = []
+        self.evaluated = []
+
+    def on(self, event, callback):
+        self.listeners.append(callback)
+
+    def navigate(self, url):
+        self.url = url
+        for callback in self.listeners:
+            callback(FakeFrame(url))
+
+    def evaluate(self, expression, arg=None):
+        self.evaluated.append(expression)
+        if expression == NAVIGATE_JS:
+            self.navigate(arg)
+            return None
+        if expression == RESET_STORAGE_JS:
+            return None
+        return 250.0
+
+    def wait_for_url(self, predicate, wait_until, timeout):
+        assert predicate(self.url)
+
+    def goto(self, url, timeout=None):
+        self.navigate(url)
+
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.cookies_cleared = 0
+        self.closed = False
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+def test_warm_pages_are_hits_and_an_empty_pool_is_a_miss():
+    """Tests take pre-loaded pages while the pool has them, and load cold otherwise"""
+    pool = PagePool(FakeBrowser().new_context, "https://testathon.live/", size=1)
+    pool.fill()
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first.page.url == second.page.url == "https://testathon.live/"
+    assert (pool.stats.hits, pool.stats.misses) == (1, 1)
+    assert pool.stats.warmup_ms == 250.0
+
+
+def test_released_pages_are_reset_and_reused():
+    """Cookies and storage are cleared and the page starts loading base_url again"""
+    browser = FakeBrowser()
+    pool = PagePool(browser.new_context, "https://testathon.live/", size=1)
+    pool.fill()
+
+    entry = pool.acquire()
+    pool.release(entry)
+
+    assert entry.context.cookies_cleared == 1
+    assert RESET_STORAGE_JS in entry.page.evaluated
+    assert pool.acquire() is entry
+    assert len(browser.contexts) == 1
+
+
+def test_contexts_are_recycled_after_failures_other_origins_and_max_uses():
+    pool = PagePool(FakeBrowser().new_context, "https://testathon.live/", size=1, max_uses=2)
+    pool.fill()
+
+    failed = pool.acquire()
+    pool.release(failed, reusable=False)
+    wandered = pool.acquire()
+    wandered.page.navigate("https://payments.example.com/")
+    pool.release(wandered)
+    worn = pool.acquire()
+    pool.release(worn)
+    worn = pool.acquire()
+    pool.release(worn)
+
+    assert failed.context.closed and wandered.context.closed and worn.context.closed
+    assert pool.stats.recycled == 3
+
+
+def test_tests_with_their_own_new_context_bypass_the_pool():
+    """Contexts made through the test's fixture chain are not pooled or closed by the pool"""
+    pooled, own = FakeBrowser(), FakeBrowser()
+    pool = PagePool(pooled.new_context, "https://testathon.live/", size=1)
+    pool.fill()
+
+    entry = pool.acquire(own.new_context)
+    pool.release(entry)
+
+    assert entry.page.url == "https://testathon.live/"
+    assert own.contexts == [entry.context] and not entry.context.closed
+    assert len(pool.idle) == 1 and pool.idle[0].context is pooled.contexts[0]
+    assert (pool.stats.hits, pool.stats.misses, pool.stats.bypassed) == (0, 0, 1)
+
+
+class FakeConfig:
+    def __init__(self, **options):
+        self.options = options
+
+    def getoption(self, name, default=None):
+        return self.options.get(name, default)
+
+
+def test_playwright_artifact_options_bypass_the_pool():
+    """Traces, videos and screenshots are only taken of contexts pytest-playwright made"""
+    def new_context(**kwargs):
+        pass
+
+    new_context.__module__ = "pytest_playwright.pytest_playwright"
+
+    assert not _instrumented(new_context, FakeConfig(tracing="off", video="off", screenshot="off"))
+    for option in ("tracing", "video", "screenshot"):
+        assert _instrumented(new_context, FakeConfig(**{option: "on"}))
+    assert _instrumented(FakeBrowser().new_context, FakeConfig())
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+
+from support.resources import COLUMNS, MB, ProcessSampler, ResourceLog, assess
+
+
+def _window(rss_mb, cpu=None):
+    count = len(rss_mb)
+    return {
+        "t": [0.5 * index for index in range(count)],
+        "cpu": cpu or [10.0] * count,
+        "rss_worker": [value * MB for value in rss_mb],
+        "rss_driver": [0.0] * count,
+        "rss_browser": [0.0] * count,
+        "fds": [12.0] * count,
+    }
+
+
+def test_sampler_counts_child_processes_as_browser():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        sampler = ProcessSampler(interval=60)
+        sampler.sample()
+        sampler.sample()
+    finally:
+        child.kill()
+        child.wait()
+
+    window = sampler.window(0, len(sampler))
+    assert set(window) == set(COLUMNS)
+    assert len(window["t"]) == 2
+    assert window["rss_worker"][-1] > 0
+    # A python child is not a node driver, so it counts as browser
+    assert window["rss_browser"][-1] > 0
+    assert window["fds"][-1] > 0
+
+
+def test_sampler_thread_samples_until_stopped():
+    sampler = ProcessSampler(interval=0.01)
+    sampler.start()
+    while len(sampler) < 3:
+        pass
+    sampler.stop()
+    count = len(sampler)
+
+    assert sampler.window(0, count)["t"] == sorted(sampler.window(0, count)["t"])
+    assert len(sampler) == count
+
+
+def test_assess_flags_growth_and_peaks():
+    summary, flags = assess(_window([100, 180, 260]), leak_mb=100, peak_mb=250)
+
+    assert summary["peak_rss_mb"] == 260
+    assert summary["rss_growth_mb"] == 160
+    assert flags == ["LEAK grew 160 MB", "PEAK 260 MB"]
+
+
+def test_assess_does_not_flag_a_spike_that_is_released():
+    summary, flags = assess(_window([100, 900, 110]), leak_mb=100, peak_mb=None)
+
+    assert summary["peak_rss_mb"] == 900
+    assert flags == []
+
+
+def test_log_writes_one_compact_line_per_test(tmp_path):
+    log = ResourceLog(tmp_path / "run.jsonl", ProcessSampler())
+    for name, rss in (("test_a", [100, 120]), ("test_b", [120, 300])):
+        window = _window(rss)
+        log.write(name, window, assess(window, 100, None)[0])
+
+    lines = (tmp_path / "run.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+    assert '"test":"test_b"' in lines[1] and ", " not in lines[1]
+    assert log.tests == 2 and log.peak_rss == 300
@@ -0,0 +1,119 @@
+from benchmarks.server import serve
+from support.result_cache import DAY, ResultCache, app_fingerprint, pytest_configure, result_key
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+PAGE = """<html><head>
+<link rel="stylesheet" href="/_next/static/css/{build}.css">
+<script src="/_next/static/chunks/main-{build}.js" defer></script>
+</head><body data-nonce="{nonce}">storefront</body></html>"""
+
+
+def test_app_fingerprint_follows_the_bundles_not_the_markup(tmp_path):
+    with serve(tmp_path) as base_url:
+        (tmp_path / "index.html").write_text(PAGE.format(build="a1", nonce="1"))
+        first = app_fingerprint(base_url)
+        (tmp_path / "index.html").write_text(PAGE.format(build="a1", nonce="2"))
+        same_deploy = app_fingerprint(base_url)
+        (tmp_path / "index.html").write_text(PAGE.format(build="b2", nonce="2"))
+        new_deploy = app_fingerprint(base_url)
+
+    assert first is not None
+    assert same_deploy == first
+    assert new_deploy != first
+
+
+def test_app_fingerprint_of_an_unreachable_app_is_none():
+    assert app_fingerprint("http://127.0.0.1:9/", timeout=1) is None
+
+
+def test_key_changes_with_app_source_and_platform():
+    base = result_key("app", "def test(): pass", "support", {"browserName": "chrome"})
+
+    assert result_key("app", "def test(): pass", "support", {"browserName": "chrome"}) == base
+    assert result_key("app2", "def test(): pass", "support", {"browserName": "chrome"}) != base
+    assert result_key("app", "def test(): assert 1", "support", {"browserName": "chrome"}) != base
+    assert result_key("app", "def test(): pass", "support", {"browserName": "safari"}) != base
+
+
+def test_passes_are_reused_until_the_key_changes_or_they_expire():
+    cache = FakeCache()
+    results = ResultCache(cache, "local", max_age=DAY)
+    results.record("test_cart", "k1", 4.2)
+    results.save()
+    now = cache.values["results/passes/local"]["test_cart"]["at"]
+
+    reloaded = ResultCache(cache, "local", max_age=DAY)
+    assert reloaded.lookup("test_cart", "k1", now=now)["duration"] == 4.2
+    assert reloaded.lookup("test_cart", "k2", now=now) is None
+    assert reloaded.lookup("test_cart", "k1", now=now + 2 * DAY) is None
+    assert ResultCache(cache, "windows-11-chrome").lookup("test_cart", "k1") is None
+
+
+def test_failures_forget_and_the_oldest_entries_are_evicted():
+    cache = FakeCache()
+    cache.values["results/passes/local"] = {
+        f"test_{index}": {"key": "k", "at": 1000.0 + index, "duration": 1.0} for index in range(5)
+    }
+    results = ResultCache(cache, "local", max_age=DAY, max_entries=3)
+    results.forget("test_4")
+    results.save(now=1010.0)
+
+    assert sorted(cache.values["results/passes/local"]) == ["test_1", "test_2", "test_3"]
+
+    cache.values["results/passes/local"]["test_1"]["at"] = 1010.0 - 2 * DAY
+    results = ResultCache(cache, "local", max_age=DAY)
+    results.forget("test_0")
+    results.save(now=1010.0)
+
+    assert sorted(cache.values["results/passes/local"]) == ["test_2", "test_3"]
+
+
+class FakePluginManager:
+    def __init__(self):
+        self.plugins = {}
+
+    def register(self, plugin, name):
+        self.plugins[name] = plugin
+
+
+class FakeConfig:
+    def __init__(self, **options):
+        self.options = {"result_cache_max_age": 7, "result_cache_max_entries": 5000, **options}
+        self.cache = FakeCache()
+        self.pluginmanager = FakePluginManager()
+        self.warnings = []
+
+    def getoption(self, name, default=None):
+        return self.options.get(name, default)
+
+    def addinivalue_line(self, name, line):
+        pass
+
+    def issue_config_time_warning(self, warning, stacklevel):
+        self.warnings.append(str(warning))
+
+
+def test_the_app_is_only_fingerprinted_with_result_cache_and_not_in_har_replay():
+    """Without the plugin nothing is fetched, so default and replay runs stay off the network"""
+    configs = [
+        FakeConfig(),
+        FakeConfig(result_cache=True, no_result_cache=True),
+        FakeConfig(result_cache=True, har_mode="replay"),
+        FakeConfig(result_cache=True),
+    ]
+    for config in configs:
+        pytest_configure(config)
+
+    assert [list(config.pluginmanager.plugins) for config in configs] == [[], [], [], ["result-cache"]]
+    assert configs[2].warnings == ["--result-cache is not used with --har-mode=replay"]
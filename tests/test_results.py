@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from support import results
+from support.results import ResultFollower, ResultMatrix, format_summary, merge_properties, outcome_of, reason_of
+
+
+def _report(when, outcome, longrepr=None, duration=1.0, **extra):
+    report = pytest.TestReport("t.py::test", ("t.py", 1, "test"), {}, outcome, longrepr, when, duration=duration)
+    for name, value in extra.items():
+        setattr(report, name, value)
+    return report
+
+
+def _record(test, platform, outcome="passed", at=1.0, **extra):
+    return {"test": test, "platform": platform, "outcome": outcome, "duration": 2.0, "at": at, **extra}
+
+
+def test_outcome_folds_the_three_phases():
+    passed = {when: _report(when, "passed") for when in ("setup", "call", "teardown")}
+
+    assert outcome_of(passed) == "passed"
+    assert outcome_of({**passed, "call": _report("call", "failed")}) == "failed"
+    assert outcome_of({**passed, "teardown": _report("teardown", "failed")}) == "error"
+    assert outcome_of({"setup": _report("setup", "skipped", ("t.py", 1, "Skipped: later"))}) == "skipped"
+    assert outcome_of({**passed, "call": _report("call", "skipped", wasxfail="")}) == "xfailed"
+
+
+def test_reason_drops_the_call_log():
+    error = "TimeoutError: Timeout 5000ms exceeded.\nCall log:\n  - waiting for locator('#signin')"
+    reports = {"setup": _report("setup", "passed"), "call": _report("call", "failed", error)}
+
+    assert reason_of(reports) == "TimeoutError: Timeout 5000ms exceeded."
+
+
+def test_matrix_keeps_the_latest_attempt_per_platform():
+    matrix = ResultMatrix()
+    matrix.feed(_record("test_cart", "chrome", "failed", at=2.0, reason="timeout", properties={"trace": "a"}))
+    matrix.feed(_record("test_cart", "chrome", "passed", at=3.0, properties={"retried_steps": 1}))
+    matrix.feed(_record("test_cart", "chrome", "failed", at=1.0))
+    matrix.feed(_record("test_cart", "safari", "failed", at=1.0, reason="timeout"))
+
+    report = matrix.report()
+    chrome = report["tests"]["test_cart"]["chrome"]
+    assert chrome["outcome"] == "passed" and chrome["attempts"] == 3 and "reason" not in chrome
+    assert chrome["properties"] == {"trace": "a", "retried_steps": 1}
+    assert report["platforms"]["safari"]["failed"] == 1
+    assert format_summary(report["platforms"])[0] == "chrome: 1 passed in 2.0s (slowest test_cart 2.0s)"
+
+
+def test_matrix_counts_attempts_within_one_run():
+    matrix = ResultMatrix()
+    matrix.feed(_record("test_cart", "chrome", "failed", at=1.0, run="old", properties={"trace": "a"}))
+    matrix.feed(_record("test_cart", "chrome", "passed", at=2.0, run="new"))
+    matrix.feed(_record("test_cart", "chrome", "failed", at=0.5, run="old"))
+
+    chrome = matrix.report()["tests"]["test_cart"]["chrome"]
+    assert chrome["outcome"] == "passed" and chrome["attempts"] == 1 and "properties" not in chrome
+
+
+def test_properties_merge_without_jsonmerge(monkeypatch):
+    monkeypatch.setattr(results, "_jsonmerge", lambda: None)
+
+    assert merge_properties({"a": {"x": 1}, "b": 1}, {"a": {"y": 2}, "b": 2}) == {"a": {"x": 1, "y": 2}, "b": 2}
+
+
+def test_follower_only_reads_complete_lines(tmp_path):
+    path = tmp_path / "run-local-gw0.jsonl"
+    first = json.dumps(_record("test_a", "local"))
+    second = json.dumps(_record("test_b", "local"))
+    path.write_text(first + "\n" + second[:10])
+    follower = ResultFollower([tmp_path])
+
+    assert [record["test"] for record in follower.poll()] == ["test_a"]
+    with open(path, "a") as handle:
+        handle.write(second[10:] + "\n")
+    assert [record["test"] for record in follower.poll()] == ["test_b"]
+    assert list(follower.poll()) == []
+
+
+def _results_file(directory, name, test, written):
+    path = directory / f"{name}.jsonl"
+    path.write_text(json.dumps(_record(test, "local")) + "\n")
+    os.utime(path, (written, written))
+
+
+def test_follower_reads_the_newest_run_of_each_platform(tmp_path):
+    _results_file(tmp_path, "old-chrome-gw0", "old_chrome", 100)
+    _results_file(tmp_path, "new-chrome-gw0", "new_chrome", 200)
+    _results_file(tmp_path, "new-chrome-gw1", "new_chrome_gw1", 150)
+    _results_file(tmp_path, "other-os-x-safari-master", "safari", 50)
+
+    tests = {record["test"] for record in ResultFollower([tmp_path]).poll()}
+    assert tests == {"new_chrome", "new_chrome_gw1", "safari"}
+    tests = {record["test"] for record in ResultFollower([tmp_path], run="ol").poll()}
+    assert tests == {"old_chrome"}
+    assert len(list(ResultFollower([tmp_path], all_runs=True).poll())) == 4
@@ -0,0 +1,41 @@
+from support.scheduling import DurationHistory, lpt_assign
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def test_longest_jobs_start_first_on_the_least_loaded_slot():
+    """The slow checkout starts first instead of becoming the tail"""
+    jobs = [("landing", 2.0), ("checkout", 9.0), ("cart", 4.0), ("register", 3.0), ("search", 1.0)]
+
+    assignment, makespan = lpt_assign(jobs, slots=2)
+
+    assert assignment[0][0] == "checkout"
+    assert makespan == 10.0
+    assert sorted(sum(assignment, [])) == sorted(name for name, _ in jobs)
+
+
+def test_history_is_kept_per_platform_and_smoothed():
+    cache = FakeCache()
+    chrome = DurationHistory(cache, "windows-11-chrome")
+    chrome.update({"test_checkout": 10.0})
+    chrome.update({"test_checkout": 20.0})
+
+    assert DurationHistory(cache, "windows-11-chrome").predict("test_checkout") == 15.0
+    assert DurationHistory(cache, "os-x-ventura-safari").predict("test_checkout") is None
+
+
+def test_unknown_tests_are_predicted_from_the_median():
+    cache = FakeCache()
+    history = DurationHistory(cache, "local")
+    history.update({"a": 1.0, "b": 5.0, "c": 9.0})
+
+    assert history.default() == 5.0
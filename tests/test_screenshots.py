@@ -0,0 +1,52 @@
+import json
+
+from support.screenshots import ScreenshotStore, TestScreenshots
+
+
+class FakePage:
+    def __init__(self, *images):
+        self.images = list(images)
+
+    def screenshot(self, **kwargs):
+        return self.images.pop(0)
+
+
+def test_identical_screenshots_are_stored_once(tmp_path):
+    """Byte-identical captures share one object and are written once"""
+    store = ScreenshotStore(tmp_path)
+    shots = TestScreenshots(store)
+    page = FakePage(b"same-png", b"same-png", b"other-png")
+
+    shots.take(page, "page_loaded")
+    shots.take(page, "dom_loaded")
+    shots.take(page, "after_wait")
+    store.close()
+
+    assert shots.entries["page_loaded"] == shots.entries["dom_loaded"]
+    assert shots.path("dom_loaded").read_bytes() == b"same-png"
+    assert len(list((tmp_path / "objects").rglob("*.png"))) == 2
+    assert store.bytes_deduplicated == len(b"same-png")
+
+
+def test_objects_already_on_disk_are_not_rewritten(tmp_path):
+    """A later session deduplicates against objects written by earlier ones"""
+    first = ScreenshotStore(tmp_path)
+    first.add(b"png")
+    first.close()
+
+    second = ScreenshotStore(tmp_path)
+    second.add(b"png")
+    second.close()
+
+    assert second.bytes_written == 0
+
+
+def test_manifest_maps_names_to_digests(tmp_path):
+    store = ScreenshotStore(tmp_path)
+    shots = TestScreenshots(store)
+    shots.take(FakePage(b"png"), "page_loaded")
+
+    path = store.write_manifest("tests/sample-test.py::test_basic_page_loading", shots.entries)
+    store.close()
+
+    assert json.loads(path.read_text()) == shots.entries
@@ -0,0 +1,96 @@
+import json
+
+from support.sdk_log import Timeline, analyze
+
+RUN = "33bf1e07-b4eb-4d66-bab3-fedcb7422ecb"
+PREFIX = "CLI info [testhub:request-queue-handler]  [user]  [build]  [" + RUN + "]"
+
+
+def event(timestamp, event_type, body_key, **fields):
+    lines = [f"{timestamp} {PREFIX}  Added the event {{", f"  event_type: '{event_type}',", f"  {body_key}: {{"]
+    lines += [f"    {key}: '{value}'," for key, value in fields.items()]
+    lines += ["    body: {", "      code: 'def test_x():\\n' +", "        '    pass',", "    },", "  }", "} to 9600:0"]
+    return lines
+
+
+LOG_LINES = [
+    f"2025-09-20T08:33:39.994Z CLI info     Config : {{}}",
+    f"2025-09-20T08:33:40.026Z CLI info [testhub:module]  [user]   [{RUN}]  startBuild: payload=",
+    "",
+    '{"started_at":"2025-09-20T08:33:40.025Z"}',
+    f"2025-09-20T08:33:41.131Z CLI info [testhub:module]  [user]   [{RUN}]  startBuild: response=b" + "1" * 39,
+    *event("2025-09-20T08:33:48.781Z", "HookRunStarted", "hook_run", hook_type="BEFORE_EACH",
+           test_run_id="t1", scope="test_x[chromium]", started_at="2025-09-20T08:33:48.000Z"),
+    *event("2025-09-20T08:33:51.000Z", "HookRunFinished", "hook_run", hook_type="BEFORE_EACH",
+           test_run_id="t1", started_at="2025-09-20T08:33:48.000Z", finished_at="2025-09-20T08:33:50.500Z"),
+    *event("2025-09-20T08:33:51.100Z", "TestRunStarted", "test_run", uuid="t1", name="test_x[chromium]",
+           file_name="tests/sample-test.py", started_at="2025-09-20T08:33:50.500Z"),
+    *event("2025-09-20T08:33:56.000Z", "TestRunFinished", "test_run", uuid="t1", name="test_x[chromium]",
+           result="passed", duration_in_ms="4000", finished_at="2025-09-20T08:33:54.500Z"),
+]
+
+
+def test_events_become_a_per_test_timeline(tmp_path):
+    """Setup, body and status upload times come from the hook and test events"""
+    log = tmp_path / "sdk-cli.log"
+    log.write_text("\n".join(LOG_LINES) + "\n")
+
+    [row] = list(analyze(log).rows())
+
+    assert row["test"] == "test_x[chromium]"
+    assert row["result"] == "passed"
+    assert row["setup_ms"] == 2500
+    assert row["body_ms"] == 4000
+    assert row["status_upload_ms"] == 1500
+
+
+def test_build_summary_includes_sdk_overhead(tmp_path):
+    log = tmp_path / "sdk-cli.log"
+    log.write_text("\n".join(LOG_LINES) + "\n")
+
+    [build] = analyze(log).summary()["builds"]
+
+    assert build["build_create_ms"] == 1105
+    assert build["sdk_setup_ms"] == 7974
+
+
+def test_resume_from_saved_offset(tmp_path):
+    """A second run only reads what was appended and keeps earlier state"""
+    log = tmp_path / "sdk-cli.log"
+    state = tmp_path / "state.json"
+    split = LOG_LINES.index(next(line for line in LOG_LINES if "TestRunStarted" in line)) - 1
+    log.write_text("\n".join(LOG_LINES[:split]) + "\n")
+    analyze(log, state)
+    first_offset = json.loads(state.read_text())["offset"]
+
+    with open(log, "a") as handle:
+        handle.write("\n".join(LOG_LINES[split:]) + "\n")
+    timeline = analyze(log, state)
+
+    assert 0 < first_offset < log.stat().st_size
+    [row] = list(timeline.rows())
+    assert row["setup_ms"] == 2500 and row["body_ms"] == 4000
+    assert isinstance(Timeline(json.loads(state.read_text())["builds"]), Timeline)
+
+
+def test_interrupted_follow_saves_state_and_outputs(tmp_path, monkeypatch):
+    """Ctrl-C is the only way out of --follow, so it must not lose the offset"""
+    log = tmp_path / "sdk-cli.log"
+    state = tmp_path / "state.json"
+    # While following, an entry is only complete once the next one starts
+    stop = f"2025-09-20T08:33:57.000Z CLI info [testhub:module]  [user]   [{RUN}]  stopBuild: payload="
+    log.write_text("\n".join([*LOG_LINES, stop]) + "\n")
+    updates = []
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("support.sdk_log.time.sleep", interrupt)
+    try:
+        analyze(log, state, follow=True, on_update=updates.append)
+    except KeyboardInterrupt:
+        pass
+
+    assert json.loads(state.read_text())["offset"] > 0
+    [row] = list(updates[-1].rows())
+    assert row["body_ms"] == 4000
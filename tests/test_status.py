@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from support.status import (
+    BrowserStackBackend, LocalBackend, StatusReporter, clean_error, executor_command
+)
+
+TESTS_DIR = Path(__file__).resolve().parent
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    def is_closed(self):
+        return False
+
+    def evaluate(self, expression, arg):
+        self.calls.append(arg)
+
+
+def test_executor_command_survives_quotes_and_newlines():
+    """Reasons are JSON-encoded instead of pasted into a hand-built string"""
+    command = executor_command("setSessionStatus", {"status": "failed", "reason": 'Expected "1"\nGot \'2\''})
+
+    prefix, payload = command.split(": ", 1)
+    assert prefix == "browserstack_executor"
+    assert json.loads(payload)["arguments"]["reason"] == 'Expected "1"\nGot \'2\''
+
+
+def test_clean_error_drops_the_call_log():
+    err = Exception("Timeout 5000ms exceeded.\n  waiting for selector\nCall log:\n  - waiting")
+
+    assert clean_error(err) == "Timeout 5000ms exceeded. waiting for selector"
+
+
+def test_reporter_sends_merged_annotations_then_the_last_status():
+    """Nothing is sent until flush, and the batch is as small as possible"""
+    page = FakePage()
+    reporter = StatusReporter("t", BrowserStackBackend())
+    reporter.annotate("added to cart")
+    reporter.annotate("opened checkout")
+    reporter.failed("first attempt")
+    reporter.passed("done")
+    assert page.calls == []
+
+    reporter.flush(page)
+
+    sent = [json.loads(call.split(": ", 1)[1]) for call in page.calls]
+    assert [event["action"] for event in sent] == ["annotate", "setSessionStatus"]
+    assert sent[0]["arguments"]["data"] == "added to cart\nopened checkout"
+    assert sent[1]["arguments"] == {"status": "passed", "reason": "done"}
+    assert (reporter.stats.calls, reporter.stats.merged) == (2, 2)
+
+
+def test_local_backend_records_events_offline(tmp_path):
+    path = tmp_path / "status.jsonl"
+    reporter = StatusReporter("tests/sample-test.py::test_checkout_process", LocalBackend(path))
+    reporter.failed("no checkout button")
+
+    reporter.flush(None)
+
+    record = json.loads(path.read_text())
+    assert record["test"] == "tests/sample-test.py::test_checkout_process"
+    assert record["status"] == "failed"
+
+
+def test_a_perf_gate_failure_replaces_a_queued_passed_status(tmp_path):
+    """The status sent is failed with the gate's reason, through the real perf and status plugins"""
+    (tmp_path / "baseline.jsonl").write_text(json.dumps(
+        {"test": "test_gated.py::test_landing", "platform": "local", "load_ms": 1000.0}
+    ) + "\n")
+    (tmp_path / "test_gated.py").write_text(
+        "def test_landing(perf_metrics, session_status):\n"
+        "    perf_metrics.samples.append({'load_ms': 1500.0})\n"
+        "    session_status.passed('landing page loaded')\n"
+    )
+    status_log = tmp_path / "status.jsonl"
+
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "pytest", "-q", "-p", "support.outcomes", "-p", "support.status",
+            "-p", "support.perf", "--perf-baseline", "baseline.jsonl", "--perf-gate=fail",
+            "--perf-dir", "perf", "--status-backend=local", "--status-log", str(status_log), "test_gated.py",
+        ],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(TESTS_DIR)},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 1, result.stdout
+    [record] = [json.loads(line) for line in status_log.read_text().splitlines()]
+    assert record["status"] == "failed"
+    assert record["reason"].startswith("test_gated.py::test_landing slower than baseline: load_ms p50")
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from support.stats import P2Quantile, percentile
+from support.timeouts import StepTimeouts, TimeoutPolicy
+
+
+@pytest.mark.parametrize(
+    "draw",
+    [random.random, lambda: random.lognormvariate(6, 0.5), lambda: random.expovariate(0.01)],
+)
+def test_p2_tracks_the_exact_p99(draw):
+    random.seed(7)
+    values = [draw() for _ in range(20000)]
+    estimate = P2Quantile(99)
+    for value in values:
+        estimate.add(value)
+
+    assert estimate.value == pytest.approx(percentile(values, 99), rel=0.03)
+
+
+def test_p2_round_trips_through_the_cache():
+    estimate = P2Quantile(99)
+    for value in range(1, 50):
+        estimate.add(value)
+    restored = P2Quantile.from_dict(estimate.to_dict())
+    for value in range(50, 100):
+        estimate.add(value)
+        restored.add(value)
+
+    assert restored.value == estimate.value
+    assert P2Quantile(99).value is None
+
+
+def test_timeouts_adapt_after_enough_samples():
+    policy = TimeoutPolicy(multiplier=3, floor_ms=1000, ceiling_ms=20000, min_samples=10)
+    timeouts = StepTimeouts(policy, "tests/sample-test.py::test_checkout")
+    for _ in range(9):
+        policy.record(timeouts.key("cart"), 800)
+    assert timeouts.timeout("cart", 5000) == 5000
+
+    policy.record(timeouts.key("cart"), 800)
+    assert timeouts.timeout("cart", 5000) == pytest.approx(2400)
+    assert policy.cut_ms == pytest.approx(2600)
+
+
+def test_timeouts_are_clamped():
+    fast = TimeoutPolicy({"fast": P2Quantile(99)}, floor_ms=1000, ceiling_ms=20000, min_samples=1)
+    fast.record("fast", 10)
+    fast.record("slow", 30000)
+
+    assert fast.timeout("fast", 5000) == 1000
+    assert fast.timeout("slow", 5000) == 20000
+    assert TimeoutPolicy(fast.estimates, min_samples=1, adapt=False).timeout("fast", 5000) == 5000
+
+
+def test_failed_steps_are_not_recorded():
+    policy = TimeoutPolicy()
+    timeouts = StepTimeouts(policy, "test")
+    with pytest.raises(TimeoutError):
+        with timeouts.step("cart", 5000):
+            raise TimeoutError
+
+    assert policy.estimates == {}
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+from support.tracing import RingTracer, TraceRing, TraceWriter, should_keep
+
+
+class FakeTracing:
+    def __init__(self):
+        self.chunks = 0
+        self.calls = []
+
+    def start(self, **kwargs):
+        self.calls.append("start")
+
+    def start_chunk(self, title):
+        self.calls.append(f"start_chunk {title}")
+
+    def stop_chunk(self, path):
+        self.chunks += 1
+        with open(path, "wb") as handle:
+            handle.write(b"chunk-%d" % self.chunks)
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+        self.pages = []
+        self.closed = False
+
+    def on(self, event, callback):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+
+    def goto(self, url, timeout=None):
+        self.url = url
+
+    def reload(self):
+        pass
+
+
+def test_ring_keeps_the_newest_chunks_within_both_limits():
+    ring = TraceRing(max_chunks=3, max_bytes=10)
+    for index in range(4):
+        ring.push(f"chunk {index}", b"12")
+    assert [title for title, _ in ring.chunks] == ["chunk 1", "chunk 2", "chunk 3"]
+
+    ring.push("large", b"123456789")
+    assert [title for title, _ in ring.chunks] == ["large"]
+    assert ring.bytes == 9 and ring.dropped == 4
+
+
+def test_chunks_are_cut_at_navigation_and_close(tmp_path):
+    tracer = RingTracer("test_checkout", TraceRing(max_chunks=2), tmp_path)
+    context = FakeContext()
+    tracer.instrument_context(context)
+    page = FakePage(context)
+    tracer.instrument_page(page)
+
+    page.goto("https://testathon.live/")
+    page.goto("https://testathon.live/checkout")
+    context.close()
+
+    assert context.closed
+    assert [title for title, _ in tracer.ring.chunks] == [
+        "goto https://testathon.live/",
+        "goto https://testathon.live/checkout",
+    ]
+    assert [data for _, data in tracer.ring.chunks] == [b"chunk-2", b"chunk-3"]
+    assert list(tmp_path.iterdir()) == []
+    tracer.finish()
+    assert len(tracer.ring.chunks) == 2
+
+
+def test_only_failed_or_slow_tests_are_kept():
+    passed = SimpleNamespace(failed=False, duration=1.0)
+    slow = SimpleNamespace(failed=False, duration=12.0)
+    failed = SimpleNamespace(failed=True, duration=1.0)
+
+    assert not should_keep({"setup": passed, "call": passed}, budget=10)
+    assert not should_keep({"call": slow}, budget=None)
+    assert should_keep({"call": slow}, budget=10)
+    assert should_keep({"setup": failed}, budget=None)
+
+
+def test_writer_stops_at_the_session_budget(tmp_path):
+    ring = TraceRing()
+    ring.push("goto", b"x" * 6)
+    writer = TraceWriter(tmp_path, max_bytes=10)
+
+    paths = writer.submit("tests/sample-test.py::test_checkout_process", ring)
+    assert writer.submit("tests/sample-test.py::test_product_filtering", ring) == []
+    writer.close()
+
+    assert [path.read_bytes() for path in paths] == [b"x" * 6]
+    assert paths[0].name.endswith("test-checkout-process-1.trace.zip")
+    assert writer.tests == 1 and writer.skipped == 1
+
+
+def test_a_shorter_ring_replaces_every_earlier_chunk(tmp_path):
+    """Chunks a previous run wrote for the test do not outlive the new trace"""
+    nodeid = "tests/sample-test.py::test_checkout_process"
+    longer, shorter = TraceRing(), TraceRing()
+    for title in ("goto", "reload", "goto"):
+        longer.push(title, title.encode())
+    shorter.push("goto", b"new")
+    writer = TraceWriter(tmp_path, max_bytes=1000)
+
+    writer.submit(nodeid, longer)
+    other = writer.submit(f"{nodeid}_guest", longer)
+    [path] = writer.submit(nodeid, shorter)
+    writer.close()
+
+    assert sorted(path.parent.iterdir()) == sorted([path, *other])
+    assert path.read_bytes() == b"new"
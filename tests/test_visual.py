@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from support.visual import VisualCheck, VisualBaselines, diff_images, tile_digests
+
+
+def encode_png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_image(height=130, width=200):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+
+
+def test_only_changed_tiles_are_diffed():
+    """A change confined to one tile marks only that tile and its pixels"""
+    baseline = make_image()
+    actual = baseline.copy()
+    actual[10:20, 70:80] = 255 - actual[10:20, 70:80]
+
+    diff = diff_images(baseline, actual, tile=64)
+
+    assert diff.changed_tiles == 1
+    assert diff.total_tiles == 3 * 4
+    assert diff.mask[10:20, 70:80].all()
+    assert diff.changed_pixels == 100
+
+
+def test_differences_within_tolerance_are_ignored():
+    baseline = np.full((64, 64, 3), 100, dtype=np.uint8)
+    actual = baseline + 5
+
+    diff = diff_images(baseline, actual, tile=32, tolerance=8)
+
+    assert diff.changed_tiles == 4
+    assert diff.changed_pixels == 0
+
+
+def test_size_change_counts_non_overlapping_area():
+    """Extra rows in a taller full-page capture count as changed"""
+    baseline = make_image(100, 50)
+    actual = np.concatenate([baseline, make_image(20, 50)])
+
+    diff = diff_images(baseline, actual, tile=32)
+
+    assert diff.changed_pixels == 20 * 50
+    assert diff.total_pixels == 120 * 50
+
+
+def test_tile_digests_shape_covers_partial_tiles():
+    assert tile_digests(make_image(130, 200), tile=64).shape == (3, 4)
+
+
+def test_check_records_baseline_then_reports_diff(tmp_path):
+    """The first run records a baseline, later runs compare and write a diff image"""
+    check = VisualCheck(VisualBaselines(tmp_path / "base"), tmp_path / "diffs", "t::x", threshold=1.0)
+    baseline = make_image()
+    changed = baseline.copy()
+    changed[:64, :64] = 0
+
+    assert check.compare("landing", encode_png(baseline)) is None
+    assert check.compare("landing", encode_png(baseline)).changed_pixels == 0
+
+    diff = check.compare("landing", encode_png(changed))
+    assert diff.changed_tiles == 1
+    assert check.diff_path("landing").exists()
@@ -0,0 +1,45 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from support.waits import WaitStats, wait_for_app_ready
+
+
+class FakePage:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def evaluate(self, expression, arg):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_wait_reports_time_saved_against_fixed_sleep():
+    """Each wait is recorded alongside the fixed sleep it replaced"""
+    stats = WaitStats()
+
+    wait_for_app_ready(FakePage(420.0), replaces_ms=3000, stats=stats, label="t1")
+    wait_for_app_ready(FakePage(80.0), stats=stats, label="t2")
+
+    assert stats.waited_ms == 500.0
+    assert stats.replaced_ms == 3000
+    assert stats.saved_ms == 2580.0
+
+
+def test_wait_restarts_after_navigation():
+    """A navigation during the wait restarts it on the new document"""
+    page = FakePage(PlaywrightError("Execution context was destroyed"), 120.0)
+
+    assert wait_for_app_ready(page) == 120.0
+    assert page.calls == 2
+
+
+def test_wait_timeout_is_raised():
+    """Other errors, such as the in-page timeout, propagate"""
+    page = FakePage(PlaywrightError("App not ready after 10000ms (2 pending requests)"))
+
+    with pytest.raises(PlaywrightError, match="App not ready"):
+        wait_for_app_ready(page)
@@ -0,0 +1,131 @@
+import io
+import os
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+from support.warm import (
+    CDP_ENV,
+    HEADLESS_ENV,
+    TRAILER,
+    ResultStream,
+    can_use_warm_chromium,
+    format_result,
+    purge_modules,
+    read_costs,
+)
+
+WARM = Path(__file__).resolve().parent / "support" / "warm.py"
+
+
+def test_result_stream_splits_output_from_the_result():
+    out = io.BytesIO()
+    stream = ResultStream(out)
+    for chunk in (b"collected 1 item\n", b"1 passed" + TRAILER + b'{"exit": ', b"0}"):
+        stream.feed(chunk)
+
+    assert out.getvalue() == b"collected 1 item\n1 passed"
+    assert stream.close() == {"exit": 0}
+
+
+def test_result_stream_without_a_result():
+    stream = ResultStream(io.BytesIO())
+    stream.feed(b"Traceback ...")
+
+    assert stream.close() is None
+
+
+def test_format_result_reports_startup_saved_and_still_paid():
+    result = {
+        "exit": 0,
+        "run_ms": 2500,
+        "saved_ms": {"imports": 1800, "browser": 700},
+        "paid_ms": {"driver": 300, "connect": 100},
+        "runs": 3,
+        "total_saved_ms": 6300,
+    }
+
+    assert format_result(result) == (
+        "warm run exited 0 in 2.5s, skipping up to 2.5s of startup (imports 1.8s, browser 0.7s) "
+        "and still paying 0.4s (driver 0.3s, connect 0.1s); 6.3s saved over 3 run(s) of this daemon"
+    )
+
+
+def test_costs_reported_by_a_run_are_summed():
+    assert read_costs(b'{"driver": 300}\n{"connect": 40}\n{"connect": 60}\n') == {"driver": 300, "connect": 100}
+
+
+def test_purge_modules_drops_only_modules_under_root(tmp_path, monkeypatch):
+    inside = types.ModuleType("warm_inside")
+    inside.__file__ = str(tmp_path / "pkg" / "inside.py")
+    outside = types.ModuleType("warm_outside")
+    outside.__file__ = str(tmp_path.parent / "outside.py")
+    monkeypatch.setitem(sys.modules, "warm_inside", inside)
+    monkeypatch.setitem(sys.modules, "warm_outside", outside)
+    script = types.ModuleType("__main__")
+    script.__file__ = str(tmp_path / "warm.py")
+    monkeypatch.setitem(sys.modules, "__main__", script)
+
+    assert purge_modules(tmp_path) == 1
+    assert "warm_inside" not in sys.modules
+    assert "warm_outside" in sys.modules
+    assert sys.modules["__main__"] is script
+
+
+def test_runs_with_other_launch_options_do_not_use_the_warm_chromium(monkeypatch):
+    monkeypatch.setenv(CDP_ENV, "http://127.0.0.1:9222")
+    monkeypatch.setenv(HEADLESS_ENV, "1")
+
+    assert can_use_warm_chromium("chromium", {}, None)
+    assert not can_use_warm_chromium("firefox", {}, None)
+    assert not can_use_warm_chromium("chromium", {}, {"ws_endpoint": "wss://hub"})
+    for launch_args in ({"headless": False}, {"channel": "chrome"}, {"slow_mo": 100}, {"args": ["--mute-audio"]}):
+        assert not can_use_warm_chromium("chromium", launch_args, None)
+
+    monkeypatch.setenv(HEADLESS_ENV, "0")
+    assert can_use_warm_chromium("chromium", {"headless": False}, None)
+    assert not can_use_warm_chromium("chromium", {}, None)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="the warm daemon needs fork()")
+def test_daemon_runs_pytest_in_a_fork_and_picks_up_edits(tmp_path):
+    sock = tmp_path / "warm.sock"
+    daemon = subprocess.Popen(
+        [sys.executable, str(WARM), "--socket", str(sock), "serve", "--no-browser"],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while not sock.exists():
+            assert daemon.poll() is None and time.monotonic() < deadline
+            time.sleep(0.05)
+        test_file = tmp_path / "test_sample.py"
+
+        def run():
+            return subprocess.run(
+                [sys.executable, str(WARM), "--socket", str(sock), "run", "--", "-q", test_file.name],
+                cwd=tmp_path,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+
+        test_file.write_text("def test_sample():\n    assert True\n")
+        first = run()
+        test_file.write_text("def test_sample():\n    assert False\n")
+        second = run()
+    finally:
+        subprocess.run([sys.executable, str(WARM), "--socket", str(sock), "stop"], timeout=30)
+        daemon.wait(timeout=30)
+
+    assert first.returncode == 0 and "1 passed" in first.stdout
+    assert "warm run exited 0" in first.stdout
+    assert second.returncode == 1 and "1 failed" in second.stdout
+    assert "over 2 run(s)" in second.stdout
+    # These tests start no Playwright driver, so the runs paid nothing the daemon could not save
+    assert "still paying 0.0s;" in first.stdout
+    assert not sock.exists()